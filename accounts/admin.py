@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django import forms
+from assets.paginator import EstimatedCountPaginator
 from .models import User
 
 # Form for creating users in admin
@@ -40,8 +41,10 @@ class UserAdmin(BaseUserAdmin):
 
     list_display = ('id', 'username', 'email', 'role', 'is_active', 'is_staff', 'is_superuser', 'date_joined')
     list_filter = ('role', 'is_active', 'is_staff', 'is_superuser')
-    search_fields = ('username', 'email')
+    search_fields = ('^username', '^email')
     ordering = ('id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     # Show role field in edit page
     fieldsets = (
@@ -4,16 +4,19 @@ from django.contrib import messages
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from functools import wraps
-from django.db.models import Count, Q
+from django.db.models import Count
 from django.http import HttpResponse
 from django.utils import timezone
-from django.core.paginator import Paginator
 import openpyxl
 from openpyxl.styles import Font, PatternFill
 
 from assets.forms import AssetForm
 from assets.models import Asset
+from assets.forecast import dashboard_forecast
+from assets.rollups import monthly_trends
 from requests.models import AssetRequest
+from requests.filters import MY_REQUEST_LIST
+from requests.summary import request_summary
 from .forms import UserRegistrationForm, UserLoginForm
 
 
@@ -103,6 +106,7 @@ def admin_dashboard(request):
     pending_requests = AssetRequest.objects.filter(status='pending').count()
     approved_assets = Asset.objects.filter(status='borrowed').count()
     returned_assets = Asset.objects.filter(status='returned').count()
+    overdue_loans = AssetRequest.objects.filter(is_overdue=True).count()
     recent_requests = AssetRequest.objects.filter(status='pending').order_by('-request_date')[:10]
 
     context = {
@@ -110,7 +114,9 @@ def admin_dashboard(request):
         'pending_requests': pending_requests,
         'approved_assets': approved_assets,
         'returned_assets': returned_assets,
+        'overdue_loans': overdue_loans,
         'recent_requests': recent_requests,
+        'forecasts': dashboard_forecast(),   # precomputed by `manage.py forecast_demand`
     }
     return render(request, 'accounts/admin_dashboard.html', context)
 
@@ -118,7 +124,7 @@ def admin_dashboard(request):
 @roles_required('admin')
 def admin_report(request):
     context = {
-        # Add report context here
+        'trends': monthly_trends(),
     }
     return render(request, 'assets/admin_report.html', context)
 
@@ -129,6 +135,7 @@ def staff_dashboard(request):
     pending_requests = AssetRequest.objects.filter(status='pending').count()
     approved_assets = Asset.objects.filter(status='borrowed').count()
     returned_assets = Asset.objects.filter(status='returned').count()
+    overdue_loans = AssetRequest.objects.filter(is_overdue=True).count()
     recent_requests = AssetRequest.objects.filter(status='pending').order_by('-request_date')[:10]
 
     context = {
@@ -136,6 +143,7 @@ def staff_dashboard(request):
         'pending_requests': pending_requests,
         'approved_assets': approved_assets,
         'returned_assets': returned_assets,
+        'overdue_loans': overdue_loans,
         'recent_requests': recent_requests,
     }
     return render(request, 'accounts/staff_dashboard.html', context)
@@ -159,7 +167,7 @@ def staff_manage_requests(request):
 @nocache
 def staff_report(request):
     context = {
-        # Add staff report context
+        'trends': monthly_trends(),
     }
     return render(request, 'assets/staff_report.html', context)
 
@@ -168,44 +176,16 @@ def staff_report(request):
 @roles_required('normal')
 @nocache
 def normal_dashboard(request):
-    search_query = request.GET.get("search", "")
-    status_filter = request.GET.get("status", "all")
-    category_filter = request.GET.get("category", "all")
-
-    qs = AssetRequest.objects.filter(user=request.user)
-
-    # SEARCH
-    if search_query:
-        qs = qs.filter(
-            Q(asset_category__icontains=search_query) |
-            Q(remarks__icontains=search_query)
-        )
-
-    # STATUS FILTER
-    if status_filter != "all":
-        qs = qs.filter(status=status_filter)
-
-    # CATEGORY FILTER
-    if category_filter != "all":
-        qs = qs.filter(asset_category=category_filter)
-
-    qs = qs.order_by("-request_date")
-
-    paginator = Paginator(qs, 10)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
-
-    context = {
-        "page_obj": page_obj,
-        "search_query": search_query,
-        "status_filter": status_filter,
-        "category_filter": category_filter,
-
-        # stats
-        "pending_requests_count": qs.filter(status="pending").count(),
-        "approved_requests_count": qs.filter(status="approved").count(),
-        "rejected_requests_count": qs.filter(status="rejected").count(),
-    }
+    # The user's requests; archived ones only with ?history=1
+    context = MY_REQUEST_LIST.page(request, user=request.user)
+    summary = request_summary(request.user)
+
+    context.update({
+        # stats: all of the user's requests, one cached aggregate
+        "pending_requests_count": summary["pending"],
+        "approved_requests_count": summary["approved"],
+        "rejected_requests_count": summary["rejected"],
+    })
 
     return render(request, "accounts/normal_dashboard.html", context)
 
@@ -0,0 +1,14 @@
+from rest_framework.pagination import CursorPagination
+
+
+class IdCursorPagination(CursorPagination):
+    """
+    Keyset pagination on the primary key.
+
+    Each page is a single `WHERE id < cursor ORDER BY id DESC LIMIT n` range
+    scan, so page 5,000 costs the same as page 1 and no COUNT(*) is issued.
+    """
+    ordering = '-id'
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
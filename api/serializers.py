@@ -0,0 +1,93 @@
+from rest_framework import serializers
+
+from assets.models import Asset
+from requests.models import AssetRequest, AssetReturn
+
+
+class SparseFieldsSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer that honours `?fields=a,b,c`.
+
+    Unknown names are ignored; an empty selection falls back to every field.
+    `projection()` turns the surviving fields into the column list for
+    `.only()` and the relations for `select_related()`, so the query never
+    loads a column the response does not contain.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+
+        if fields:
+            selected = set(fields) & set(self.fields)
+            if selected:
+                for name in set(self.fields) - selected:
+                    self.fields.pop(name)
+
+    def projection(self, prefix=''):
+        """Return `(only_columns, select_related)` for the current fields."""
+        only, related = [], []
+
+        for field in self.fields.values():
+            path = prefix + field.source.replace('.', '__')
+
+            if isinstance(field, SparseFieldsSerializer):
+                related.append(path)
+                sub_only, sub_related = field.projection(prefix=path + '__')
+                only.extend(sub_only)
+                related.extend(sub_related)
+            elif '__' in path[len(prefix):]:
+                # Dotted source such as `user.username`
+                related.append(path.rsplit('__', 1)[0])
+                only.append(path)
+            else:
+                only.append(path)
+
+        return only, related
+
+
+class AssetBriefSerializer(SparseFieldsSerializer):
+    class Meta:
+        model = Asset
+        fields = ['id', 'asset_category', 'model', 'serial_number', 'barcode']
+
+
+class AssetSerializer(SparseFieldsSerializer):
+    created_by = serializers.CharField(source='created_by.username', default=None)
+
+    class Meta:
+        model = Asset
+        fields = [
+            'id', 'asset_category', 'model', 'serial_number', 'barcode',
+            'specification', 'description', 'status', 'asset_condition',
+            'created_by', 'created_at', 'updated_at',
+            'times_borrowed', 'last_borrowed_at', 'total_days_on_loan',
+        ]
+
+
+class AssetRequestSerializer(SparseFieldsSerializer):
+    user = serializers.CharField(source='user.username')
+    approved_by = serializers.CharField(source='approved_by.username', default=None)
+    assigned_asset = AssetBriefSerializer()
+
+    class Meta:
+        model = AssetRequest
+        fields = [
+            'id', 'user', 'asset_category', 'request_date', 'return_date',
+            'remarks', 'status', 'assigned_asset', 'approved_by',
+            'approval_date', 'created_at', 'updated_at',
+        ]
+
+
+class AssetReturnSerializer(SparseFieldsSerializer):
+    borrow_request = serializers.IntegerField(source='borrow_request_id')
+    user = serializers.CharField(source='borrow_request.user.username')
+    asset = AssetBriefSerializer(source='borrow_request.assigned_asset')
+    received_by = serializers.CharField(source='received_by.username', default=None)
+
+    class Meta:
+        model = AssetReturn
+        fields = [
+            'id', 'borrow_request', 'user', 'asset', 'returned_date',
+            'condition_on_return', 'received_by', 'remarks', 'created_at',
+        ]
@@ -0,0 +1,30 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from accounts.models import User
+from assets.models import Asset
+
+
+class AssetApiTests(TestCase):
+    def setUp(self):
+        self.client.force_login(User.objects.create_user('staff', password='x', role='staff'))
+        self.assets = [Asset.objects.create(serial_number=f'S-{i}', model=f'M{i}') for i in range(5)]
+
+    def test_pages_follow_the_id_cursor_without_a_count(self):
+        ids = []
+        url = reverse('api:asset-list') + '?page_size=2'
+        while url:
+            page = self.client.get(url).json()
+            self.assertNotIn('count', page)
+            ids += [row['id'] for row in page['results']]
+            url = page['next']
+
+        self.assertEqual(ids, sorted((asset.pk for asset in self.assets), reverse=True))
+
+    def test_fields_narrow_the_response(self):
+        page = self.client.get(reverse('api:asset-list'), {'fields': 'serial_number'}).json()
+        self.assertEqual(set(page['results'][0]), {'serial_number'})
+
+    def test_normal_users_are_refused(self):
+        self.client.force_login(User.objects.create_user('user', password='x'))
+        self.assertEqual(self.client.get(reverse('api:asset-list')).status_code, 403)
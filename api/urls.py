@@ -0,0 +1,17 @@
+from django.urls import include, path
+from rest_framework.routers import DefaultRouter
+
+from . import views
+
+app_name = 'api'
+
+router = DefaultRouter()
+router.register('assets', views.AssetViewSet, basename='asset')
+router.register('requests', views.AssetRequestViewSet, basename='request')
+router.register('returns', views.AssetReturnViewSet, basename='return')
+
+urlpatterns = [
+    path('v1/changes/', views.ChangeFeedView.as_view(), name='changes'),
+    path('v1/holders/', views.HolderLookupView.as_view(), name='holders'),
+    path('v1/', include(router.urls)),
+]
@@ -0,0 +1,161 @@
+from django.http import StreamingHttpResponse
+from rest_framework import permissions, viewsets
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from audit.changefeed import iter_changes, ndjson_lines
+from assets.filters import filter_assets
+from accounts.models import User
+from assets.models import Asset
+from assets.scan import lookup_code
+from requests.holders import assets_held_by
+from requests.filters import filter_requests, filter_returns
+from requests.models import AssetRequest, AssetReturn
+from .pagination import IdCursorPagination
+from .serializers import AssetSerializer, AssetRequestSerializer, AssetReturnSerializer
+
+
+class IsAdminOrStaff(permissions.BasePermission):
+    """Same audience as the admin/staff HTML pages."""
+
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and request.user.role in ['admin', 'staff']
+
+
+class SparseFieldsViewSet(viewsets.ReadOnlyModelViewSet):
+    """
+    Read-only endpoint whose SQL follows `?fields=`.
+
+    The serializer decides which columns and joins are needed; the queryset
+    is then narrowed with `.only()` / `select_related()` before filtering.
+    """
+    permission_classes = [IsAdminOrStaff]
+    pagination_class = IdCursorPagination
+
+    def requested_fields(self):
+        fields = self.request.query_params.get('fields', '')
+        return [f.strip() for f in fields.split(',') if f.strip()]
+
+    def get_serializer(self, *args, **kwargs):
+        kwargs.setdefault('fields', self.requested_fields())
+        return super().get_serializer(*args, **kwargs)
+
+    def get_queryset(self):
+        serializer = self.get_serializer()
+        only, related = serializer.projection()
+
+        queryset = self.queryset
+        if related:
+            queryset = queryset.select_related(*related)
+        queryset = queryset.only('id', *only)
+
+        return self.filter_queryset_params(queryset, self.request.query_params)
+
+    def filter_queryset_params(self, queryset, params):
+        return queryset
+
+
+class AssetViewSet(SparseFieldsViewSet):
+    queryset = Asset.objects.all()
+    serializer_class = AssetSerializer
+
+    def filter_queryset_params(self, queryset, params):
+        return filter_assets(
+            queryset,
+            params.get('search', '').strip(),
+            params.get('status', 'all'),
+            params.get('condition', 'all'),
+            params.get('usage', 'all'),
+        )
+
+
+class AssetRequestViewSet(SparseFieldsViewSet):
+    queryset = AssetRequest.objects.all()
+    serializer_class = AssetRequestSerializer
+
+    def filter_queryset_params(self, queryset, params):
+        return filter_requests(
+            queryset,
+            params.get('search', '').strip(),
+            params.get('status', 'all'),
+        )
+
+
+class AssetReturnViewSet(SparseFieldsViewSet):
+    queryset = AssetReturn.objects.all()
+    serializer_class = AssetReturnSerializer
+
+    def filter_queryset_params(self, queryset, params):
+        return filter_returns(
+            queryset,
+            params.get('search', '').strip(),
+            params.get('condition', 'all'),
+        )
+
+
+class ChangeFeedView(APIView):
+    """
+    `GET /api/v1/changes/?since=<seq>` streams NDJSON change entries.
+
+    Keep the last `seq` received and pass it back as `since` next time.
+    Each entry's `op` is `upsert`, `delete` or `archive` (see
+    `audit.changefeed`).
+    """
+    permission_classes = [IsAdminOrStaff]
+
+    def get(self, request):
+        try:
+            since = int(request.query_params.get('since', 0))
+            limit = request.query_params.get('limit')
+            limit = int(limit) if limit else None
+        except ValueError:
+            raise ValidationError("`since` and `limit` must be integers.")
+
+        return StreamingHttpResponse(
+            ndjson_lines(iter_changes(since, limit)),
+            content_type='application/x-ndjson',
+        )
+
+
+class HolderLookupView(APIView):
+    """
+    `GET /api/v1/holders/?code=<barcode or serial>` -> the asset and who has it.
+    `GET /api/v1/holders/?user=<username>` -> the assets that user has now.
+
+    Both read the maintained `Asset.current_holder` pointer: one indexed
+    lookup each, no scan of the request history.
+    """
+    permission_classes = [IsAdminOrStaff]
+
+    def get(self, request):
+        code = request.query_params.get('code', '').strip()
+        username = request.query_params.get('user', '').strip()
+
+        if code:
+            result = lookup_code(code)
+            if result is None:
+                raise NotFound(f'No asset with barcode or serial "{code}".')
+            return Response(result)
+
+        if username:
+            user = User.objects.filter(username=username).first()
+            if user is None:
+                raise NotFound(f'No user "{username}".')
+            return Response({
+                'user': user.username,
+                'assets': [
+                    {
+                        'id': asset.id,
+                        'asset_category': asset.asset_category,
+                        'model': asset.model,
+                        'serial_number': asset.serial_number,
+                        'barcode': asset.barcode,
+                        'request_id': asset.current_loan_id,
+                        'return_date': asset.current_loan.return_date if asset.current_loan else None,
+                    }
+                    for asset in assets_held_by(user)
+                ],
+            })
+
+        raise ValidationError("Pass `code` or `user`.")
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from .models import Asset
+from .paginator import EstimatedCountPaginator
 
 
 @admin.register(Asset)
@@ -13,4 +14,10 @@ class AssetAdmin(admin.ModelAdmin):
         'created_at'
     )
     list_filter = ('status', 'asset_condition', 'asset_category')
-    search_fields = ('asset_category', 'model', 'serial_number', 'barcode')
+    list_select_related = ('created_by',)
+    # Prefix searches, so the unique barcode/serial indexes are used
+    search_fields = ('^barcode', '^serial_number', '^model')
+    autocomplete_fields = ('created_by', 'current_loan', 'current_holder')
+    date_hierarchy = 'created_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
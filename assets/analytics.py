@@ -0,0 +1,287 @@
+"""
+Utilization analytics over loan intervals.
+
+Every approved loan is an interval `[approval_date, returned_date)` on one
+asset (still-open loans run to now). The intervals and the asset list are
+read in keyset batches straight into NumPy arrays of epoch seconds, and
+everything after that is array arithmetic, no per-row Python:
+
+- overlapping loans of the same asset are merged (sort + grouped running max)
+- utilization = time on loan / time the asset existed within the window
+- idle gaps = time between one loan ending and the next starting
+- peak concurrent demand = sweep line over +1 / -1 events (sort + cumsum),
+  overall and per category
+
+Results are cached per window and data version, so the report page only
+recomputes after assets, requests or returns change.
+"""
+import datetime
+from itertools import islice
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from requests.models import AssetRequest
+from .models import Asset
+from .reports import BATCH_SIZE, _csv_chunks, data_version, iter_keyset
+
+
+DEFAULT_WINDOW_DAYS = 365
+CACHE_SECONDS = 60 * 60
+DAY = 86400
+
+# Idle gap histogram bucket edges, in days (last bucket is open-ended)
+IDLE_BINS = [0, 1, 3, 7, 14, 30, 60, 90, 180, 365]
+
+UTILIZATION_COLUMNS = [
+    ('asset_id', "Asset ID"),
+    ('asset_category', "Asset Category"),
+    ('model', "Model"),
+    ('serial_number', "Serial Number"),
+    ('loans', "Loans"),
+    ('days_on_loan', "Days on Loan"),
+    ('days_available', "Days Available"),
+    ('utilization', "Utilization %"),
+]
+
+
+def _epoch(value):
+    return int(value.timestamp())
+
+
+def _load(rows, converters):
+    """
+    Read `rows` (tuples) in batches into one NumPy array per column;
+    `converters` gives (dtype, convert) per column.
+    """
+    parts = [[] for _ in converters]
+    while True:
+        batch = list(islice(rows, BATCH_SIZE))
+        if not batch:
+            break
+        for i, (dtype, convert) in enumerate(converters):
+            parts[i].append(np.fromiter((convert(row[i]) for row in batch), dtype=dtype, count=len(batch)))
+    return [
+        np.concatenate(chunks) if chunks else np.empty(0, dtype=dtype)
+        for chunks, (dtype, _) in zip(parts, converters)
+    ]
+
+
+def load_assets():
+    """(ids, category labels, created_at seconds) in id order."""
+    rows = iter_keyset(Asset.objects.all(), ('pk', 'asset_category', 'created_at'))
+    ids, categories, created = _load(rows, [
+        (np.int64, int),
+        (object, str),
+        (np.int64, _epoch),
+    ])
+    return ids, categories, created
+
+
+def load_intervals(start, end):
+    """(asset ids, start seconds, end seconds) of loans overlapping [start, end)."""
+    now = _epoch(end)
+    loans = AssetRequest.objects.filter(
+        status='approved',
+        assigned_asset__isnull=False,
+        approval_date__isnull=False,
+        approval_date__lt=end,
+    ).annotate(
+        returned_at=Max('returns__returned_date'),
+    ).filter(
+        Q(returned_at__isnull=True, is_fully_returned=False) | Q(returned_at__gte=start),
+    )
+    rows = iter_keyset(loans, ('assigned_asset_id', 'approval_date', 'returned_at'))
+    return _load(rows, [
+        (np.int64, int),
+        (np.int64, _epoch),
+        (np.int64, lambda value: _epoch(value) if value else now),
+    ])
+
+
+def _merge(asset_idx, starts, ends):
+    """
+    Merge overlapping intervals per asset. Returns (asset, start, end) of
+    the merged blocks, sorted by asset then start.
+    """
+    if not len(starts):
+        return asset_idx, starts, ends
+
+    order = np.lexsort((starts, asset_idx))
+    asset_idx, starts, ends = asset_idx[order], starts[order], ends[order]
+
+    # Running max of `end` within each asset: offset every asset far above
+    # the previous one so one global cummax never crosses a group boundary
+    span = int(ends.max()) + 1
+    reach = np.maximum.accumulate(asset_idx * span + ends) - asset_idx * span
+
+    new_block = np.ones(len(starts), dtype=bool)
+    new_block[1:] = (asset_idx[1:] != asset_idx[:-1]) | (starts[1:] > reach[:-1])
+    first = np.flatnonzero(new_block)
+    last = np.append(first[1:] - 1, len(starts) - 1)
+    return asset_idx[first], starts[first], reach[last]
+
+
+def _peaks(groups, starts, ends, n_groups):
+    """
+    Highest number of simultaneously open intervals per group, and when it
+    first happened. Ends sort before starts at the same instant, so
+    back-to-back loans do not count as overlapping.
+    """
+    times = np.concatenate([starts, ends])
+    deltas = np.concatenate([np.ones(len(starts), np.int64), -np.ones(len(ends), np.int64)])
+    group = np.concatenate([groups, groups])
+
+    order = np.lexsort((deltas, times, group))
+    times, deltas, group = times[order], deltas[order], group[order]
+    # Every group nets to zero, so one cumsum is the running count for each
+    running = np.cumsum(deltas)
+
+    peak = np.zeros(n_groups, dtype=np.int64)
+    peak_at = np.full(n_groups, -1, dtype=np.int64)
+    if not len(running):
+        return peak, peak_at
+
+    first = np.flatnonzero(np.r_[True, group[1:] != group[:-1]])
+    peak[group[first]] = np.maximum.reduceat(running, first)
+    # First position in each group that reaches the group's peak
+    hits = np.flatnonzero(running == peak[group])
+    hit_groups, first_hit = np.unique(group[hits], return_index=True)
+    peak_at[hit_groups] = times[hits[first_hit]]
+    return peak, peak_at
+
+
+def compute_utilization(days=DEFAULT_WINDOW_DAYS, now=None):
+    """
+    Utilization figures for the last `days` days. Returns a dict with the
+    per-asset arrays (`asset_*`), per-category summary rows, the idle gap
+    histogram and peak demand.
+    """
+    end = now or timezone.now()
+    start = end - datetime.timedelta(days=days)
+    window_start, window_end = _epoch(start), _epoch(end)
+
+    asset_ids, asset_categories, created = load_assets()
+    loan_assets, loan_starts, loan_ends = load_intervals(start, end)
+
+    # Asset ids -> dense positions (loans on since-deleted assets drop out)
+    position = np.searchsorted(asset_ids, loan_assets)
+    position = np.minimum(position, max(len(asset_ids) - 1, 0))
+    known = (asset_ids[position] == loan_assets) if len(asset_ids) else np.zeros(len(loan_assets), bool)
+
+    # Clip to the part of the window the asset existed in, as seconds
+    # from the window start
+    available_from = np.clip(created, window_start, window_end) - window_start
+    available = (window_end - window_start) - available_from
+    starts = np.maximum(np.clip(loan_starts, window_start, window_end) - window_start,
+                        available_from[position] if len(asset_ids) else 0)
+    ends = np.clip(loan_ends, window_start, window_end) - window_start
+    keep = known & (ends > starts)
+    idx, starts, ends = position[keep], starts[keep], ends[keep]
+
+    n_assets = len(asset_ids)
+    loans = np.bincount(idx, minlength=n_assets)
+
+    block_asset, block_start, block_end = _merge(idx, starts, ends)
+    on_loan = np.bincount(block_asset, weights=block_end - block_start, minlength=n_assets)
+
+    utilization = np.divide(on_loan, available, out=np.zeros(n_assets), where=available > 0)
+
+    # Idle gaps between consecutive loans of the same asset
+    same_asset = block_asset[1:] == block_asset[:-1]
+    gaps = (block_start[1:] - block_end[:-1])[same_asset] / DAY
+    edges = IDLE_BINS + [max(IDLE_BINS[-1] + 1, float(gaps.max()) + 1 if len(gaps) else 0)]
+    idle_counts, _ = np.histogram(gaps, bins=edges)
+
+    # Per category
+    labels, category_idx = np.unique(asset_categories.astype(str), return_inverse=True)
+    n_categories = len(labels)
+    category_on_loan = np.bincount(category_idx, weights=on_loan, minlength=n_categories)
+    category_available = np.bincount(category_idx, weights=available, minlength=n_categories)
+    category_assets = np.bincount(category_idx, minlength=n_categories)
+    category_loans = np.bincount(category_idx, weights=loans, minlength=n_categories)
+    category_peak, category_peak_at = _peaks(category_idx[block_asset], block_start, block_end, n_categories)
+
+    overall_peak, overall_peak_at = _peaks(np.zeros(len(block_asset), np.int64), block_start, block_end, 1)
+
+    def when(offset):
+        if offset < 0:
+            return None
+        return datetime.datetime.fromtimestamp(window_start + int(offset), tz=datetime.timezone.utc)
+
+    categories = []
+    for i, label in enumerate(labels):
+        categories.append({
+            'category': str(label),
+            'assets': int(category_assets[i]),
+            'loans': int(category_loans[i]),
+            'days_on_loan': round(float(category_on_loan[i]) / DAY, 1),
+            'utilization': round(100 * float(category_on_loan[i] / category_available[i]), 1)
+            if category_available[i] else 0.0,
+            'peak_demand': int(category_peak[i]),
+            'peak_at': when(category_peak_at[i]),
+        })
+
+    return {
+        'days': days,
+        'start': start,
+        'end': end,
+        'asset_ids': asset_ids,
+        'asset_loans': loans,
+        'asset_on_loan': on_loan,
+        'asset_available': available,
+        'asset_utilization': utilization,
+        'categories': categories,
+        'idle_histogram': [
+            {'label': f"{low}–{high} days" if high is not None else f"{low}+ days", 'count': int(count)}
+            for low, high, count in zip(IDLE_BINS, IDLE_BINS[1:] + [None], idle_counts)
+        ],
+        'idle_median_days': round(float(np.median(gaps)), 1) if len(gaps) else None,
+        'total_assets': int(n_assets),
+        'total_loans': int(loans.sum()),
+        'never_borrowed': int((loans == 0).sum()),
+        'mean_utilization': round(100 * float(on_loan.sum() / available.sum()), 1) if available.sum() else 0.0,
+        'peak_demand': int(overall_peak[0]),
+        'peak_at': when(overall_peak_at[0]),
+    }
+
+
+def utilization(days=DEFAULT_WINDOW_DAYS):
+    """`compute_utilization()` cached until the data version changes."""
+    key = f'assets:utilization:{days}:{data_version()}'
+    result = cache.get(key)
+    if result is None:
+        result = compute_utilization(days)
+        cache.set(key, result, CACHE_SECONDS)
+    return result
+
+
+def utilization_rows(result):
+    """Per-asset export rows, most utilized first."""
+    order = np.argsort(-result['asset_utilization'], kind='stable')
+    assets = Asset.objects.only('asset_category', 'model', 'serial_number')
+
+    for start in range(0, len(order), BATCH_SIZE):
+        chunk = order[start:start + BATCH_SIZE]
+        details = assets.in_bulk(result['asset_ids'][chunk].tolist())
+        for i in chunk:
+            asset = details.get(int(result['asset_ids'][i]))
+            if asset is None:
+                continue
+            yield [
+                asset.pk,
+                asset.asset_category,
+                asset.model or "-",
+                asset.serial_number or "-",
+                int(result['asset_loans'][i]),
+                round(float(result['asset_on_loan'][i]) / DAY, 1),
+                round(float(result['asset_available'][i]) / DAY, 1),
+                round(100 * float(result['asset_utilization'][i]), 1),
+            ]
+
+
+def utilization_csv(result):
+    """Stream the per-asset rows as CSV bytes."""
+    return _csv_chunks(UTILIZATION_COLUMNS, utilization_rows(result))
@@ -0,0 +1,108 @@
+"""
+Set-based bulk actions for Manage Assets.
+
+Each batch of ids is one `UPDATE ... WHERE id IN (...)` (or `DELETE`)
+instead of loading and saving every asset, and rows that point at deleted
+assets are detached with one statement per relation.
+"""
+from django.db import connections, models, transaction
+from django.utils import timezone
+
+from audit.models import ChangeEvent
+from audit.signals import FEED_MODELS
+from .models import Asset
+from .scan import scan_cache
+
+
+BATCH_SIZE = 500
+
+
+def batched(ids, size=BATCH_SIZE):
+    ids = list(ids)
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def bulk_update_assets(ids, **changes):
+    """Apply the same field changes to many assets. Returns rows updated."""
+    updated = 0
+    for batch in batched(ids):
+        with transaction.atomic():
+            existing = list(Asset.objects.filter(pk__in=batch).values_list('id', flat=True))
+            # .update() skips auto_now, so stamp updated_at explicitly
+            updated += Asset.objects.filter(pk__in=existing).update(
+                updated_at=timezone.now(), **changes
+            )
+            ChangeEvent.record(ChangeEvent.ASSET, existing)
+    scan_cache.clear()
+    return updated
+
+
+def delete_rows(model, ids):
+    """
+    `DELETE FROM <table> WHERE id IN (...)` for one batch of ids, without
+    Django's delete collector or signals. The caller has already dealt
+    with every relation pointing at these rows. Returns rows deleted.
+    """
+    if not ids:
+        return 0
+    db = model.objects.db
+    quote = connections[db].ops.quote_name
+    placeholders = ', '.join(['%s'] * len(ids))
+    with connections[db].cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(model._meta.db_table)} WHERE {quote(model._meta.pk.column)} IN ({placeholders})",
+            list(ids),
+        )
+        return cursor.rowcount
+
+
+def _detach_related(asset_ids):
+    """
+    Do the on_delete fan-out for a batch of assets in one statement per
+    relation: SET_NULL becomes a single UPDATE, CASCADE a queryset delete.
+    Archived rows only lose the pointer; their `updated_at` stays as archived.
+
+    Any other on_delete (PROTECT, RESTRICT, SET_DEFAULT, DO_NOTHING, ...)
+    raises before anything is written: the raw DELETE that follows would
+    otherwise fail on, or orphan, the rows behind it.
+    """
+    relations = Asset._meta.related_objects
+    for rel in relations:
+        if rel.on_delete not in (models.SET_NULL, models.CASCADE):
+            raise NotImplementedError(
+                f"Bulk delete cannot handle {rel.related_model.__name__}.{rel.field.name} "
+                f"(on_delete={getattr(rel.on_delete, '__name__', rel.on_delete)})."
+            )
+
+    for rel in relations:
+        related_model = rel.related_model
+        related_qs = related_model._base_manager.filter(**{f'{rel.field.name}__in': asset_ids})
+
+        if rel.on_delete is models.SET_NULL:
+            record_type = FEED_MODELS.get(related_model)
+            if record_type:
+                ChangeEvent.record(record_type, related_qs.values_list('pk', flat=True))
+            changes = {rel.field.name: None}
+            if (not getattr(related_model, 'is_archived', False)
+                    and any(f.name == 'updated_at' for f in related_model._meta.concrete_fields)):
+                changes['updated_at'] = timezone.now()
+            related_qs.update(**changes)
+
+        else:
+            related_qs.delete()
+
+
+def bulk_delete_assets(ids):
+    """Delete many assets. Returns rows deleted."""
+    deleted = 0
+    for batch in batched(ids):
+        with transaction.atomic():
+            existing = list(Asset.objects.filter(pk__in=batch).values_list('id', flat=True))
+            _detach_related(existing)
+            ChangeEvent.record(ChangeEvent.ASSET, existing, deleted=True)
+            # Relations are already handled above; skip the per-object
+            # collector and signals and issue one DELETE for the batch.
+            deleted += delete_rows(Asset, existing)
+    scan_cache.clear()
+    return deleted
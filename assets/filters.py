@@ -0,0 +1,44 @@
+from .listing import ListSpec
+from .models import Asset
+
+
+# Manage Assets sort options: key -> (label, ordering). The usage counters
+# are indexed, so sorting by popularity is an index scan, not a join.
+ASSET_SORTS = {
+    'newest': ("Newest first", ('-created_at',)),
+    'popular': ("Most borrowed", ('-times_borrowed', '-id')),
+    'least': ("Least borrowed", ('times_borrowed', 'id')),
+    'recent': ("Recently borrowed", ('-last_borrowed_at', '-id')),
+    'days': ("Most days on loan", ('-total_days_on_loan', '-id')),
+}
+USAGE_CHOICES = [('never', "Never borrowed"), ('borrowed', "Borrowed at least once")]
+USAGE_FILTERS = {
+    'never': {'times_borrowed': 0},
+    'borrowed': {'times_borrowed__gt': 0},
+}
+
+
+def _usage(assets, value):
+    return assets.filter(**USAGE_FILTERS[value]) if value in USAGE_FILTERS else assets
+
+
+ASSET_LIST = ListSpec(
+    Asset,
+    columns=[
+        'asset_category', 'model', 'serial_number', 'barcode', 'status', 'asset_condition',
+        'times_borrowed', 'total_days_on_loan',
+    ],
+    search=['asset_category', 'model', 'serial_number', 'barcode'],
+    filters={'status': 'status', 'condition': 'asset_condition', 'usage': _usage},
+    orderings=ASSET_SORTS,
+)
+
+
+def filter_assets(assets, search_query='', status_filter='all', condition_filter='all', usage_filter='all'):
+    """Apply the Manage Assets search box and dropdown filters to a queryset."""
+    return ASSET_LIST.filter(assets, {
+        'search': search_query,
+        'status': status_filter,
+        'condition': condition_filter,
+        'usage': usage_filter,
+    })
@@ -0,0 +1,199 @@
+"""
+Per-category demand forecasts for procurement planning.
+
+`run_forecast()` is a batch job (`manage.py forecast_demand`, scheduled
+weekly or nightly) that rewrites the CategoryForecast table; the admin
+dashboard only reads that table.
+
+The model, per category, on weekly request counts:
+
+1. Weekly bucketing: request timestamps are loaded into NumPy and binned
+   into a (category x week) matrix with one `bincount`.
+2. Seasonal baseline: each week of the year (1-53) gets a factor, its mean
+   count over the years of history divided by the overall mean, so term
+   starts and year-end lulls repeat. Factors are shrunk towards 1 when a
+   week of the year has been seen only a few times.
+3. Simple exponential smoothing of the deseasonalized series gives the
+   current level; week k ahead is forecast as level x its seasonal factor.
+4. Peak concurrent demand follows from Little's law: assets out at once =
+   approved loans per day x mean loan length in days, plus two standard
+   deviations of a Poisson count for the peak. It is compared with the
+   assets of that category in store and on loan now.
+"""
+import datetime
+import math
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Count, Max
+from django.utils import timezone
+
+from requests.models import AssetRequest
+from .analytics import DAY, _epoch, _load
+from .models import Asset, CategoryForecast
+from .reports import iter_keyset
+from .rollups import _start_of
+
+
+HISTORY_WEEKS = 156
+HORIZON_WEEKS = 8
+ALPHA = 0.3
+# Pseudo-observations of "no seasonal effect" blended into each week-of-year factor
+SEASONAL_PRIOR = 1.0
+WEEK = 7 * DAY
+IN_STOCK_STATUSES = ['available', 'returned']
+
+
+def _monday(day):
+    return day - datetime.timedelta(days=day.weekday())
+
+
+def load_history(start, end):
+    """
+    Requests created in [start, end): (category labels, created seconds,
+    approved flags, loan days). Loan days is NaN unless the request was
+    approved; open loans count up to `end`.
+    """
+    now = _epoch(end)
+    requests = AssetRequest.objects.filter(
+        created_at__gte=start, created_at__lt=end,
+    ).annotate(returned_at=Max('returns__returned_date'))
+    rows = iter_keyset(requests, ('asset_category', 'created_at', 'status', 'approval_date', 'returned_at'))
+
+    categories, created, approved, approved_at, returned_at = _load(rows, [
+        (object, str),
+        (np.int64, _epoch),
+        (bool, lambda status: status == 'approved'),
+        (np.int64, lambda value: _epoch(value) if value else -1),
+        (np.int64, lambda value: _epoch(value) if value else now),
+    ])
+    loan_days = np.where(approved & (approved_at >= 0), (returned_at - approved_at) / DAY, np.nan)
+    return categories, created, approved, loan_days
+
+
+def seasonal_factors(counts, week_of_year):
+    """(categories x 54) factors indexed by ISO week of year; 1 = average week."""
+    onehot = np.zeros((len(week_of_year), 54))
+    onehot[np.arange(len(week_of_year)), week_of_year] = 1
+    seen = onehot.sum(axis=0)                              # weeks observed per week of year
+    totals = counts @ onehot                               # requests per week of year
+
+    mean = counts.mean(axis=1, keepdims=True)
+    raw = np.divide(totals, seen * mean, out=np.ones_like(totals), where=(seen > 0) & (mean > 0))
+    return (seen * raw + SEASONAL_PRIOR) / (seen + SEASONAL_PRIOR)
+
+
+def smooth(series, alpha=ALPHA):
+    """Simple exponential smoothing along the last axis; returns the final level per row."""
+    level = series[:, :min(4, series.shape[1])].mean(axis=1)
+    for t in range(series.shape[1]):
+        level = alpha * series[:, t] + (1 - alpha) * level
+    return level
+
+
+def _stock():
+    """{category: (in stock, on loan)} right now."""
+    stock = {}
+    rows = Asset.objects.values('asset_category', 'status').annotate(n=Count('id'))
+    for row in rows:
+        in_stock, on_loan = stock.get(row['asset_category'], (0, 0))
+        if row['status'] in IN_STOCK_STATUSES:
+            in_stock += row['n']
+        elif row['status'] == 'borrowed':
+            on_loan += row['n']
+        stock[row['asset_category']] = (in_stock, on_loan)
+    return stock
+
+
+def run_forecast(history_weeks=HISTORY_WEEKS, horizon=HORIZON_WEEKS):
+    """Recompute every category's forecast. Returns the number of rows written."""
+    computed_at = timezone.now()
+    this_week = _monday(timezone.localdate())
+    first_week = this_week - datetime.timedelta(weeks=history_weeks)
+    origin = _epoch(_start_of(first_week))
+
+    categories, created, approved, loan_days = load_history(_start_of(first_week), _start_of(this_week))
+
+    labels = [key for key, _ in AssetRequest.CATEGORY_CHOICES]
+    labels += sorted(set(categories.tolist()) - set(labels))
+    if not len(created):
+        CategoryForecast.objects.all().delete()
+        return 0
+
+    # 1. (category x week) request counts
+    lookup = {label: i for i, label in enumerate(labels)}
+    category_idx = np.fromiter((lookup[c] for c in categories), dtype=np.int64, count=len(categories))
+    week_idx = (created - origin) // WEEK
+    counts = np.bincount(
+        category_idx * history_weeks + week_idx, minlength=len(labels) * history_weeks,
+    ).reshape(len(labels), history_weeks).astype(float)
+
+    # Ignore the weeks before the first request (the system was not in use)
+    counts = counts[:, int(week_idx.min()):]
+    weeks = [first_week + datetime.timedelta(weeks=i) for i in range(int(week_idx.min()), history_weeks)]
+    week_of_year = np.array([week.isocalendar()[1] for week in weeks])
+
+    # 2. Seasonal baseline, 3. smoothed level
+    factors = seasonal_factors(counts, week_of_year)
+    level = smooth(counts / factors[:, week_of_year])
+
+    # 4. Loans per request and mean loan length per category
+    n_requests = np.bincount(category_idx, minlength=len(labels))
+    n_approved = np.bincount(category_idx, weights=approved, minlength=len(labels))
+    approval_rate = np.divide(n_approved, n_requests, out=np.zeros(len(labels)), where=n_requests > 0)
+    has_loan = ~np.isnan(loan_days)
+    loan_total = np.bincount(category_idx[has_loan], weights=loan_days[has_loan], minlength=len(labels))
+    loan_count = np.bincount(category_idx[has_loan], minlength=len(labels))
+    mean_loan_days = np.divide(loan_total, loan_count, out=np.zeros(len(labels)), where=loan_count > 0)
+
+    stock = _stock()
+    rows = []
+    for k in range(horizon):
+        week = this_week + datetime.timedelta(weeks=k)
+        factor = factors[:, week.isocalendar()[1]]
+        expected = level * factor
+        concurrent = expected / 7 * approval_rate * mean_loan_days
+        for i, label in enumerate(labels):
+            peak = math.ceil(concurrent[i] + 2 * math.sqrt(concurrent[i])) if concurrent[i] > 0 else 0
+            in_stock, on_loan = stock.get(label, (0, 0))
+            rows.append(CategoryForecast(
+                asset_category=label,
+                week_start=week,
+                expected_requests=round(float(expected[i]), 2),
+                seasonal_factor=round(float(factor[i]), 3),
+                expected_peak_demand=peak,
+                available_stock=in_stock,
+                on_loan=on_loan,
+                shortfall=max(0, peak - in_stock - on_loan),
+                computed_at=computed_at,
+            ))
+
+    with transaction.atomic():
+        CategoryForecast.objects.all().delete()
+        CategoryForecast.objects.bulk_create(rows)
+    return len(rows)
+
+
+def dashboard_forecast():
+    """
+    Per-category summary of the stored forecast for the admin dashboard:
+    next week's requests, the highest peak over the horizon and the
+    matching shortfall.
+    """
+    summary = {}
+    for forecast in CategoryForecast.objects.filter(week_start__gte=_monday(timezone.localdate())):
+        entry = summary.get(forecast.asset_category)
+        if entry is None:
+            entry = summary[forecast.asset_category] = {
+                'category': forecast.asset_category,
+                'next_week': forecast.expected_requests,
+                'horizon_requests': 0,
+                'weeks': 0,
+                'peak': forecast,
+                'computed_at': forecast.computed_at,
+            }
+        entry['horizon_requests'] += forecast.expected_requests
+        entry['weeks'] += 1
+        if forecast.expected_peak_demand > entry['peak'].expected_peak_demand:
+            entry['peak'] = forecast
+    return list(summary.values())
@@ -1,5 +1,5 @@
 from django import forms
-from .models import Asset
+from .models import Asset, Stocktake
 
 class AssetForm(forms.ModelForm):
     asset_category = forms.ChoiceField(
@@ -49,3 +49,73 @@ class AssetForm(forms.ModelForm):
             'asset_category', 'model', 'serial_number', 'barcode', 'specification',
             'description', 'status', 'asset_condition'
         ]
+
+
+class BulkAssetActionForm(forms.Form):
+    ACTION_CHOICES = [
+        ('status', 'Change status'),
+        ('asset_condition', 'Change condition'),
+        ('asset_category', 'Change category'),
+        ('retire', 'Retire'),
+        ('delete', 'Delete'),
+    ]
+
+    action = forms.ChoiceField(choices=ACTION_CHOICES)
+    value = forms.CharField(required=False)
+    selected = forms.CharField(required=False)   # comma-separated asset ids
+    apply_to_all = forms.BooleanField(required=False)   # every asset matching the filters
+
+    VALUE_CHOICES = {
+        'status': Asset.STATUS_CHOICES,
+        'asset_condition': Asset.CONDITION_CHOICES,
+        'asset_category': Asset.CATEGORY_CHOICES,
+    }
+
+    def clean_selected(self):
+        raw = self.cleaned_data['selected']
+        try:
+            return [int(pk) for pk in raw.split(',') if pk.strip()]
+        except ValueError:
+            raise forms.ValidationError("Invalid asset selection.")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        action = cleaned_data.get('action')
+        value = cleaned_data.get('value')
+
+        if action in self.VALUE_CHOICES:
+            valid = [key for key, _ in self.VALUE_CHOICES[action]]
+            if value not in valid:
+                raise forms.ValidationError("Select a valid value for this action.")
+
+        if not cleaned_data.get('selected') and not cleaned_data.get('apply_to_all'):
+            raise forms.ValidationError("Select at least one asset.")
+
+        return cleaned_data
+
+
+class StocktakeForm(forms.ModelForm):
+    class Meta:
+        model = Stocktake
+        fields = ['name', 'category']
+        widgets = {
+            'name': forms.TextInput(attrs={'placeholder': 'e.g. End of term 2026'}),
+        }
+
+
+class StocktakeScanForm(forms.Form):
+    location = forms.CharField(
+        max_length=100,
+        widget=forms.TextInput(attrs={'placeholder': 'e.g. Store Room A'})
+    )
+    codes = forms.CharField(
+        required=False,
+        widget=forms.Textarea(attrs={'rows': 8, 'placeholder': 'Scan barcodes, one per line...'})
+    )
+    file = forms.FileField(required=False, help_text="Or upload a text/CSV file with one code per line.")
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get('codes') and not cleaned_data.get('file'):
+            raise forms.ValidationError("Scan some codes or upload a file.")
+        return cleaned_data
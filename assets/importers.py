@@ -0,0 +1,231 @@
+"""
+Bulk asset import from CSV / XLSX.
+
+The file is streamed (csv module / openpyxl read-only mode), validated in
+chunks, checked for serial/barcode clashes with one `IN` query per chunk
+and inserted with `bulk_create`. Each chunk commits together with the
+import's progress counter and its error rows, so a failed import resumes
+exactly after the last committed chunk.
+"""
+import csv
+import io
+from itertools import islice
+
+import openpyxl
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from audit.models import ChangeEvent
+from .models import Asset, AssetImportError
+from .scan import scan_cache
+
+
+CHUNK_SIZE = 1000
+
+IMPORT_FIELDS = [
+    'asset_category', 'model', 'serial_number', 'barcode',
+    'specification', 'description', 'status', 'asset_condition',
+]
+
+# Header aliases accepted in uploaded files
+HEADER_ALIASES = {
+    'category': 'asset_category',
+    'asset': 'asset_category',
+    'serial': 'serial_number',
+    'serial_no': 'serial_number',
+    'condition': 'asset_condition',
+}
+
+CHOICE_FIELDS = {
+    'asset_category': Asset.CATEGORY_CHOICES,
+    'status': Asset.STATUS_CHOICES,
+    'asset_condition': Asset.CONDITION_CHOICES,
+}
+
+
+def normalize_header(value):
+    key = str(value or '').strip().lower().replace(' ', '_')
+    return HEADER_ALIASES.get(key, key)
+
+
+def normalize_choice(field, value):
+    """Accept either the stored key ('laptop') or the label ('Laptop')."""
+    for key, label in CHOICE_FIELDS[field]:
+        if value.lower() in (key, label.lower()):
+            return key
+    return value
+
+
+def read_rows(asset_import):
+    """Yield one dict per data row, keyed by model field name."""
+    name = asset_import.file.name.lower()
+
+    if name.endswith('.xlsx'):
+        with asset_import.file.open('rb') as fh:
+            wb = openpyxl.load_workbook(fh, read_only=True, data_only=True)
+            try:
+                rows = wb.active.iter_rows(values_only=True)
+                headers = [normalize_header(h) for h in next(rows, [])]
+                for values in rows:
+                    yield dict(zip(headers, values))
+            finally:
+                wb.close()
+
+    elif name.endswith('.csv'):
+        with asset_import.file.open('rb') as fh:
+            text = io.TextIOWrapper(fh, encoding='utf-8-sig', newline='')
+            reader = csv.reader(text)
+            headers = [normalize_header(h) for h in next(reader, [])]
+            for values in reader:
+                yield dict(zip(headers, values))
+
+    else:
+        raise ValueError("Unsupported file type. Upload a .csv or .xlsx file.")
+
+
+def clean_row(row):
+    """Turn a raw row into unsaved Asset kwargs, or raise ValidationError."""
+    data = {}
+    for field in IMPORT_FIELDS:
+        value = row.get(field)
+        if isinstance(value, float) and value.is_integer():
+            value = int(value)  # Excel stores numeric serials as floats
+        value = '' if value is None else str(value).strip()
+        if value and field in CHOICE_FIELDS:
+            value = normalize_choice(field, value)
+        data[field] = value or None
+
+    data['status'] = data['status'] or 'available'
+    data['asset_condition'] = data['asset_condition'] or 'good'
+
+    if not data['asset_category']:
+        raise ValidationError("Asset category is required.")
+    if not data['serial_number'] and not data['barcode']:
+        raise ValidationError("Either a serial number or a barcode is required.")
+
+    # Field-level checks only; uniqueness is checked in bulk per chunk
+    Asset(**data).full_clean(validate_unique=False, validate_constraints=False)
+    return data
+
+
+def import_chunk(asset_import, numbered_rows):
+    """Validate and insert one chunk of `(row_number, row)` pairs."""
+    errors = []
+    candidates = []
+
+    for row_number, row in numbered_rows:
+        if not any(value not in (None, '') for value in row.values()):
+            continue  # blank line
+        try:
+            candidates.append((row_number, clean_row(row)))
+        except ValidationError as exc:
+            errors.append(AssetImportError(
+                asset_import=asset_import,
+                row_number=row_number,
+                serial_number=str(row.get('serial_number') or '')[:150] or None,
+                barcode=str(row.get('barcode') or '')[:150] or None,
+                message='; '.join(exc.messages),
+            ))
+
+    serials = {data['serial_number'] for _, data in candidates if data['serial_number']}
+    barcodes = {data['barcode'] for _, data in candidates if data['barcode']}
+
+    # One IN lookup per unique column for the whole chunk
+    taken_serials = set(
+        Asset.objects.filter(serial_number__in=serials).values_list('serial_number', flat=True)
+    )
+    taken_barcodes = set(
+        Asset.objects.filter(barcode__in=barcodes).values_list('barcode', flat=True)
+    )
+
+    new_assets = []
+    for row_number, data in candidates:
+        problems = []
+        if data['serial_number'] and data['serial_number'] in taken_serials:
+            problems.append(f"Serial number {data['serial_number']} already exists.")
+        if data['barcode'] and data['barcode'] in taken_barcodes:
+            problems.append(f"Barcode {data['barcode']} already exists.")
+
+        if problems:
+            errors.append(AssetImportError(
+                asset_import=asset_import,
+                row_number=row_number,
+                serial_number=data['serial_number'],
+                barcode=data['barcode'],
+                message=' '.join(problems),
+            ))
+            continue
+
+        # Later rows in the same file clash with this one
+        if data['serial_number']:
+            taken_serials.add(data['serial_number'])
+        if data['barcode']:
+            taken_barcodes.add(data['barcode'])
+
+        new_assets.append(Asset(created_by=asset_import.created_by, **data))
+
+    with transaction.atomic():
+        created = Asset.objects.bulk_create(new_assets)
+        AssetImportError.objects.bulk_create(errors)
+
+        ids = [asset.pk for asset in created if asset.pk]
+        if len(ids) < len(created):
+            # MySQL does not return primary keys from bulk inserts
+            ids = Asset.objects.filter(
+                Q(serial_number__in=[a.serial_number for a in created if a.serial_number]) |
+                Q(barcode__in=[a.barcode for a in created if a.barcode])
+            ).values_list('id', flat=True)
+        ChangeEvent.record(ChangeEvent.ASSET, ids)
+
+        asset_import.rows_processed += len(numbered_rows)
+        asset_import.rows_imported += len(created)
+        asset_import.rows_failed += len(errors)
+        asset_import.save(update_fields=['rows_processed', 'rows_imported', 'rows_failed'])
+
+    # New codes may have been cached as "unknown" by earlier scans
+    scan_cache.clear()
+
+
+def run_import(asset_import, chunk_size=CHUNK_SIZE, progress=None):
+    """
+    Process an import from its resume point to the end of the file.
+
+    `progress`, if given, is called with the import after every chunk.
+    """
+    asset_import.status = 'running'
+    asset_import.last_error = None
+    asset_import.save(update_fields=['status', 'last_error'])
+
+    try:
+        # Header is row 1; data rows start at 2 (as shown in Excel)
+        rows = enumerate(read_rows(asset_import), start=2)
+        rows = islice(rows, asset_import.rows_processed, None)
+
+        while True:
+            chunk = list(islice(rows, chunk_size))
+            if not chunk:
+                break
+            import_chunk(asset_import, chunk)
+            if progress:
+                progress(asset_import)
+
+    except Exception as exc:
+        asset_import.status = 'failed'
+        asset_import.last_error = str(exc)
+        asset_import.save(update_fields=['status', 'last_error'])
+        raise
+
+    asset_import.status = 'completed'
+    asset_import.finished_at = timezone.now()
+    asset_import.save(update_fields=['status', 'finished_at'])
+    return asset_import
+
+
+def write_error_report(asset_import, out):
+    """Write the import's rejected rows as CSV to a file-like object."""
+    writer = csv.writer(out)
+    writer.writerow(['Row', 'Serial Number', 'Barcode', 'Error'])
+    for error in asset_import.errors.iterator():
+        writer.writerow([error.row_number, error.serial_number or '', error.barcode or '', error.message])
@@ -0,0 +1,86 @@
+"""Background job handlers (see jobs.queue)."""
+import os
+import tempfile
+
+from django.core.files import File
+
+from jobs.queue import handler
+
+from .importers import run_import
+from .models import AssetImport, ReportArtifact
+from .parallel_export import PARALLEL_MIN_ROWS, export_request_summary
+from .reports import report_filename, request_summary_queryset, write_report
+
+
+@handler('assets.import')
+def import_assets(job, ctx):
+    asset_import = AssetImport.objects.get(pk=job.payload['import_id'])
+    if asset_import.status == 'completed':
+        return {'rows_imported': asset_import.rows_imported}
+
+    run_import(
+        asset_import,
+        progress=lambda imp: ctx.progress(message=f"{imp.rows_processed} rows processed"),
+    )
+    return {
+        'rows_imported': asset_import.rows_imported,
+        'rows_failed': asset_import.rows_failed,
+    }
+
+
+@handler('assets.export_report')
+def export_report(job, ctx):
+    report_type = job.payload['report_type']
+    filters = job.payload.get('filters', {})
+    fmt = job.payload.get('format', 'xlsx')
+
+    ctx.progress(10, "Building report")
+    filename = report_filename(report_type, filters, extension=fmt)
+    with ctx.open_artifact(filename) as out:
+        write_report(report_type, filters, fmt, out)
+    return {'filename': filename}
+
+
+def _use_parallel(report_type, filters):
+    """Large request summaries are worth the process pool start-up."""
+    return (
+        report_type == 'request_summary'
+        and (os.cpu_count() or 1) > 1
+        and sum(request_summary_queryset(filters, archived).count() for archived in (False, True)) >= PARALLEL_MIN_ROWS
+    )
+
+
+@handler('assets.report_artifact')
+def build_report_artifact(job, ctx):
+    artifact = ReportArtifact.objects.get(pk=job.payload['artifact_id'])
+    if artifact.file:
+        return {'artifact_id': artifact.pk}
+
+    with tempfile.TemporaryFile() as tmp:
+        if artifact.file_format == 'xlsx' and _use_parallel(artifact.report_type, artifact.filters):
+            export_request_summary(
+                artifact.filters, tmp,
+                progress=lambda done, total: ctx.progress(done * 95 // total, f"Shard {done} of {total}"),
+            )
+        else:
+            ctx.progress(10, "Building report")
+            write_report(artifact.report_type, artifact.filters, artifact.file_format, tmp)
+
+        ctx.progress(95, "Saving file")
+        tmp.seek(0)
+        filename = report_filename(artifact.report_type, artifact.filters, extension=artifact.file_format)
+        artifact.file.save(filename, File(tmp))
+
+    # Older versions of the same report can no longer be served
+    stale = ReportArtifact.objects.filter(
+        report_type=artifact.report_type,
+        file_format=artifact.file_format,
+        filters_hash=artifact.filters_hash,
+        data_version__lt=artifact.data_version,
+    )
+    for old in stale:
+        if old.file:  # leave in-flight builds alone
+            old.file.delete(save=False)
+            old.delete()
+
+    return {'artifact_id': artifact.pk}
@@ -0,0 +1,164 @@
+"""
+Declarative Manage list pages.
+
+A `ListSpec` declares what a list page shows: the columns its table
+renders, the fields the search box looks in, the dropdown filters and the
+sort options. The admin and staff pages of a list share one spec and only
+differ in template.
+
+The query follows the declaration: `.only()` gets exactly the declared
+columns and `select_related()` exactly the relations they cross, so a list
+never loads `specification`/`description` or joins a table it does not
+render. A column is a field path as used in the template
+(`user__username` for `req.user.username`); naming a foreign key itself
+(`assigned_asset`) loads only its id, without a join. Pages are counted
+with `EstimatedCountPaginator`.
+
+A spec with an `archive` model (same field names, see `requests.archive`)
+reads only the hot table unless `?history=1` is given; then hot and
+archived rows are paged together through one `UNION ALL` of their sort
+keys, and only the rows on the page are loaded from each table.
+"""
+from django.db.models import Q, Value
+
+from .paginator import EstimatedCountPaginator
+
+
+ALL = 'all'
+
+
+def projection(model, columns):
+    """`(only_fields, select_related)` for the given column paths."""
+    only, related = [], []
+    for path in columns:
+        parts = path.split('__')
+        opts = model._meta
+        for i, part in enumerate(parts[:-1]):
+            field = opts.get_field(part)
+            prefix = '__'.join(parts[:i + 1])
+            if prefix not in related:
+                related.append(prefix)
+            opts = field.related_model._meta
+        only.append(path)
+    return only, related
+
+
+class HistoryRows:
+    """
+    Hot and archived rows as one ordered, sliceable sequence for a
+    paginator. Rows from the archive have `is_archived` set.
+    """
+
+    def __init__(self, hot, archived, ordering):
+        fields = [field.lstrip('-') for field in ordering]
+        if 'pk' not in fields and 'id' not in fields:
+            fields.append('pk')
+        self.pk_index = fields.index('pk') if 'pk' in fields else fields.index('id')
+        self.hot, self.archived = hot, archived
+        self.keys = hot.order_by().values_list(*fields, Value(False)).union(
+            archived.order_by().values_list(*fields, Value(True)), all=True,
+        ).order_by(*ordering)
+
+    def __len__(self):
+        return self.keys.count()
+
+    def __getitem__(self, index):
+        keys = list(self.keys[index])
+        hot_ids = [key[self.pk_index] for key in keys if not key[-1]]
+        archived_ids = [key[self.pk_index] for key in keys if key[-1]]
+        hot = self.hot.in_bulk(hot_ids) if hot_ids else {}
+        archived = self.archived.in_bulk(archived_ids) if archived_ids else {}
+        return [(archived if key[-1] else hot)[key[self.pk_index]] for key in keys]
+
+
+class ListSpec:
+    """
+    One Manage list.
+
+    - `columns`: field paths the table renders (the primary key is implied)
+    - `search`: fields matched with `icontains` by the `search` parameter
+    - `filters`: query-string parameter -> field lookup, or a callable
+      `(queryset, value) -> queryset`; the value 'all' means no filter
+    - `orderings`: sort key -> (label, order_by fields); the first is the
+      default, and the `sort` parameter is offered when there are several
+    - `archive`: optional cold-table model, read only for `history=1`
+    """
+
+    def __init__(self, model, columns, search=(), filters=None, orderings=None, per_page=10, archive=None):
+        self.model = model
+        self.archive = archive
+        self.columns = tuple(columns)
+        self.search = tuple(search)
+        self.filters = dict(filters or {})
+        self.orderings = dict(orderings or {'default': ("Default", ('-pk',))})
+        self.per_page = per_page
+        self.projections = {m: projection(m, self.columns) for m in (model, archive) if m is not None}
+
+    def params(self, data):
+        """The search / filter / sort / history values from a QueryDict or dict."""
+        values = {'search': (data.get('search') or '').strip()}
+        for param in self.filters:
+            values[param] = data.get(param) or ALL
+        sort = data.get('sort')
+        values['sort'] = sort if sort in self.orderings else next(iter(self.orderings))
+        values['history'] = self.archive is not None and data.get('history') == '1'
+        return values
+
+    def filter(self, queryset, values):
+        """Apply the search box and the filters (not the ordering)."""
+        term = values.get('search')
+        if term and self.search:
+            query = Q()
+            for field in self.search:
+                query |= Q(**{f'{field}__icontains': term})
+            queryset = queryset.filter(query)
+
+        for param, lookup in self.filters.items():
+            value = values.get(param, ALL)
+            if value == ALL:
+                continue
+            queryset = lookup(queryset, value) if callable(lookup) else queryset.filter(**{lookup: value})
+        return queryset
+
+    def ordering(self, values):
+        _, ordering = self.orderings.get(values.get('sort'), next(iter(self.orderings.values())))
+        return ordering
+
+    def queryset(self, values, model=None, **scope):
+        """
+        The projected, filtered and ordered rows of `model` (default: the
+        hot table), narrowed by the `scope` lookups (e.g. `user=...`).
+        """
+        model = model or self.model
+        only, related = self.projections[model]
+        queryset = model.objects.filter(**scope)
+        if related:
+            queryset = queryset.select_related(*related)
+        queryset = queryset.only(*only)
+        return self.filter(queryset, values).order_by(*self.ordering(values))
+
+    def rows(self, values, **scope):
+        """The hot rows, or hot and archived rows together for `history`."""
+        rows = self.queryset(values, **scope)
+        if values.get('history'):
+            rows = HistoryRows(rows, self.queryset(values, self.archive, **scope), self.ordering(values))
+        return rows
+
+    def page(self, request, **scope):
+        """
+        Template context for one page: `page_obj`, `search_query`,
+        `<param>_filter`, `sort` and `history`.
+        """
+        values = self.params(request.GET)
+        paginator = EstimatedCountPaginator(self.rows(values, **scope), self.per_page)
+        context = {
+            'page_obj': paginator.get_page(request.GET.get('page')),
+            'search_query': values['search'],
+            'sort': values['sort'],
+            'sort_choices': [(key, label) for key, (label, _) in self.orderings.items()],
+            'history': values['history'],
+            'has_history': self.archive is not None,
+        }
+        for param in self.filters:
+            context[f'{param}_filter'] = values[param]
+        return context
@@ -0,0 +1,36 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from assets.parallel_export import FORMATS, export_request_summary
+
+
+class Command(BaseCommand):
+    help = "Export the request summary report using a pool of processes (one shard of ids each)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('output', help="File to write (.xlsx, or .zip for --format csv.zip).")
+        parser.add_argument('--format', choices=FORMATS, default='xlsx')
+        parser.add_argument('--workers', type=int, default=None,
+                            help="Worker processes (default: number of CPUs).")
+        parser.add_argument('--start-date', help="YYYY-MM-DD")
+        parser.add_argument('--end-date', help="YYYY-MM-DD")
+        parser.add_argument('--username', help="Only requests by matching usernames.")
+
+    def handle(self, *args, **options):
+        filters = {
+            key: options[key]
+            for key in ('start_date', 'end_date', 'username')
+            if options[key]
+        }
+
+        started = time.monotonic()
+        with open(options['output'], 'wb') as out:
+            shards = export_request_summary(
+                filters, out, fmt=options['format'], workers=options['workers'],
+                progress=lambda done, total: self.stdout.write(f"  shard {done}/{total}"),
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Wrote {options['output']} from {shards} shards in {time.monotonic() - started:.1f}s."
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from assets.forecast import HISTORY_WEEKS, HORIZON_WEEKS, run_forecast
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the per-category demand forecasts shown on the admin dashboard. "
+        "Schedule it (e.g. cron nightly or weekly)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--history-weeks', type=int, default=HISTORY_WEEKS,
+                            help=f"Weeks of request history to learn from (default {HISTORY_WEEKS}).")
+        parser.add_argument('--horizon', type=int, default=HORIZON_WEEKS,
+                            help=f"Weeks to forecast, starting with this one (default {HORIZON_WEEKS}).")
+
+    def handle(self, *args, **options):
+        if options['history_weeks'] < 1 or options['horizon'] < 1:
+            raise CommandError("--history-weeks and --horizon must be at least 1.")
+
+        rows = run_forecast(options['history_weeks'], options['horizon'])
+        self.stdout.write(self.style.SUCCESS(f"Wrote {rows} forecast rows."))
@@ -0,0 +1,43 @@
+import os
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from assets.importers import run_import
+from assets.models import AssetImport
+
+
+class Command(BaseCommand):
+    help = "Bulk-import assets from a CSV or XLSX file, or resume a failed import."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help="CSV/XLSX file to import.")
+        parser.add_argument('--resume', type=int, metavar='IMPORT_ID',
+                            help="Resume an earlier import from its last committed row.")
+        parser.add_argument('--chunk-size', type=int, default=1000)
+
+    def handle(self, *args, **options):
+        if options['resume']:
+            try:
+                asset_import = AssetImport.objects.get(pk=options['resume'])
+            except AssetImport.DoesNotExist:
+                raise CommandError(f"Import #{options['resume']} does not exist.")
+        elif options['path']:
+            with open(options['path'], 'rb') as fh:
+                asset_import = AssetImport(status='pending')
+                asset_import.file.save(os.path.basename(options['path']), File(fh))
+        else:
+            raise CommandError("Give a file path or --resume IMPORT_ID.")
+
+        try:
+            run_import(asset_import, chunk_size=options['chunk_size'])
+        except Exception as exc:
+            raise CommandError(
+                f"Import #{asset_import.pk} stopped after {asset_import.rows_processed} rows: {exc}. "
+                f"Run again with --resume {asset_import.pk}."
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Import #{asset_import.pk}: {asset_import.rows_imported} assets added, "
+            f"{asset_import.rows_failed} rows rejected."
+        ))
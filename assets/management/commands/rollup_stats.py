@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from assets.reports import parse_date
+from assets.rollups import backfill, update_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Update the daily per-category report rollups from the change feed. "
+        "Schedule it (e.g. cron every 10 minutes); use --backfill once to build history."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--backfill', action='store_true',
+                            help="Rebuild every day in a range instead of following the change feed.")
+        parser.add_argument('--start', help="Backfill from this day, YYYY-MM-DD (default: first request).")
+        parser.add_argument('--end', help="Backfill up to this day, YYYY-MM-DD (default: today).")
+
+    def handle(self, *args, **options):
+        if not options['backfill']:
+            days, last_event_id = update_rollups()
+            self.stdout.write(self.style.SUCCESS(
+                f"Recomputed {days} days (change feed at #{last_event_id})."
+            ))
+            return
+
+        start, end = parse_date(options['start']), parse_date(options['end'])
+        if (options['start'] and not start) or (options['end'] and not end):
+            raise CommandError("Dates must be YYYY-MM-DD.")
+
+        rows = backfill(start, end)
+        self.stdout.write(self.style.SUCCESS(f"Backfill wrote {rows} rollup rows."))
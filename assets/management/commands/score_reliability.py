@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from assets.reliability import score_assets
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute asset reliability scores from return-condition history. "
+        "Schedule it (e.g. cron nightly)."
+    )
+
+    def handle(self, *args, **options):
+        scored = score_assets()
+        self.stdout.write(self.style.SUCCESS(f"Scored {scored} assets."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0009_rename_asset_name_asset_asset_category'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:36
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0011_assetimport_assetimporterror'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Stocktake',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('category', models.CharField(blank=True, choices=[('laptop', 'Laptop'), ('desktop', 'Desktop'), ('printer', 'Printer'), ('projector', 'Projector')], help_text='Limit the expected set to one category (blank = all).', max_length=50, null=True)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('reconciled', 'Reconciled')], default='open', max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('reconciled_at', models.DateTimeField(blank=True, null=True)),
+                ('scan_count', models.PositiveIntegerField(default=0)),
+                ('missing_count', models.PositiveIntegerField(default=0)),
+                ('unexpected_count', models.PositiveIntegerField(default=0)),
+                ('unknown_count', models.PositiveIntegerField(default=0)),
+                ('started_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.CreateModel(
+            name='StocktakeScan',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('location', models.CharField(max_length=100)),
+                ('code', models.CharField(max_length=150)),
+                ('scanned_at', models.DateTimeField(auto_now_add=True)),
+                ('stocktake', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scans', to='assets.stocktake')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='StocktakeDiscrepancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('missing', 'Expected but not seen'), ('unexpected', 'Seen but borrowed/retired'), ('unknown', 'Unknown barcode')], max_length=20)),
+                ('code', models.CharField(blank=True, max_length=150, null=True)),
+                ('location', models.CharField(blank=True, max_length=100, null=True)),
+                ('asset_status', models.CharField(blank=True, max_length=20, null=True)),
+                ('asset', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='stocktake_discrepancies', to='assets.asset')),
+                ('stocktake', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='discrepancies', to='assets.stocktake')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['stocktake', 'kind'], name='stocktake_diff_kind_idx')],
+            },
+        ),
+    ]
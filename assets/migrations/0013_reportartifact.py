@@ -0,0 +1,34 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:45
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0012_stocktake_stocktakescan_stocktakediscrepancy'),
+        ('jobs', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportArtifact',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('report_type', models.CharField(max_length=50)),
+                ('filters_hash', models.CharField(max_length=64)),
+                ('filters', models.JSONField(blank=True, default=dict)),
+                ('data_version', models.BigIntegerField()),
+                ('file', models.FileField(blank=True, null=True, upload_to='reports/%Y/%m/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+                ('job', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_artifacts', to='jobs.job')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('report_type', 'filters_hash', 'data_version'), name='unique_report_artifact')],
+            },
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:48
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0013_reportartifact'),
+        ('jobs', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='reportartifact',
+            name='unique_report_artifact',
+        ),
+        migrations.AddField(
+            model_name='reportartifact',
+            name='file_format',
+            field=models.CharField(default='xlsx', max_length=20),
+        ),
+        migrations.AddConstraint(
+            model_name='reportartifact',
+            constraint=models.UniqueConstraint(fields=('report_type', 'file_format', 'filters_hash', 'data_version'), name='unique_report_artifact'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0014_reportartifact_file_format'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RollupCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+                ('last_event_id', models.BigIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyCategoryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('asset_category', models.CharField(max_length=50)),
+                ('requests_created', models.PositiveIntegerField(default=0)),
+                ('requests_approved', models.PositiveIntegerField(default=0)),
+                ('requests_rejected', models.PositiveIntegerField(default=0)),
+                ('requests_cancelled', models.PositiveIntegerField(default=0)),
+                ('returns', models.PositiveIntegerField(default=0)),
+                ('assets_borrowed', models.PositiveIntegerField(default=0)),
+                ('approve_seconds_total', models.BigIntegerField(default=0)),
+                ('approve_count', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['day', 'asset_category'],
+                'constraints': [models.UniqueConstraint(fields=('day', 'asset_category'), name='unique_daily_category_stats')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:55
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0015_daily_category_stats'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CategoryForecast',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('asset_category', models.CharField(max_length=50)),
+                ('week_start', models.DateField()),
+                ('expected_requests', models.FloatField(default=0)),
+                ('seasonal_factor', models.FloatField(default=1)),
+                ('expected_peak_demand', models.PositiveIntegerField(default=0)),
+                ('available_stock', models.PositiveIntegerField(default=0)),
+                ('on_loan', models.PositiveIntegerField(default=0)),
+                ('shortfall', models.PositiveIntegerField(default=0)),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'ordering': ['asset_category', 'week_start'],
+                'constraints': [models.UniqueConstraint(fields=('asset_category', 'week_start'), name='unique_category_forecast')],
+            },
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0016_category_forecast'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AssetReliability',
+            fields=[
+                ('asset', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='reliability', serialize=False, to='assets.asset')),
+                ('returns', models.PositiveIntegerField(default=0)),
+                ('damaged', models.PositiveIntegerField(default=0)),
+                ('lost', models.PositiveIntegerField(default=0)),
+                ('damage_rate', models.FloatField(default=0)),
+                ('mean_condition', models.FloatField(blank=True, null=True)),
+                ('trend', models.FloatField(blank=True, null=True)),
+                ('model_returns', models.PositiveIntegerField(default=0)),
+                ('model_damage_rate', models.FloatField(default=0)),
+                ('score', models.FloatField(db_index=True)),
+                ('last_returned_at', models.DateTimeField(blank=True, null=True)),
+                ('computed_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_current_loans(apps, schema_editor):
+    Asset = apps.get_model('assets', 'Asset')
+    AssetRequest = apps.get_model('requests', 'AssetRequest')
+    open_loans = AssetRequest.objects.filter(status='approved', is_fully_returned=False)
+    latest = open_loans.filter(assigned_asset=OuterRef('pk')).order_by('-approval_date', '-id')
+    Asset.objects.filter(
+        pk__in=open_loans.filter(assigned_asset__isnull=False).values('assigned_asset_id'),
+    ).update(
+        current_loan=Subquery(latest.values('id')[:1]),
+        current_holder=Subquery(latest.values('user_id')[:1]),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0017_asset_reliability'),
+        ('requests', '0011_rollup_date_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='current_holder',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='held_assets', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='current_loan',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='requests.assetrequest'),
+        ),
+        migrations.RunPython(backfill_current_loans, migrations.RunPython.noop),
+    ]
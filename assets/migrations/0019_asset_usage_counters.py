@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0018_asset_current_loan'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='last_borrowed_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='times_borrowed',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+        migrations.AddField(
+            model_name='asset',
+            name='total_days_on_loan',
+            field=models.PositiveIntegerField(db_index=True, default=0),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0020_asset_created_at_index'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='asset',
+            name='model',
+            field=models.CharField(blank=True, db_index=True, max_length=100, null=True),
+        ),
+    ]
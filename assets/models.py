@@ -29,13 +29,208 @@ class Asset(models.Model):
         choices=CATEGORY_CHOICES,
         default='laptop'
     )
-    model = models.CharField(max_length=100, blank=True, null=True)
+    model = models.CharField(max_length=100, blank=True, null=True, db_index=True)
     serial_number = models.CharField(max_length=150, unique=True, blank=True, null=True)
     barcode = models.CharField(max_length=150, unique=True, blank=True, null=True)
     specification = models.CharField(max_length=255, blank=True, null=True)
     description = models.CharField(max_length=255, blank=True, null=True)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='available')
     asset_condition = models.CharField(max_length=20, choices=CONDITION_CHOICES, default='good')
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL
+    )
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    # Open loan and its borrower, kept in step by the approve and return
+    # paths (checked by `manage.py check_current_loans`)
+    current_loan = models.ForeignKey(
+        'requests.AssetRequest',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='+'
+    )
+    current_holder = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='held_assets'
+    )
+
+    # Usage counters, kept up to date by the approve and return paths
+    # (rebuilt by `manage.py recompute_usage`)
+    times_borrowed = models.PositiveIntegerField(default=0, db_index=True)
+    last_borrowed_at = models.DateTimeField(null=True, blank=True, db_index=True)
+    total_days_on_loan = models.PositiveIntegerField(default=0, db_index=True)
+
+    def __str__(self):
+        return f"{self.asset_category} ({self.model})"
+
+
+# ============================================================
+# BULK IMPORT
+# ============================================================
+class AssetImport(models.Model):
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('completed', 'Completed'),
+        ('failed', 'Failed'),
+    ]
+
+    file = models.FileField(upload_to='imports/')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+
+    # Resume point: data rows (after the header) already committed
+    rows_processed = models.PositiveIntegerField(default=0)
+    rows_imported = models.PositiveIntegerField(default=0)
+    rows_failed = models.PositiveIntegerField(default=0)
+    last_error = models.TextField(blank=True, null=True)
+
+    created_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"Import #{self.pk} ({self.status})"
+
+    class Meta:
+        ordering = ['-created_at']
+
+
+class AssetImportError(models.Model):
+    asset_import = models.ForeignKey(
+        AssetImport,
+        on_delete=models.CASCADE,
+        related_name='errors'
+    )
+    row_number = models.PositiveIntegerField()
+    serial_number = models.CharField(max_length=150, blank=True, null=True)
+    barcode = models.CharField(max_length=150, blank=True, null=True)
+    message = models.TextField()
+
+    class Meta:
+        ordering = ['row_number']
+
+
+# ============================================================
+# STOCKTAKE (physical inventory audit)
+# ============================================================
+class Stocktake(models.Model):
+    STATUS_CHOICES = [
+        ('open', 'Open'),
+        ('reconciled', 'Reconciled'),
+    ]
+
+    # Assets expected on the shelves during a stocktake
+    IN_STORE_STATUSES = ['available', 'returned', 'maintenance']
+
+    name = models.CharField(max_length=100)
+    category = models.CharField(
+        max_length=50,
+        choices=Asset.CATEGORY_CHOICES,
+        blank=True,
+        null=True,
+        help_text="Limit the expected set to one category (blank = all)."
+    )
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='open')
+    started_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    reconciled_at = models.DateTimeField(null=True, blank=True)
+
+    # Report summary (filled by reconciliation)
+    scan_count = models.PositiveIntegerField(default=0)
+    missing_count = models.PositiveIntegerField(default=0)
+    unexpected_count = models.PositiveIntegerField(default=0)
+    unknown_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f"Stocktake {self.name} ({self.status})"
+
+    class Meta:
+        ordering = ['-created_at']
+
+
+class StocktakeScan(models.Model):
+    stocktake = models.ForeignKey(
+        Stocktake,
+        on_delete=models.CASCADE,
+        related_name='scans'
+    )
+    location = models.CharField(max_length=100)
+    code = models.CharField(max_length=150)
+    scanned_at = models.DateTimeField(auto_now_add=True)
+
+
+class StocktakeDiscrepancy(models.Model):
+    KIND_CHOICES = [
+        ('missing', 'Expected but not seen'),
+        ('unexpected', 'Seen but borrowed/retired'),
+        ('unknown', 'Unknown barcode'),
+    ]
+
+    stocktake = models.ForeignKey(
+        Stocktake,
+        on_delete=models.CASCADE,
+        related_name='discrepancies'
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    code = models.CharField(max_length=150, blank=True, null=True)
+    location = models.CharField(max_length=100, blank=True, null=True)
+    asset = models.ForeignKey(
+        Asset,
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='stocktake_discrepancies'
+    )
+    asset_status = models.CharField(max_length=20, blank=True, null=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['stocktake', 'kind'], name='stocktake_diff_kind_idx'),
+        ]
+
+
+class ReportArtifact(models.Model):
+    """
+    A generated report file.
+
+    Keyed by (report type, format, filters, data version), where the data version
+    is the newest change-feed id when generation was requested: while no
+    asset, request or return has changed, the same export is served from
+    this file instead of being rebuilt.
+    """
+    report_type = models.CharField(max_length=50)
+    file_format = models.CharField(max_length=20, default='xlsx')
+    filters_hash = models.CharField(max_length=64)
+    filters = models.JSONField(default=dict, blank=True)
+    data_version = models.BigIntegerField()
+
+    file = models.FileField(upload_to='reports/%Y/%m/', blank=True, null=True)
+    job = models.ForeignKey(
+        'jobs.Job',
+        null=True,
+        blank=True,
+        on_delete=models.SET_NULL,
+        related_name='report_artifacts'
+    )
+
     created_by = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         null=True,
@@ -44,5 +239,132 @@ class Asset(models.Model):
     )
     created_at = models.DateTimeField(auto_now_add=True)
 
+    @property
+    def status(self):
+        if self.file:
+            return 'ready'
+        if self.job is None or self.job.status == 'failed':
+            return 'failed'
+        return self.job.status  # queued / running
+
+    def __str__(self):
+        return f"{self.report_type} v{self.data_version} ({self.status})"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['report_type', 'file_format', 'filters_hash', 'data_version'],
+                name='unique_report_artifact'
+            ),
+        ]
+
+
+# ============================================================
+# DAILY ROLLUPS (maintained by `manage.py rollup_stats`)
+# ============================================================
+class DailyCategoryStats(models.Model):
+    """
+    Per-day, per-category activity counts for the report pages.
+
+    Mean time to approve is kept as a sum and a count so that any range of
+    days can be averaged exactly.
+    """
+    day = models.DateField()
+    asset_category = models.CharField(max_length=50)
+
+    requests_created = models.PositiveIntegerField(default=0)
+    requests_approved = models.PositiveIntegerField(default=0)
+    requests_rejected = models.PositiveIntegerField(default=0)
+    requests_cancelled = models.PositiveIntegerField(default=0)
+    returns = models.PositiveIntegerField(default=0)
+    assets_borrowed = models.PositiveIntegerField(default=0)
+    approve_seconds_total = models.BigIntegerField(default=0)
+    approve_count = models.PositiveIntegerField(default=0)
+
+    computed_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.day} {self.asset_category}"
+
+    class Meta:
+        ordering = ['day', 'asset_category']
+        constraints = [
+            models.UniqueConstraint(fields=['day', 'asset_category'], name='unique_daily_category_stats'),
+        ]
+
+
+class RollupCheckpoint(models.Model):
+    """Last change-feed id a rollup has folded in."""
+    name = models.CharField(max_length=50, unique=True)
+    last_event_id = models.BigIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.name} @ {self.last_event_id}"
+
+
+# ============================================================
+# DEMAND FORECASTS (maintained by `manage.py forecast_demand`)
+# ============================================================
+class CategoryForecast(models.Model):
+    """
+    Forecast demand for one category in one week (weeks start on Monday).
+
+    Rewritten in full by each forecast run; the dashboard only reads it.
+    """
+    asset_category = models.CharField(max_length=50)
+    week_start = models.DateField()
+
+    expected_requests = models.FloatField(default=0)
+    seasonal_factor = models.FloatField(default=1)
+    expected_peak_demand = models.PositiveIntegerField(default=0)
+    available_stock = models.PositiveIntegerField(default=0)
+    on_loan = models.PositiveIntegerField(default=0)
+    shortfall = models.PositiveIntegerField(default=0)
+
+    computed_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"{self.asset_category} w/c {self.week_start}"
+
+    class Meta:
+        ordering = ['asset_category', 'week_start']
+        constraints = [
+            models.UniqueConstraint(fields=['asset_category', 'week_start'], name='unique_category_forecast'),
+        ]
+
+
+# ============================================================
+# RELIABILITY SCORES (maintained by `manage.py score_reliability`)
+# ============================================================
+class AssetReliability(models.Model):
+    """
+    Return-condition history of one asset, scored.
+
+    Condition scores: good 3, fair 2, damaged 1, lost 0. `trend` is the
+    mean score of recent returns minus that of earlier ones (negative =
+    degrading). `score` (0-100) blends the asset's damage rate with its
+    model's, so assets with few returns are judged mostly by their model.
+    """
+    asset = models.OneToOneField(
+        Asset,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='reliability'
+    )
+
+    returns = models.PositiveIntegerField(default=0)
+    damaged = models.PositiveIntegerField(default=0)
+    lost = models.PositiveIntegerField(default=0)
+    damage_rate = models.FloatField(default=0)
+    mean_condition = models.FloatField(null=True, blank=True)
+    trend = models.FloatField(null=True, blank=True)
+    model_returns = models.PositiveIntegerField(default=0)
+    model_damage_rate = models.FloatField(default=0)
+    score = models.FloatField(db_index=True)
+    last_returned_at = models.DateTimeField(null=True, blank=True)
+
+    computed_at = models.DateTimeField()
+
     def __str__(self):
-        return f"{self.asset_category} ({self.model})"
\ No newline at end of file
+        return f"Asset #{self.asset_id} reliability {self.score:.0f}"
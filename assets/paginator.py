@@ -0,0 +1,130 @@
+"""
+Paginator for very large tables.
+
+`Paginator.count` is a `COUNT(*)`, which on InnoDB scans a whole index for
+an unfiltered or broad list. `EstimatedCountPaginator` counts exactly
+only up to EXACT_COUNT_LIMIT rows (`COUNT(*)` over a `LIMIT`ed subquery,
+so it stops early); above that it uses the database's own row estimate:
+table statistics for an unfiltered list, the `EXPLAIN` row estimate for a
+filtered one. Counts above the limit are cached per query for
+COUNT_CACHE_SECONDS, and `display_count` renders an estimate as
+"about 1.2M".
+
+Backends without estimates (SQLite) fall back to an exact count.
+"""
+import hashlib
+import json
+
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections
+from django.utils.functional import cached_property
+
+
+EXACT_COUNT_LIMIT = 10000
+COUNT_CACHE_SECONDS = 60
+
+
+def _table_estimate(queryset):
+    """Row estimate from table statistics, or None."""
+    connection = connections[queryset.db]
+    table = queryset.model._meta.db_table
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute(
+                "SELECT TABLE_ROWS FROM information_schema.TABLES "
+                "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s",
+                [table],
+            )
+        elif connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [table])
+        else:
+            return None
+        row = cursor.fetchone()
+    return int(row[0]) if row and row[0] is not None and row[0] >= 0 else None
+
+
+def _explain_estimate(queryset):
+    """Rows the planner expects the query to return, or None."""
+    connection = connections[queryset.db]
+    sql, params = queryset.order_by().query.get_compiler(queryset.db).as_sql()
+    with connection.cursor() as cursor:
+        if connection.vendor == 'mysql':
+            cursor.execute('EXPLAIN ' + sql, params)
+            columns = [col[0].lower() for col in cursor.description]
+            row = dict(zip(columns, cursor.fetchone()))
+            # First row is the driving table; `filtered` is the % left after the WHERE
+            return int((row.get('rows') or 0) * float(row.get('filtered') or 100) / 100)
+        if connection.vendor == 'postgresql':
+            cursor.execute('EXPLAIN (FORMAT JSON) ' + sql, params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return int(plan[0]['Plan']['Plan Rows'])
+    return None
+
+
+def _humanize(count):
+    for size, suffix in ((1_000_000_000, 'B'), (1_000_000, 'M'), (1_000, 'K')):
+        if count >= size:
+            return f"{count / size:.1f}".rstrip('0').rstrip('.') + suffix
+    return str(count)
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator whose `count` is exact for small results and estimated for large ones."""
+
+    exact_count_limit = EXACT_COUNT_LIMIT
+    cache_seconds = COUNT_CACHE_SECONDS
+
+    def _cache_key(self):
+        query = self.object_list.order_by().query
+        sql, params = query.get_compiler(self.object_list.db).as_sql()
+        digest = hashlib.sha256(f'{self.object_list.db}:{sql}:{params!r}'.encode()).hexdigest()
+        return f'paginator:count:{digest}'
+
+    def _count(self):
+        """(count, is_estimate) without caching."""
+        queryset = self.object_list.order_by()
+        bounded = queryset.values('pk')[:self.exact_count_limit + 1].count()
+        if bounded <= self.exact_count_limit:
+            return bounded, False
+
+        try:
+            if queryset.query.where or queryset.query.distinct:
+                estimate = _explain_estimate(queryset)
+            else:
+                estimate = _table_estimate(queryset)
+        except DatabaseError:
+            estimate = None
+        if estimate is None:
+            return queryset.count(), False
+        return max(estimate, bounded), True
+
+    @cached_property
+    def _counted(self):
+        if not hasattr(self.object_list, 'query'):
+            return len(self.object_list), False
+        key = self._cache_key()
+        counted = cache.get(key)
+        if counted is None:
+            counted = self._count()
+            # Small counts are cheap and must not lag behind the page rows
+            if counted[0] > self.exact_count_limit:
+                cache.set(key, counted, self.cache_seconds)
+        return counted
+
+    @cached_property
+    def count(self):
+        return self._counted[0]
+
+    @property
+    def is_estimate(self):
+        return self._counted[1]
+
+    @property
+    def display_count(self):
+        """`1,234` when exact, `about 1.2M` when estimated."""
+        if self.is_estimate:
+            return f"about {_humanize(self.count)}"
+        return f"{self.count:,}"
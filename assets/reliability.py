@@ -0,0 +1,127 @@
+"""
+Asset reliability scores from return-condition history.
+
+`score_assets()` is a batch job (`manage.py score_reliability`) that reads
+every recorded return, archived ones included, in one grouped query per
+table (returns joined to the request's assigned asset, grouped per asset)
+and rewrites the AssetReliability side table. The asset detail pages show the scores and
+the allocator offers the most reliable available assets first.
+"""
+import datetime
+
+from django.db import transaction
+from django.db.models import Case, Count, IntegerField, Max, Q, Sum, Value, When
+from django.utils import timezone
+
+from requests.models import LOAN_TABLES
+from .models import AssetReliability
+
+
+CONDITION_SCORES = {'good': 3, 'fair': 2, 'damaged': 1, 'lost': 0}
+BAD_CONDITIONS = ['damaged', 'lost']
+# Returns newer than this count as "recent" for the degradation trend
+TREND_WINDOW_DAYS = 180
+# Pseudo-returns at the model's damage rate blended into each asset's rate
+MODEL_PRIOR = 3
+TREND_WEIGHT = 10
+BATCH_SIZE = 1000
+
+
+def _condition_score():
+    return Case(
+        *[When(condition_on_return=condition, then=Value(score)) for condition, score in CONDITION_SCORES.items()],
+        output_field=IntegerField(),
+    )
+
+
+SUMMED = ['returns', 'damaged', 'lost', 'condition_total', 'recent_returns', 'recent_total']
+
+
+def _grouped_returns(model, recent):
+    return model.objects.filter(
+        returned_date__isnull=False,
+        borrow_request__assigned_asset__isnull=False,
+    ).annotate(
+        condition_score=_condition_score(),
+    ).values(
+        'borrow_request__assigned_asset',
+        'borrow_request__assigned_asset__asset_category',
+        'borrow_request__assigned_asset__model',
+    ).annotate(
+        returns=Count('id'),
+        damaged=Count('id', filter=Q(condition_on_return='damaged')),
+        lost=Count('id', filter=Q(condition_on_return='lost')),
+        condition_total=Sum('condition_score'),
+        recent_returns=Count('id', filter=recent),
+        recent_total=Sum('condition_score', filter=recent),
+        last_returned_at=Max('returned_date'),
+    ).order_by()
+
+
+def return_history():
+    """Per-asset return counts and condition sums over hot and archived returns."""
+    recent = Q(returned_date__gte=timezone.now() - datetime.timedelta(days=TREND_WINDOW_DAYS))
+    history = {}
+    for _, model in LOAN_TABLES:
+        for row in _grouped_returns(model, recent):
+            merged = history.setdefault(row['borrow_request__assigned_asset'], row)
+            if merged is row:
+                continue
+            for field in SUMMED:
+                merged[field] = (merged[field] or 0) + (row[field] or 0)
+            merged['last_returned_at'] = max(merged['last_returned_at'], row['last_returned_at'])
+    return list(history.values())
+
+
+def _mean(total, count):
+    return total / count if count else None
+
+
+def score_assets():
+    """Recompute every asset's reliability. Returns the number of assets scored."""
+    computed_at = timezone.now()
+    history = return_history()
+
+    # Per model (category + model name), from the same rows
+    by_model = {}
+    for row in history:
+        key = (row['borrow_request__assigned_asset__asset_category'], row['borrow_request__assigned_asset__model'])
+        returns, bad = by_model.get(key, (0, 0))
+        by_model[key] = (returns + row['returns'], bad + row['damaged'] + row['lost'])
+
+    scores = []
+    for row in history:
+        returns = row['returns']
+        bad = row['damaged'] + row['lost']
+        model_returns, model_bad = by_model[
+            row['borrow_request__assigned_asset__asset_category'], row['borrow_request__assigned_asset__model']
+        ]
+        model_rate = model_bad / model_returns
+
+        earlier = returns - row['recent_returns']
+        recent_mean = _mean(row['recent_total'] or 0, row['recent_returns'])
+        earlier_mean = _mean((row['condition_total'] or 0) - (row['recent_total'] or 0), earlier)
+        trend = recent_mean - earlier_mean if recent_mean is not None and earlier_mean is not None else None
+
+        smoothed_rate = (bad + MODEL_PRIOR * model_rate) / (returns + MODEL_PRIOR)
+        score = 100 * (1 - smoothed_rate) + TREND_WEIGHT * min(trend or 0, 0)
+
+        scores.append(AssetReliability(
+            asset_id=row['borrow_request__assigned_asset'],
+            returns=returns,
+            damaged=row['damaged'],
+            lost=row['lost'],
+            damage_rate=round(bad / returns, 4),
+            mean_condition=round(row['condition_total'] / returns, 3),
+            trend=round(trend, 3) if trend is not None else None,
+            model_returns=model_returns,
+            model_damage_rate=round(model_rate, 4),
+            score=round(max(0.0, min(100.0, score)), 1),
+            last_returned_at=row['last_returned_at'],
+            computed_at=computed_at,
+        ))
+
+    with transaction.atomic():
+        AssetReliability.objects.all().delete()
+        AssetReliability.objects.bulk_create(scores, batch_size=BATCH_SIZE)
+    return len(scores)
@@ -0,0 +1,410 @@
+"""
+Report generation.
+
+Used by the synchronous Export button (`export_report_excel`) and by the
+background report jobs, so both produce the same file. Filters travel as
+plain strings (query-string values or job payloads).
+
+Every report is a header row plus a row generator that reads the database
+in keyset batches (`WHERE id > last ORDER BY id LIMIT n`; the request
+summary pages on `(request_date, id)` to stay newest first), so memory
+stays flat however many rows there are. The same rows feed the XLSX workbook
+and the streamed CSV / gzipped NDJSON formats.
+
+`request_report()` is the cached async path: it returns the stored
+artifact for (report type, format, filters, data version) if one exists
+and only queues a build job otherwise.
+"""
+import csv
+import datetime
+import hashlib
+import heapq
+import io
+import json
+import zlib
+from itertools import chain
+
+import openpyxl
+from openpyxl.styles import Font, PatternFill
+from django.db.models import Count, Max, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from audit.models import ChangeEvent
+from jobs.queue import enqueue
+from requests.models import LOAN_TABLES, ArchivedAssetRequest, AssetRequest
+from .models import Asset, ReportArtifact
+
+
+REPORT_TYPES = ['asset_usage', 'request_summary', 'returns']
+FILTER_KEYS = ['start_date', 'end_date', 'username']
+XLSX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
+
+# format -> content type (the format is also the file extension)
+EXPORT_FORMATS = {
+    'xlsx': XLSX_CONTENT_TYPE,
+    'csv': 'text/csv',
+    'csv.gz': 'application/gzip',
+    'ndjson.gz': 'application/gzip',
+}
+
+BATCH_SIZE = 5000
+STREAM_CHUNK_BYTES = 64 * 1024
+
+
+def parse_date(date_str):
+    if not date_str:
+        return None
+    try:
+        return datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
+    except ValueError:
+        return None
+
+
+def report_filters(params):
+    """Pick the report filters out of a QueryDict/dict, dropping blanks."""
+    filters = {}
+    for key in FILTER_KEYS:
+        value = (params.get(key) or '').strip()
+        if value:
+            filters[key] = value
+    return filters
+
+
+def report_format(params):
+    """The requested export format, or None if it is not supported."""
+    fmt = (params.get('format') or 'xlsx').strip().lower()
+    return fmt if fmt in EXPORT_FORMATS else None
+
+
+def report_filename(report_type, filters, extension='xlsx'):
+    filename = f"{report_type}_{timezone.localdate()}"
+    if report_type in ("request_summary", "returns") and filters.get('username'):
+        filename += f"_{filters['username']}"
+    return f"{filename}.{extension}"
+
+
+def iter_keyset(queryset, fields, batch_size=BATCH_SIZE, order=('pk',)):
+    """
+    Yield `values_list(*fields)` tuples in `order`, one bounded query per
+    batch. Unlike `.iterator()` (which MySQLdb still buffers whole on the
+    client) this keeps memory constant on every backend.
+
+    `order` is the keyset: field names, all ascending or all descending
+    (`'-'` prefixed), the last of which must be unique (the primary key).
+    """
+    descending = order[0].startswith('-')
+    keys = [name.lstrip('-') for name in order]
+    beyond = 'lt' if descending else 'gt'
+    queryset = queryset.order_by(*order)
+    last = None
+    while True:
+        batch = queryset
+        if last is not None:
+            # (k1, k2, ...) beyond the last row, spelled out for every backend
+            after = Q()
+            for i, key in enumerate(keys):
+                after |= Q(**dict(zip(keys[:i], last)), **{f'{key}__{beyond}': last[i]})
+            batch = queryset.filter(after)
+        rows = list(batch.values_list(*keys, *fields)[:batch_size])
+        if not rows:
+            return
+        last = rows[-1][:len(keys)]
+        for row in rows:
+            yield row[len(keys):]
+
+
+# ============================================================
+# 🔹 REPORT TYPE: ASSET USAGE
+# ============================================================
+ASSET_USAGE_COLUMNS = [
+    ('asset_category', "Asset Category"),
+    ('model', "Model"),
+    ('serial_number', "Serial Number"),
+    ('total_requests', "Total Requests"),
+    ('approved_requests', "Approved Requests"),
+]
+
+
+def _request_counts(model, in_range):
+    """(total, approved) correlated counts of `model` requests per asset."""
+    requests = model.objects.filter(in_range, assigned_asset=OuterRef('pk')).order_by().values('assigned_asset')
+    total = requests.annotate(n=Count('id')).values('n')
+    approved = requests.filter(status='approved').annotate(n=Count('id')).values('n')
+    return Coalesce(Subquery(total), 0), Coalesce(Subquery(approved), 0)
+
+
+def asset_usage_rows(filters):
+    start_date = parse_date(filters.get('start_date'))
+    end_date = parse_date(filters.get('end_date'))
+
+    in_range = Q()
+    if start_date:
+        in_range &= Q(request_date__gte=start_date)
+    if end_date:
+        in_range &= Q(request_date__lte=end_date)
+
+    # One query per batch instead of two COUNTs per asset; archived
+    # requests count too
+    counts = [_request_counts(request, in_range) for request, _ in LOAN_TABLES]
+    assets = Asset.objects.annotate(
+        total_requests=sum((total for total, _ in counts[1:]), counts[0][0]),
+        approved_requests=sum((approved for _, approved in counts[1:]), counts[0][1]),
+    )
+    fields = ('asset_category', 'model', 'serial_number', 'total_requests', 'approved_requests')
+    for category, model, serial_number, total, approved in iter_keyset(assets, fields):
+        yield [category, model or "-", serial_number or "-", total, approved]
+
+
+# ============================================================
+# 🔹 REPORT TYPE: REQUEST SUMMARY
+# ============================================================
+REQUEST_SUMMARY_COLUMNS = [
+    ('user', "User"),
+    ('asset', "Asset"),
+    ('model', "Model"),
+    ('request_date', "Request Date"),
+    ('return_date', "Return Date"),
+    ('status', "Status"),
+    ('remarks', "Remarks"),
+]
+# Shared with the parallel exporter
+REQUEST_SUMMARY_HEADERS = [header for _, header in REQUEST_SUMMARY_COLUMNS]
+REQUEST_SUMMARY_FIELDS = ('user__username', 'assigned_asset__asset_category', 'assigned_asset__model',
+                          'request_date', 'return_date', 'status', 'remarks')
+# The model's `-request_date` ordering, made a total order for keyset paging
+NEWEST_FIRST = ('-request_date', '-id')
+
+
+def request_summary_queryset(filters, archived=False):
+    """The filtered requests of the hot table, or of the archive table if `archived`."""
+    start_date = parse_date(filters.get('start_date'))
+    end_date = parse_date(filters.get('end_date'))
+    username = filters.get('username')
+
+    requests = (ArchivedAssetRequest if archived else AssetRequest).objects.all()
+    if start_date:
+        requests = requests.filter(request_date__gte=start_date)
+    if end_date:
+        requests = requests.filter(request_date__lte=end_date)
+    if username:
+        requests = requests.filter(user__username__icontains=username)
+    return requests
+
+
+def request_summary_row(values):
+    username, category, model, request_date, return_date, status, remarks = values
+    has_asset = category is not None
+    return [
+        username,
+        category if has_asset else "-",
+        model if has_asset else "-",
+        request_date.strftime("%Y-%m-%d"),
+        return_date.strftime("%Y-%m-%d") if return_date else "-",
+        status.capitalize(),
+        remarks or "-",
+    ]
+
+
+def request_summary_rows(filters, within=Q()):
+    """
+    Hot and archived requests (narrowed by `within`), merged newest first
+    like the request list. Ids are shared across the two tables, so
+    `(request_date, id)` orders them as one.
+    """
+    fields = ('request_date', 'id') + REQUEST_SUMMARY_FIELDS
+    tables = [
+        iter_keyset(request_summary_queryset(filters, archived).filter(within), fields, order=NEWEST_FIRST)
+        for archived in (False, True)
+    ]
+    for values in heapq.merge(*tables, key=lambda row: row[:2], reverse=True):
+        yield request_summary_row(values[2:])
+
+
+# ============================================================
+# 🔹 REPORT TYPE: RETURNS
+# ============================================================
+RETURNS_COLUMNS = [
+    ('user', "User"),
+    ('asset', "Asset"),
+    ('model', "Model"),
+    ('serial_number', "Serial Number"),
+    ('request_date', "Request Date"),
+    ('returned_date', "Returned Date"),
+    ('condition', "Condition"),
+    ('received_by', "Received By"),
+    ('remarks', "Remarks"),
+]
+
+
+def returns_rows(filters):
+    """Hot returns, then archived ones, each in id order."""
+    start_date = parse_date(filters.get('start_date'))
+    end_date = parse_date(filters.get('end_date'))
+    username = filters.get('username')
+
+    in_range = Q()
+    if start_date:
+        in_range &= Q(returned_date__date__gte=start_date)
+    if end_date:
+        in_range &= Q(returned_date__date__lte=end_date)
+    if username:
+        in_range &= Q(borrow_request__user__username__icontains=username)
+
+    fields = (
+        'borrow_request__user__username',
+        'borrow_request__assigned_asset__asset_category',
+        'borrow_request__assigned_asset__model',
+        'borrow_request__assigned_asset__serial_number',
+        'borrow_request__request_date',
+        'returned_date',
+        'condition_on_return',
+        'received_by__username',
+        'remarks',
+    )
+    rows = chain.from_iterable(iter_keyset(ret.objects.filter(in_range), fields) for _, ret in LOAN_TABLES)
+    for (username, category, model, serial_number, request_date,
+         returned_date, condition, received_by, remarks) in rows:
+        yield [
+            username,
+            category or "-",
+            model or "-",
+            serial_number or "-",
+            request_date.strftime("%Y-%m-%d"),
+            timezone.localtime(returned_date).strftime("%Y-%m-%d %H:%M") if returned_date else "-",
+            condition.capitalize(),
+            received_by or "-",
+            remarks or "-",
+        ]
+
+
+# report type -> (sheet title, [(json key, header)], row generator)
+REPORTS = {
+    'asset_usage': ("Asset Usage Report", ASSET_USAGE_COLUMNS, asset_usage_rows),
+    'request_summary': ("Request Summary", REQUEST_SUMMARY_COLUMNS, request_summary_rows),
+    'returns': ("Returns Report", RETURNS_COLUMNS, returns_rows),
+}
+
+
+def _header(ws, headers):
+    header_fill = PatternFill(start_color="FFCCEEFF", end_color="FFCCEEFF", fill_type="solid")
+    header_font = Font(bold=True)
+
+    ws.append(headers)
+    for col, _ in enumerate(headers, 1):
+        ws.cell(row=1, column=col).font = header_font
+        ws.cell(row=1, column=col).fill = header_fill
+
+
+def build_workbook(report_type, filters):
+    """Build the report workbook. Raises ValueError for an unknown report type."""
+    if report_type not in REPORTS:
+        raise ValueError(f"Invalid report type: {report_type}")
+    title, columns, rows = REPORTS[report_type]
+
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = title
+    _header(ws, [header for _, header in columns])
+
+    for row in rows(filters):
+        ws.append(row)
+
+    # -----------------------------
+    # Auto-adjust column width
+    # -----------------------------
+    for column_cells in ws.columns:
+        length = max(len(str(cell.value)) if cell.value else 0 for cell in column_cells)
+        ws.column_dimensions[column_cells[0].column_letter].width = length + 2
+
+    return wb
+
+
+# ============================================================
+# STREAMED FORMATS: CSV, gzipped CSV, gzipped NDJSON
+# ============================================================
+def _csv_chunks(columns, rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([header for _, header in columns])
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= STREAM_CHUNK_BYTES:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def _ndjson_chunks(columns, rows):
+    keys = [key for key, _ in columns]
+    lines, size = [], 0
+    for row in rows:
+        line = json.dumps(dict(zip(keys, row)), default=str) + '\n'
+        lines.append(line)
+        size += len(line)
+        if size >= STREAM_CHUNK_BYTES:
+            yield ''.join(lines).encode('utf-8')
+            lines, size = [], 0
+    yield ''.join(lines).encode('utf-8')
+
+
+def gzip_chunks(chunks):
+    """Compress a byte stream incrementally into one gzip member."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)  # wbits 31: gzip container
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+def stream_report(report_type, filters, fmt):
+    """Yield the report as bytes in a streamed format (not xlsx)."""
+    _, columns, rows = REPORTS[report_type]
+    if fmt == 'csv':
+        return _csv_chunks(columns, rows(filters))
+    if fmt == 'csv.gz':
+        return gzip_chunks(_csv_chunks(columns, rows(filters)))
+    if fmt == 'ndjson.gz':
+        return gzip_chunks(_ndjson_chunks(columns, rows(filters)))
+    raise ValueError(f"Unsupported stream format: {fmt}")
+
+
+def write_report(report_type, filters, fmt, out):
+    """Write the report in any export format to a binary file object."""
+    if fmt == 'xlsx':
+        build_workbook(report_type, filters).save(out)
+    else:
+        for chunk in stream_report(report_type, filters, fmt):
+            out.write(chunk)
+
+
+# ============================================================
+# CACHED ASYNC REPORTS
+# ============================================================
+def data_version():
+    """Newest change-feed id: bumps on every asset, request or return write."""
+    return ChangeEvent.objects.aggregate(v=Max('id'))['v'] or 0
+
+
+def filters_hash(filters):
+    canonical = json.dumps(filters, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def request_report(report_type, filters, fmt='xlsx', user=None):
+    """Return the artifact for this report, queueing a build if needed."""
+    artifact, created = ReportArtifact.objects.select_related('job').get_or_create(
+        report_type=report_type,
+        file_format=fmt,
+        filters_hash=filters_hash(filters),
+        data_version=data_version(),
+        defaults={'filters': filters, 'created_by': user},
+    )
+
+    if created or artifact.status == 'failed':
+        artifact.job = enqueue('assets.report_artifact', {'artifact_id': artifact.pk}, user=user)
+        artifact.save(update_fields=['job'])
+
+    return artifact
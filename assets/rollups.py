@@ -0,0 +1,246 @@
+"""
+Daily per-category rollups for the report pages.
+
+`recompute_days()` rebuilds the DailyCategoryStats rows for a set of days
+with a handful of grouped queries. `update_rollups()` is the incremental
+path: it reads the change feed since its checkpoint, works out which days
+the changed requests and returns touch, and recomputes only those (plus
+today). `backfill()` rebuilds a whole date range, a month at a time.
+
+Day boundaries follow the project TIME_ZONE. What counts on a day:
+
+- created:   request created_at
+- approved / rejected, assets borrowed, time to approve: approval_date
+- cancelled: cancelled_at
+- returns:   returned_date of recorded returns
+
+Archived requests and returns are counted too, so recomputing a day gives
+the same totals before and after archiving.
+"""
+import datetime
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Count, DurationField, ExpressionWrapper, F, Max, Min, Q, Sum
+from django.db.models.functions import TruncDate, TruncMonth
+from django.utils import timezone
+
+from audit.changefeed import settle_cutoff
+from audit.models import ChangeEvent
+from requests.models import LOAN_TABLES, AssetRequest, AssetReturn
+from .models import DailyCategoryStats, RollupCheckpoint
+
+
+CHECKPOINT = 'daily_category_stats'
+EVENT_BATCH = 10000
+
+
+def _local_day(value):
+    return timezone.localdate(value) if value else None
+
+
+def _in_days(field, days):
+    """
+    `field` falls on one of `days` (local time), as half-open datetime
+    ranges so the column's index is usable (unlike `__date__in`).
+    """
+    condition = Q()
+    days = sorted(days)
+    start = prev = days[0]
+    for day in days[1:] + [None]:
+        if day is not None and day == prev + datetime.timedelta(days=1):
+            prev = day
+            continue
+        condition |= Q(**{
+            f'{field}__gte': _start_of(start),
+            f'{field}__lt': _start_of(prev + datetime.timedelta(days=1)),
+        })
+        start = prev = day
+    return condition
+
+
+def _start_of(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def _add(entry, field, value):
+    entry[field] = entry.get(field, 0) + value
+
+
+def _counts(days):
+    """{(day, category): {field: value}} for the given days, archived rows included."""
+    stats = defaultdict(dict)
+    for request, ret in LOAN_TABLES:
+        _count_table(stats, days, request, ret)
+    return stats
+
+
+def _count_table(stats, days, request, ret):
+    created = request.objects.filter(_in_days('created_at', days)).annotate(
+        day=TruncDate('created_at'),
+    ).values('day', 'asset_category').annotate(n=Count('id'))
+    for row in created:
+        _add(stats[row['day'], row['asset_category']], 'requests_created', row['n'])
+
+    approved = Q(status='approved')
+    decided = request.objects.filter(_in_days('approval_date', days)).annotate(
+        day=TruncDate('approval_date'),
+        wait=ExpressionWrapper(F('approval_date') - F('created_at'), output_field=DurationField()),
+    ).values('day', 'asset_category').annotate(
+        approved=Count('id', filter=approved),
+        rejected=Count('id', filter=Q(status='rejected')),
+        borrowed=Count('assigned_asset', filter=approved, distinct=True),
+        wait_total=Sum('wait', filter=approved),
+    )
+    for row in decided:
+        entry = stats[row['day'], row['asset_category']]
+        _add(entry, 'requests_approved', row['approved'])
+        _add(entry, 'requests_rejected', row['rejected'])
+        _add(entry, 'assets_borrowed', row['borrowed'])
+        _add(entry, 'approve_count', row['approved'])
+        _add(entry, 'approve_seconds_total', int(row['wait_total'].total_seconds()) if row['wait_total'] else 0)
+
+    cancelled = request.objects.filter(_in_days('cancelled_at', days), status='cancelled').annotate(
+        day=TruncDate('cancelled_at'),
+    ).values('day', 'asset_category').annotate(n=Count('id'))
+    for row in cancelled:
+        _add(stats[row['day'], row['asset_category']], 'requests_cancelled', row['n'])
+
+    returned = ret.objects.filter(_in_days('returned_date', days)).annotate(
+        day=TruncDate('returned_date'),
+    ).values('day', 'borrow_request__asset_category').annotate(n=Count('id'))
+    for row in returned:
+        _add(stats[row['day'], row['borrow_request__asset_category']], 'returns', row['n'])
+
+
+def recompute_days(days):
+    """Rebuild the rollup rows for these days. Returns the number of rows written."""
+    days = sorted(set(days))
+    if not days:
+        return 0
+
+    stats = _counts(days)
+    rows = [
+        DailyCategoryStats(day=day, asset_category=category, **fields)
+        for (day, category), fields in stats.items()
+    ]
+    with transaction.atomic():
+        DailyCategoryStats.objects.filter(day__in=days).delete()
+        DailyCategoryStats.objects.bulk_create(rows, batch_size=1000)
+    return len(rows)
+
+
+def _dirty_days(request_ids, return_ids):
+    days = set()
+    for created_at, approval_date, cancelled_at in AssetRequest.objects.filter(
+        pk__in=request_ids,
+    ).values_list('created_at', 'approval_date', 'cancelled_at'):
+        days.update((_local_day(created_at), _local_day(approval_date), _local_day(cancelled_at)))
+
+    for (returned_date,) in AssetReturn.objects.filter(pk__in=return_ids).values_list('returned_date'):
+        days.add(_local_day(returned_date))
+
+    days.discard(None)
+    return days
+
+
+def update_rollups():
+    """Fold in changes since the last run. Returns `(days_recomputed, last_event_id)`."""
+    checkpoint, _ = RollupCheckpoint.objects.get_or_create(name=CHECKPOINT)
+    cursor = checkpoint.last_event_id
+    cutoff = settle_cutoff()
+
+    # Today is always refreshed: deleted rows leave no dates to follow
+    days = {timezone.localdate()}
+    while True:
+        events = list(
+            ChangeEvent.objects.filter(id__gt=cursor, created_at__lte=cutoff)
+            .order_by('id').values_list('id', 'record_type', 'record_id')[:EVENT_BATCH]
+        )
+        if not events:
+            break
+
+        request_ids = {rid for _, rtype, rid in events if rtype == ChangeEvent.REQUEST}
+        return_ids = {rid for _, rtype, rid in events if rtype == ChangeEvent.RETURN}
+        days |= _dirty_days(request_ids, return_ids)
+        cursor = events[-1][0]
+
+    recompute_days(days)
+    checkpoint.last_event_id = cursor
+    checkpoint.save(update_fields=['last_event_id', 'updated_at'])
+    return len(days), cursor
+
+
+def backfill(start=None, end=None, chunk_days=31):
+    """
+    Rebuild every day from `start` (default: first request, archived ones
+    included) to `end` (default: today). Days are counted from both the
+    hot and the archive tables, so archived history is rebuilt too.
+    """
+    checkpoint, _ = RollupCheckpoint.objects.get_or_create(name=CHECKPOINT)
+    # Events up to here are covered by the rebuild
+    last_event_id = ChangeEvent.objects.filter(created_at__lte=settle_cutoff()).aggregate(
+        m=Max('id'))['m'] or 0
+
+    if start is None:
+        firsts = [request.objects.aggregate(m=Min('created_at'))['m'] for request, _ in LOAN_TABLES]
+        start = _local_day(min(filter(None, firsts), default=None)) or timezone.localdate()
+    end = end or timezone.localdate()
+
+    written, day = 0, start
+    while day <= end:
+        chunk = [day + datetime.timedelta(days=i) for i in range(chunk_days)]
+        chunk = [d for d in chunk if d <= end]
+        written += recompute_days(chunk)
+        day = chunk[-1] + datetime.timedelta(days=1)
+
+    if checkpoint.last_event_id < last_event_id:
+        checkpoint.last_event_id = last_event_id
+        checkpoint.save(update_fields=['last_event_id', 'updated_at'])
+    return written
+
+
+def monthly_trends(months=12):
+    """
+    Month-by-month totals for the last `months` months (current included),
+    read from the rollup table only. Shaped for the report page charts.
+    """
+    today = timezone.localdate()
+    month_starts = []
+    year, month = today.year, today.month
+    for _ in range(months):
+        month_starts.append(datetime.date(year, month, 1))
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    month_starts.reverse()
+    index = {start: i for i, start in enumerate(month_starts)}
+
+    fields = ['requests_created', 'requests_approved', 'requests_rejected', 'requests_cancelled',
+              'returns', 'assets_borrowed']
+    totals = {field: [0] * months for field in fields}
+    wait_seconds, wait_count = [0] * months, [0] * months
+    by_category = {}
+
+    rows = DailyCategoryStats.objects.filter(day__gte=month_starts[0]).annotate(
+        month=TruncMonth('day'),
+    ).values('month', 'asset_category').annotate(
+        **{field: Sum(field) for field in fields},
+        approve_seconds=Sum('approve_seconds_total'),
+        approve_n=Sum('approve_count'),
+    )
+    for row in rows:
+        i = index[row['month']]
+        for field in fields:
+            totals[field][i] += row[field]
+        wait_seconds[i] += row['approve_seconds']
+        wait_count[i] += row['approve_n']
+        by_category.setdefault(row['asset_category'], [0] * months)[i] += row['requests_created']
+
+    return {
+        'labels': [start.strftime('%b %Y') for start in month_starts],
+        'totals': totals,
+        'by_category': by_category,
+        'mean_hours_to_approve': [
+            round(seconds / count / 3600, 1) if count else None
+            for seconds, count in zip(wait_seconds, wait_count)
+        ],
+    }
@@ -0,0 +1,101 @@
+"""
+Barcode / serial scan lookup for the store counter.
+
+`lookup_code()` resolves a scanned code to the asset, its current holder
+and its open loan in one query on the unique barcode/serial indexes (the
+holder comes from the asset's maintained `current_loan` pointer).
+Results sit in a small per-process LRU cache that asset, request and
+return writes invalidate, so repeat scans never touch the database.
+"""
+import threading
+import time
+from collections import OrderedDict
+
+from django.db.models import F, Q
+
+from .models import Asset
+
+
+class ScanCache:
+    """
+    Thread-safe LRU keyed by scanned code.
+
+    Signals only reach the worker process that made the write, so entries
+    also expire after `ttl` seconds to bound staleness across workers.
+    """
+
+    def __init__(self, maxsize=4096, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()       # code -> (expires_at, result)
+        self._codes_by_asset = {}           # asset id -> {codes}
+        self._lock = threading.Lock()
+
+    def get(self, code):
+        with self._lock:
+            entry = self._entries.get(code)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                self._drop(code)
+                return None
+            self._entries.move_to_end(code)
+            return entry
+
+    def set(self, code, result):
+        with self._lock:
+            self._entries[code] = (time.monotonic() + self.ttl, result)
+            self._entries.move_to_end(code)
+            if result:
+                self._codes_by_asset.setdefault(result['id'], set()).add(code)
+            while len(self._entries) > self.maxsize:
+                self._drop(next(iter(self._entries)))
+
+    def invalidate(self, asset_id=None, codes=()):
+        """Forget everything cached for an asset and/or specific codes."""
+        with self._lock:
+            stale = set(c for c in codes if c)
+            stale |= self._codes_by_asset.pop(asset_id, set())
+            for code in stale:
+                self._drop(code)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._codes_by_asset.clear()
+
+    def _drop(self, code):
+        entry = self._entries.pop(code, None)
+        if entry and entry[1]:
+            codes = self._codes_by_asset.get(entry[1]['id'])
+            if codes:
+                codes.discard(code)
+
+
+scan_cache = ScanCache()
+
+
+def _scan_query(code):
+    return Asset.objects.filter(
+        Q(barcode=code) | Q(serial_number=code)
+    ).annotate(
+        open_request_id=F('current_loan_id'),
+        open_request_status=F('current_loan__status'),
+        open_request_return_date=F('current_loan__return_date'),
+        holder=F('current_holder__username'),
+    ).values(
+        'id', 'asset_category', 'model', 'serial_number', 'barcode',
+        'status', 'asset_condition',
+        'open_request_id', 'open_request_status', 'open_request_return_date', 'holder',
+    )
+
+
+def lookup_code(code):
+    """Return the scan result dict for a barcode or serial, or None."""
+    cached = scan_cache.get(code)
+    if cached is not None:
+        return cached[1]
+
+    result = _scan_query(code).first()
+    scan_cache.set(code, result)
+    return result
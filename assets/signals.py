@@ -0,0 +1,30 @@
+from django.db.models.signals import post_delete, post_save
+
+from requests.models import AssetRequest, AssetReturn
+from .models import Asset
+from .scan import scan_cache
+
+
+def forget_asset(sender, instance, **kwargs):
+    scan_cache.invalidate(instance.pk, codes=[instance.barcode, instance.serial_number])
+
+
+def forget_request(sender, instance, **kwargs):
+    # Holder / open request shown on scan results changed
+    if instance.assigned_asset_id:
+        scan_cache.invalidate(instance.assigned_asset_id)
+
+
+def forget_return(sender, instance, **kwargs):
+    try:
+        borrow_request = instance.borrow_request   # normally already cached by the caller
+    except AssetRequest.DoesNotExist:
+        return
+    if borrow_request.assigned_asset_id:
+        scan_cache.invalidate(borrow_request.assigned_asset_id)
+
+
+for signal in (post_save, post_delete):
+    signal.connect(forget_asset, sender=Asset)
+    signal.connect(forget_request, sender=AssetRequest)
+    signal.connect(forget_return, sender=AssetReturn)
@@ -0,0 +1,125 @@
+"""
+Stocktake reconciliation.
+
+Scans are stored as they arrive (bulk inserts per chunk). Reconciliation
+loads the distinct scanned codes into a set, resolves them to assets with
+chunked `IN` queries, streams the expected (in-store) assets once, and
+computes three differences with hashed set lookups:
+
+- missing:    expected on the shelves but never scanned
+- unexpected: scanned, but the system says borrowed or retired
+- unknown:    scanned code matches no asset
+"""
+from itertools import islice
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Asset, Stocktake, StocktakeDiscrepancy, StocktakeScan
+
+
+CHUNK_SIZE = 5000
+UNEXPECTED_STATUSES = ['borrowed', 'retired']
+
+
+def chunks(iterable, size=CHUNK_SIZE):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def parse_codes(text):
+    """One code per line; blank lines and surrounding whitespace ignored."""
+    for line in text.splitlines():
+        code = line.strip().split(',')[0].strip()
+        if code:
+            yield code
+
+
+def add_scans(stocktake, location, codes):
+    """Store scanned codes for one location. Returns the number stored."""
+    added = 0
+    for chunk in chunks(codes):
+        StocktakeScan.objects.bulk_create(
+            [StocktakeScan(stocktake=stocktake, location=location, code=code[:150]) for code in chunk]
+        )
+        added += len(chunk)
+
+    Stocktake.objects.filter(pk=stocktake.pk).update(scan_count=F('scan_count') + added)
+    stocktake.refresh_from_db(fields=['scan_count'])
+    return added
+
+
+def reconcile(stocktake):
+    """Compute and store the stocktake's discrepancy report."""
+    # Distinct scanned codes -> first location seen
+    seen = {}
+    scans = stocktake.scans.order_by('id').values_list('code', 'location')
+    for code, location in scans.iterator(chunk_size=CHUNK_SIZE):
+        seen.setdefault(code, location)
+
+    # Resolve scanned codes to assets
+    seen_asset_ids = set()
+    matched_codes = set()
+    discrepancies = []
+
+    for chunk in chunks(seen):
+        assets = Asset.objects.filter(
+            Q(barcode__in=chunk) | Q(serial_number__in=chunk)
+        ).values_list('id', 'barcode', 'serial_number', 'status')
+
+        for asset_id, barcode, serial_number, status in assets:
+            code = barcode if barcode in seen else serial_number
+            matched_codes.update(c for c in (barcode, serial_number) if c in seen)
+
+            if asset_id in seen_asset_ids:
+                continue  # scanned by both barcode and serial
+            seen_asset_ids.add(asset_id)
+
+            if status in UNEXPECTED_STATUSES:
+                discrepancies.append(StocktakeDiscrepancy(
+                    stocktake=stocktake, kind='unexpected', code=code,
+                    location=seen[code], asset_id=asset_id, asset_status=status,
+                ))
+
+    for code, location in seen.items():
+        if code not in matched_codes:
+            discrepancies.append(StocktakeDiscrepancy(
+                stocktake=stocktake, kind='unknown', code=code, location=location,
+            ))
+
+    # Expected assets that were never scanned
+    expected = Asset.objects.filter(status__in=Stocktake.IN_STORE_STATUSES)
+    if stocktake.category:
+        expected = expected.filter(asset_category=stocktake.category)
+
+    expected = expected.values_list('id', 'barcode', 'serial_number', 'status')
+    for asset_id, barcode, serial_number, status in expected.iterator(chunk_size=CHUNK_SIZE):
+        if asset_id not in seen_asset_ids:
+            discrepancies.append(StocktakeDiscrepancy(
+                stocktake=stocktake, kind='missing', code=barcode or serial_number,
+                asset_id=asset_id, asset_status=status,
+            ))
+
+    counts = {kind: 0 for kind, _ in StocktakeDiscrepancy.KIND_CHOICES}
+    for item in discrepancies:
+        counts[item.kind] += 1
+
+    with transaction.atomic():
+        stocktake.discrepancies.all().delete()
+        StocktakeDiscrepancy.objects.bulk_create(discrepancies, batch_size=CHUNK_SIZE)
+
+        stocktake.status = 'reconciled'
+        stocktake.reconciled_at = timezone.now()
+        stocktake.missing_count = counts['missing']
+        stocktake.unexpected_count = counts['unexpected']
+        stocktake.unknown_count = counts['unknown']
+        stocktake.save(update_fields=[
+            'status', 'reconciled_at', 'missing_count', 'unexpected_count', 'unknown_count',
+        ])
+
+    return counts
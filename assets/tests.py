@@ -1,3 +1,478 @@
-from django.test import TestCase
+import csv
+import datetime
+import gzip
+import io
+import json
+import shutil
+import tempfile
+from unittest import mock
 
-# Create your tests here.
+import openpyxl
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import models
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import User
+from requests.checkin import check_in
+from requests.holders import sync_current_loans
+from requests.models import ArchivedAssetRequest, AssetRequest, AssetReturn
+from audit.models import ChangeEvent
+from . import bulk, importers, paginator, parallel_export, reports, rollups, scan
+from .models import Asset, AssetImport, AssetReliability, DailyCategoryStats
+
+
+def last_seq():
+    return ChangeEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def noon(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time(12)))
+
+
+def make_request(user, created, category='laptop', **fields):
+    """A request created at noon on `created`; extra fields are written as given."""
+    req = AssetRequest.objects.create(
+        user=user, asset_category=category, request_date=created, return_date=created,
+    )
+    AssetRequest.objects.filter(pk=req.pk).update(created_at=noon(created), **fields)
+    req.refresh_from_db()
+    return req
+
+
+# ============================================================
+# BULK IMPORT
+# ============================================================
+class ImportTests(TestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media, ignore_errors=True)
+        media_root = override_settings(MEDIA_ROOT=media)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+
+    def make_import(self, name, content):
+        return AssetImport.objects.create(file=SimpleUploadedFile(name, content))
+
+    def csv_import(self, *lines):
+        return self.make_import('assets.csv', '\n'.join(lines).encode())
+
+    def test_valid_rows_are_created_and_bad_rows_reported(self):
+        Asset.objects.create(serial_number='TAKEN')
+        asset_import = self.csv_import(
+            'Category,Model,Serial,Barcode',
+            'Laptop,X1,S-1,B-1',
+            'printer,P2,S-2,',
+            ',X1,S-3,',            # no category
+            'laptop,X1,,',         # no code
+            'laptop,X1,TAKEN,',    # clashes with the database
+            'laptop,X1,S-1,',      # clashes with an earlier row
+            '',
+        )
+
+        importers.run_import(asset_import)
+
+        asset_import.refresh_from_db()
+        self.assertEqual(asset_import.status, 'completed')
+        self.assertEqual((asset_import.rows_imported, asset_import.rows_failed), (2, 4))
+        self.assertEqual(
+            list(Asset.objects.filter(serial_number__in=['S-1', 'S-2']).order_by('serial_number')
+                 .values_list('asset_category', 'barcode')),
+            [('laptop', 'B-1'), ('printer', None)],
+        )
+        self.assertEqual(list(asset_import.errors.values_list('row_number', flat=True)), [4, 5, 6, 7])
+
+        out = io.StringIO()
+        importers.write_error_report(asset_import, out)
+        self.assertIn('Serial number TAKEN already exists.', out.getvalue())
+
+    def test_xlsx_numeric_serials_import_as_text(self):
+        wb = openpyxl.Workbook()
+        wb.active.append(['asset_category', 'serial_number'])
+        wb.active.append(['desktop', 123456.0])
+        content = io.BytesIO()
+        wb.save(content)
+
+        importers.run_import(self.make_import('assets.xlsx', content.getvalue()))
+
+        self.assertTrue(Asset.objects.filter(serial_number='123456', asset_category='desktop').exists())
+
+    def test_failed_import_resumes_after_last_committed_chunk(self):
+        lines = ['category,serial'] + [f'laptop,S-{i}' for i in range(5)]
+        asset_import = self.csv_import(*lines)
+        real_chunk = importers.import_chunk
+        calls = []
+
+        def flaky(imp, chunk):
+            calls.append(len(chunk))
+            if len(calls) == 2:
+                raise RuntimeError("connection lost")
+            real_chunk(imp, chunk)
+
+        with mock.patch.object(importers, 'import_chunk', flaky), self.assertRaises(RuntimeError):
+            importers.run_import(asset_import, chunk_size=2)
+
+        asset_import.refresh_from_db()
+        self.assertEqual((asset_import.status, asset_import.rows_processed), ('failed', 2))
+
+        importers.run_import(asset_import, chunk_size=2)
+
+        asset_import.refresh_from_db()
+        self.assertEqual((asset_import.status, asset_import.rows_processed), ('completed', 5))
+        self.assertEqual((asset_import.rows_imported, asset_import.rows_failed), (5, 0))
+        self.assertEqual(Asset.objects.filter(serial_number__startswith='S-').count(), 5)
+
+    def test_unsupported_file_type_fails_the_import(self):
+        asset_import = self.make_import('assets.txt', b'x')
+        with self.assertRaises(ValueError):
+            importers.run_import(asset_import)
+        asset_import.refresh_from_db()
+        self.assertEqual(asset_import.status, 'failed')
+
+
+# ============================================================
+# BULK ACTIONS
+# ============================================================
+class BulkActionTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('u', password='x')
+        self.assets = [Asset.objects.create(serial_number=f'S-{i}', barcode=f'B-{i}') for i in range(3)]
+        scan.scan_cache.clear()
+        self.addCleanup(scan.scan_cache.clear)
+
+    def events(self, since):
+        return set(ChangeEvent.objects.filter(id__gt=since).values_list('record_type', 'record_id', 'deleted'))
+
+    def test_update_stamps_rows_logs_them_and_clears_the_scan_cache(self):
+        first, second, _ = self.assets
+        self.assertEqual(scan.lookup_code('B-0')['status'], 'available')
+        since = last_seq()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(bulk.bulk_update_assets([first.pk, second.pk, 999_999], status='maintenance'), 2)
+
+        self.assertEqual(
+            list(Asset.objects.order_by('pk').values_list('status', flat=True)),
+            ['maintenance', 'maintenance', 'available'],
+        )
+        first.refresh_from_db()
+        self.assertGreater(first.updated_at, self.assets[2].updated_at)
+        self.assertEqual(self.events(since), {('asset', first.pk, False), ('asset', second.pk, False)})
+        self.assertEqual(scan.lookup_code('B-0')['status'], 'maintenance')
+
+    def test_delete_detaches_requests_and_cascades_reliability(self):
+        first, second, kept = self.assets
+        req = make_request(self.user, timezone.localdate(), assigned_asset=first)
+        for asset in (first, kept):
+            AssetReliability.objects.create(asset=asset, score=50, computed_at=timezone.now())
+        self.assertIsNotNone(scan.lookup_code('S-0'))
+        since = last_seq()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(bulk.bulk_delete_assets([first.pk, second.pk]), 2)
+
+        self.assertEqual(list(Asset.objects.values_list('pk', flat=True)), [kept.pk])
+        self.assertEqual(list(AssetReliability.objects.values_list('asset', flat=True)), [kept.pk])
+        before = req.updated_at
+        req.refresh_from_db()
+        self.assertIsNone(req.assigned_asset_id)
+        self.assertGreater(req.updated_at, before)
+        self.assertEqual(self.events(since), {
+            ('asset', first.pk, True), ('asset', second.pk, True), ('request', req.pk, False),
+        })
+        self.assertIsNone(scan.lookup_code('S-0'))
+
+    def test_unsupported_on_delete_refuses_before_writing(self):
+        make_request(self.user, timezone.localdate(), assigned_asset=self.assets[0])
+        rel = next(rel for rel in Asset._meta.related_objects if rel.related_model is AssetReliability)
+
+        with mock.patch.object(rel, 'on_delete', models.PROTECT), self.assertRaises(NotImplementedError):
+            bulk.bulk_delete_assets([self.assets[0].pk])
+
+        self.assertEqual(Asset.objects.count(), 3)
+        self.assertEqual(AssetRequest.objects.get().assigned_asset_id, self.assets[0].pk)
+
+
+# ============================================================
+# SCAN LOOKUP CACHE
+# ============================================================
+class ScanCacheTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('u', password='x')
+        self.asset = Asset.objects.create(serial_number='S-1', barcode='B-1', model='X1')
+        scan.scan_cache.clear()
+        self.addCleanup(scan.scan_cache.clear)
+
+    def test_repeat_scans_are_served_from_the_cache(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(scan.lookup_code('B-1')['id'], self.asset.pk)
+            self.assertIsNone(scan.lookup_code('NOPE'))
+        with self.assertNumQueries(0):
+            self.assertEqual(scan.lookup_code('B-1')['model'], 'X1')
+            self.assertIsNone(scan.lookup_code('NOPE'))   # misses are cached too
+
+    def test_entries_expire_and_the_oldest_are_evicted(self):
+        cache = scan.ScanCache(maxsize=2, ttl=60)
+        with mock.patch.object(scan.time, 'monotonic', return_value=1000):
+            cache.set('a', {'id': 1})
+            cache.set('b', {'id': 2})
+            cache.get('a')                   # 'b' is now least recently used
+            cache.set('c', {'id': 3})
+            self.assertIsNone(cache.get('b'))
+            self.assertEqual(cache.get('a')[1], {'id': 1})
+        with mock.patch.object(scan.time, 'monotonic', return_value=1061):
+            self.assertIsNone(cache.get('a'))
+            self.assertIsNone(cache.get('c'))
+
+    def test_asset_request_and_return_writes_invalidate(self):
+        scan.lookup_code('S-1')
+        self.asset.model = 'X2'
+        self.asset.save()
+        self.assertEqual(scan.lookup_code('S-1')['model'], 'X2')
+
+        req = AssetRequest.objects.create(
+            user=self.user, asset_category='laptop', request_date=timezone.localdate(),
+            return_date=timezone.localdate(), assigned_asset=self.asset,
+        )
+        scan.lookup_code('S-1')
+        Asset.objects.filter(pk=self.asset.pk).update(current_loan=req, current_holder=self.user)
+        req.status = 'approved'
+        req.save()
+        self.assertEqual(scan.lookup_code('S-1')['holder'], 'u')
+
+        scan.lookup_code('S-1')
+        Asset.objects.filter(pk=self.asset.pk).update(current_loan=None, current_holder=None)
+        AssetReturn.objects.create(borrow_request=req, returned_date=timezone.now())
+        self.assertIsNone(scan.lookup_code('S-1')['holder'])
+
+    def test_set_based_writes_clear_the_cache(self):
+        req = make_request(self.user, timezone.localdate(), status='approved', assigned_asset=self.asset,
+                           approval_date=timezone.now())
+
+        scan.lookup_code('B-1')
+        sync_current_loans([self.asset.pk])
+        self.assertEqual(scan.lookup_code('B-1')['open_request_id'], req.pk)
+
+        check_in({'B-1': 'fair'}, received_by=self.user)
+        self.assertEqual(scan.lookup_code('B-1')['asset_condition'], 'fair')
+
+        bulk.bulk_update_assets([self.asset.pk], status='maintenance')
+        self.assertEqual(scan.lookup_code('B-1')['status'], 'maintenance')
+
+
+# ============================================================
+# DAILY ROLLUPS
+# ============================================================
+@override_settings(CHANGE_FEED_SETTLE_SECONDS=0)
+class RollupTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('u', password='x')
+        self.today = timezone.localdate()
+        self.day = self.today - datetime.timedelta(days=10)
+
+    def stats(self, day, category='laptop'):
+        row = DailyCategoryStats.objects.filter(day=day, asset_category=category).first()
+        return row and {
+            field: getattr(row, field)
+            for field in ('requests_created', 'requests_approved', 'requests_rejected',
+                          'requests_cancelled', 'returns', 'assets_borrowed', 'approve_count')
+        }
+
+    def test_recompute_counts_each_event_on_its_own_day(self):
+        asset = Asset.objects.create(serial_number='S-1')
+        approved_on = self.day + datetime.timedelta(days=1)
+        loan = make_request(self.user, self.day, status='approved', assigned_asset=asset,
+                            approval_date=noon(approved_on))
+        make_request(self.user, self.day, status='rejected', approval_date=noon(approved_on))
+        make_request(self.user, self.day, category='printer', status='cancelled', cancelled_at=noon(self.day))
+        AssetReturn.objects.create(borrow_request=loan, returned_date=noon(self.today))
+
+        rollups.recompute_days([self.day, approved_on, self.today])
+
+        self.assertEqual(self.stats(self.day)['requests_created'], 2)
+        self.assertEqual(self.stats(self.day, 'printer')['requests_cancelled'], 1)
+        self.assertEqual(
+            self.stats(approved_on),
+            {'requests_created': 0, 'requests_approved': 1, 'requests_rejected': 1,
+             'requests_cancelled': 0, 'returns': 0, 'assets_borrowed': 1, 'approve_count': 1},
+        )
+        self.assertEqual(self.stats(self.today)['returns'], 1)
+
+    def test_update_follows_the_change_feed_to_old_days(self):
+        req = make_request(self.user, self.day)
+        rollups.backfill(self.day)
+        self.assertEqual(self.stats(self.day)['requests_approved'], 0)
+
+        # Approving an old request dirties its creation day too
+        req.status = 'approved'
+        req.approval_date = noon(self.day)
+        with self.captureOnCommitCallbacks(execute=True):
+            req.save()
+        days, _ = rollups.update_rollups()
+
+        self.assertGreaterEqual(days, 2)
+        self.assertEqual(self.stats(self.day)['requests_approved'], 1)
+
+        # Nothing new: only today is refreshed, the checkpoint stays put
+        checkpoint = rollups.RollupCheckpoint.objects.get(name=rollups.CHECKPOINT).last_event_id
+        self.assertEqual(rollups.update_rollups(), (1, checkpoint))
+
+    def test_cancellation_stays_on_its_day_after_later_edits(self):
+        req = make_request(self.user, self.day, status='cancelled', cancelled_at=noon(self.day))
+        rollups.backfill(self.day)
+
+        req.remarks = "edited later"
+        with self.captureOnCommitCallbacks(execute=True):
+            req.save()
+        rollups.update_rollups()
+
+        self.assertEqual(self.stats(self.day)['requests_cancelled'], 1)
+        self.assertIsNone(self.stats(self.today))
+
+    @override_settings(CHANGE_FEED_SETTLE_SECONDS=3600)
+    def test_unsettled_changes_wait_for_the_next_run(self):
+        rollups.backfill(self.day)
+        with self.captureOnCommitCallbacks(execute=True):
+            make_request(self.user, self.day)
+
+        _, last_event_id = rollups.update_rollups()
+
+        self.assertLess(last_event_id, rollups.ChangeEvent.objects.latest('id').id)
+        self.assertEqual(self.stats(self.day), None)
+
+    def test_monthly_trends_read_the_rollups(self):
+        make_request(self.user, self.today)
+        rollups.recompute_days([self.today])
+
+        trends = rollups.monthly_trends(months=3)
+
+        self.assertEqual(len(trends['labels']), 3)
+        self.assertEqual(trends['totals']['requests_created'][-1], 1)
+        self.assertEqual(trends['by_category']['laptop'][-1], 1)
+
+
+# ============================================================
+# REPORT STREAMING
+# ============================================================
+class ReportStreamTests(TestCase):
+    def setUp(self):
+        for i in range(7):
+            Asset.objects.create(serial_number=f'S-{i}', model=f'M{i}')
+
+    def test_iter_keyset_reads_in_bounded_batches(self):
+        with self.assertNumQueries(4):   # 3 batches of 3, then an empty one
+            rows = list(reports.iter_keyset(Asset.objects.all(), ('serial_number',), batch_size=3))
+
+        self.assertEqual(rows, [(f'S-{i}',) for i in range(7)])
+
+    def test_streamed_formats_carry_the_same_rows(self):
+        csv_rows = list(csv.reader(io.StringIO(b''.join(reports.stream_report('asset_usage', {}, 'csv')).decode())))
+        gz_rows = list(csv.reader(io.StringIO(
+            gzip.decompress(b''.join(reports.stream_report('asset_usage', {}, 'csv.gz'))).decode()
+        )))
+        ndjson = gzip.decompress(b''.join(reports.stream_report('asset_usage', {}, 'ndjson.gz'))).decode()
+
+        self.assertEqual(csv_rows[0], [header for _, header in reports.ASSET_USAGE_COLUMNS])
+        self.assertEqual(gz_rows, csv_rows)
+        self.assertEqual(
+            [[str(value) for value in json.loads(line).values()] for line in ndjson.splitlines()],
+            csv_rows[1:],
+        )
+        self.assertEqual(len(csv_rows), 8)
+
+    def test_unknown_stream_format_is_rejected(self):
+        with self.assertRaises(ValueError):
+            reports.stream_report('asset_usage', {}, 'xml')
+
+
+class RequestSummaryOrderTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('u', password='x')
+        today = timezone.localdate()
+        # Hot and archived requests on interleaved days, two on the same day
+        self.expected = []
+        for offset, archived in ((3, False), (9, True), (1, True), (9, False), (5, False), (5, True), (20, True)):
+            day = today - datetime.timedelta(days=offset)
+            req = make_request(self.user, day, remarks=f'{offset}{"a" if archived else "h"}')
+            self.expected.append((day, req.pk, req.remarks))
+            if archived:
+                ArchivedAssetRequest.objects.create(
+                    id=req.pk, user=self.user, asset_category='laptop', request_date=day, return_date=day,
+                    status='rejected', remarks=req.remarks, created_at=req.created_at, updated_at=req.updated_at,
+                )
+                req.delete()
+        self.expected.sort(reverse=True)
+
+    def remarks(self, rows):
+        return [row[-1] for row in rows]
+
+    def test_serial_export_is_newest_first_across_tables(self):
+        with mock.patch.object(reports, 'BATCH_SIZE', 2):
+            rows = list(reports.request_summary_rows({}))
+        self.assertEqual(self.remarks(rows), [remarks for _, _, remarks in self.expected])
+
+    def test_iter_keyset_pages_newest_first(self):
+        rows = reports.iter_keyset(AssetRequest.objects.all(), ('remarks',), batch_size=1, order=reports.NEWEST_FIRST)
+        self.assertEqual([remarks for remarks, in rows], ['3h', '5h', '9h'])
+
+    def test_parallel_shards_keep_the_serial_order(self):
+        serial = list(reports.request_summary_rows({}))
+        for count in (1, 3, 50):
+            with self.subTest(count=count):
+                shards = parallel_export.request_shards({}, count)
+                rows = [row for shard in shards for row in parallel_export._format_shard({}, *shard)]
+                self.assertEqual(rows, serial)
+        self.assertEqual(len(parallel_export.request_shards({}, 50)), 5)  # one per distinct day
+
+
+# ============================================================
+# ESTIMATED COUNTS
+# ============================================================
+class SmallLimitPaginator(paginator.EstimatedCountPaginator):
+    exact_count_limit = 3
+
+
+class EstimatedCountPaginatorTests(TestCase):
+    def setUp(self):
+        for i in range(5):
+            Asset.objects.create(serial_number=f'S-{i}')
+        # Large counts are cached per query
+        paginator.cache.clear()
+        self.addCleanup(paginator.cache.clear)
+
+    def test_small_results_are_counted_exactly(self):
+        pages = paginator.EstimatedCountPaginator(Asset.objects.order_by('pk'), 2)
+        self.assertEqual((pages.count, pages.is_estimate, pages.display_count), (5, False, '5'))
+        self.assertEqual(pages.num_pages, 3)
+
+    def test_large_results_use_the_database_estimate(self):
+        with mock.patch.object(paginator, '_table_estimate', return_value=1_234_567) as table, \
+                mock.patch.object(paginator, '_explain_estimate', return_value=40) as explain:
+            unfiltered = SmallLimitPaginator(Asset.objects.order_by('pk'), 2)
+            filtered = SmallLimitPaginator(Asset.objects.filter(status='available').order_by('pk'), 2)
+
+            self.assertEqual((unfiltered.count, unfiltered.display_count), (1_234_567, 'about 1.2M'))
+            self.assertTrue(unfiltered.is_estimate)
+            self.assertEqual(filtered.count, 40)
+        table.assert_called_once()
+        explain.assert_called_once()
+
+    def test_estimate_never_undercounts_the_bounded_count(self):
+        with mock.patch.object(paginator, '_table_estimate', return_value=1):
+            self.assertEqual(SmallLimitPaginator(Asset.objects.order_by('pk'), 2).count, 4)
+
+    def test_falls_back_to_an_exact_count_without_estimates(self):
+        with mock.patch.object(paginator, '_table_estimate', return_value=None):
+            pages = SmallLimitPaginator(Asset.objects.order_by('pk'), 2)
+            self.assertEqual((pages.count, pages.is_estimate), (5, False))
+
+    def test_only_large_counts_are_cached(self):
+        small = paginator.EstimatedCountPaginator(Asset.objects.order_by('pk'), 2)
+        self.assertEqual(small.count, 5)
+        self.assertIsNone(paginator.cache.get(small._cache_key()))
+
+        with mock.patch.object(paginator, '_table_estimate', return_value=99):
+            self.assertEqual(SmallLimitPaginator(Asset.objects.order_by('pk'), 2).count, 99)
+        Asset.objects.create(serial_number='S-new')
+        # Served from the cache until it expires
+        self.assertEqual(SmallLimitPaginator(Asset.objects.order_by('pk'), 2).count, 99)
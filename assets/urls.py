@@ -37,12 +37,74 @@ urlpatterns = [
         name='admin_delete_asset'
     ),
 
+    path(
+        'admin/assets/bulk-action/',
+        views.admin_bulk_asset_action,
+        name='admin_bulk_asset_action'
+    ),
+
+    # Bulk import
+    path(
+        'admin/assets/import/',
+        views.admin_import_assets,
+        name='admin_import_assets'
+    ),
+    path(
+        'admin/assets/import/<int:pk>/resume/',
+        views.admin_resume_import,
+        name='admin_resume_import'
+    ),
+    path(
+        'admin/assets/import/<int:pk>/errors/',
+        views.admin_import_errors,
+        name='admin_import_errors'
+    ),
+
+    # Who has it? (current holder lookup)
+    path(
+        'admin/holders/',
+        views.admin_holder_lookup,
+        name='admin_holder_lookup'
+    ),
+
+    # Stocktake
+    path(
+        'admin/stocktakes/',
+        views.admin_stocktakes,
+        name='admin_stocktakes'
+    ),
+    path(
+        'admin/stocktakes/<int:pk>/',
+        views.admin_stocktake_detail,
+        name='admin_stocktake_detail'
+    ),
+
     # Admin-only report exporter
     path(
         'admin/export-report/<str:report_type>/',
         views.export_report_excel,
         name='admin_export_report'
     ),
+    path(
+        'admin/reports/<str:report_type>/generate/',
+        views.admin_generate_report,
+        name='admin_generate_report'
+    ),
+    path(
+        'admin/reports/files/<int:pk>/',
+        views.admin_report_status,
+        name='admin_report_status'
+    ),
+    path(
+        'admin/reports/files/<int:pk>/download/',
+        views.admin_report_download,
+        name='admin_report_download'
+    ),
+    path(
+        'admin/reports/utilization/',
+        views.admin_utilization,
+        name='admin_utilization'
+    ),
 
 
     # ============================
@@ -69,10 +131,56 @@ urlpatterns = [
         name='asset_detail'
     ),
 
+    # Barcode / serial scan lookup (admin + staff)
+    path(
+        'scan/',
+        views.scan_asset,
+        name='scan_asset'
+    ),
+
+    # Who has it? (current holder lookup)
+    path(
+        'holders/',
+        views.staff_holder_lookup,
+        name='staff_holder_lookup'
+    ),
+
+    # Stocktake
+    path(
+        'stocktakes/',
+        views.staff_stocktakes,
+        name='staff_stocktakes'
+    ),
+    path(
+        'stocktakes/<int:pk>/',
+        views.staff_stocktake_detail,
+        name='staff_stocktake_detail'
+    ),
+
     # Staff-only report exporter
     path(
         'export-report/<str:report_type>/',
         views.export_report_excel,
         name='staff_export_report'
     ),
+    path(
+        'reports/<str:report_type>/generate/',
+        views.staff_generate_report,
+        name='staff_generate_report'
+    ),
+    path(
+        'reports/files/<int:pk>/',
+        views.staff_report_status,
+        name='staff_report_status'
+    ),
+    path(
+        'reports/files/<int:pk>/download/',
+        views.staff_report_download,
+        name='staff_report_download'
+    ),
+    path(
+        'reports/utilization/',
+        views.staff_utilization,
+        name='staff_utilization'
+    ),
 ]
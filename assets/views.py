@@ -1,60 +1,50 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-import openpyxl
 from django.utils import timezone
-import datetime
-from openpyxl.styles import Font, PatternFill
 
 from accounts.views import roles_required
+from jobs.models import Job
+from jobs.queue import enqueue
 from assets.factories import AssetFactory
-from .models import Asset
-from .forms import AssetForm
+from .models import Asset, AssetImport, ReportArtifact, Stocktake, StocktakeDiscrepancy
+from .forms import AssetForm, BulkAssetActionForm, StocktakeForm, StocktakeScanForm
+from .bulk import bulk_delete_assets, bulk_update_assets
+from .scan import lookup_code
+from .stocktake import add_scans, parse_codes, reconcile
+from .importers import write_error_report
+from .reports import (
+    EXPORT_FORMATS, REPORT_TYPES, XLSX_CONTENT_TYPE, build_workbook, report_filename, report_filters,
+    report_format, request_report, stream_report,
+)
+from .analytics import DEFAULT_WINDOW_DAYS, utilization, utilization_csv, utilization_rows
+from itertools import islice
+from .filters import ASSET_LIST, USAGE_CHOICES, filter_assets
+from requests.holders import assets_held_by
 from requests.models import AssetRequest
+from accounts.models import User
 from django.db.models import Count
 import json
 from django.core.paginator import Paginator
-from django.http import HttpResponse
+from django.http import FileResponse, Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.db.models import Q
 
 
 @login_required
 def admin_manage_assets(request):
-    search_query = request.GET.get('search', '')
-    status_filter = request.GET.get('status', 'all')
-    condition_filter = request.GET.get('condition', 'all')
-
-    assets = Asset.objects.all().order_by('-created_at')
-
-    if search_query:
-        assets = assets.filter(
-            Q(asset_category__icontains=search_query) |
-            Q(model__icontains=search_query) |
-            Q(serial_number__icontains=search_query) |
-            Q(barcode__icontains=search_query)
-        )
-
-    if status_filter != 'all':
-        assets = assets.filter(status=status_filter)
-
-    if condition_filter != 'all':
-        assets = assets.filter(asset_condition=condition_filter)
-
-    paginator = Paginator(assets, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-
-    context = {
-        'page_obj': page_obj,
-        'search_query': search_query,
-        'status_filter': status_filter,
-        'condition_filter': condition_filter,
-    }
+    context = ASSET_LIST.page(request)
+    context.update({
+        'usage_choices': USAGE_CHOICES,
+        'status_choices': Asset.STATUS_CHOICES,
+        'condition_choices': Asset.CONDITION_CHOICES,
+        'category_choices': Asset.CATEGORY_CHOICES,
+    })
     return render(request, 'assets/admin_manage_assets.html', context)
 
 @login_required
 def admin_asset_detail(request, pk):
-    asset = get_object_or_404(Asset, pk=pk)
+    asset = get_object_or_404(Asset.objects.select_related('reliability'), pk=pk)
     return render(request, 'assets/admin_asset_detail.html', {'asset': asset})
 
 @login_required
@@ -95,49 +85,124 @@ def admin_delete_asset(request, pk):
     return render(request, 'assets/admin_asset_confirm_delete.html', {'asset': asset})
 
 
+# --------------------------
+# ADMIN: Bulk actions on selected assets
+# --------------------------
+@login_required
+@roles_required('admin')
+def admin_bulk_asset_action(request):
+    if request.method != 'POST':
+        return redirect('assets:admin_manage_assets')
+
+    form = BulkAssetActionForm(request.POST)
+    if not form.is_valid():
+        for error in form.non_field_errors():
+            messages.error(request, error)
+        return redirect('assets:admin_manage_assets')
+
+    action = form.cleaned_data['action']
+    value = form.cleaned_data['value']
+
+    if form.cleaned_data['apply_to_all']:
+        # Every asset matching the filters the list was showing
+        assets = filter_assets(
+            Asset.objects.all(),
+            request.POST.get('search', ''),
+            request.POST.get('status', 'all'),
+            request.POST.get('condition', 'all'),
+            request.POST.get('usage', 'all'),
+        )
+        ids = list(assets.values_list('id', flat=True))
+    else:
+        ids = form.cleaned_data['selected']
+
+    if action == 'delete':
+        count = bulk_delete_assets(ids)
+        messages.success(request, f"{count} assets deleted.")
+    elif action == 'retire':
+        count = bulk_update_assets(ids, status='retired')
+        messages.success(request, f"{count} assets retired.")
+    else:
+        count = bulk_update_assets(ids, **{action: value})
+        label = dict(BulkAssetActionForm.ACTION_CHOICES)[action].replace('Change ', '')
+        messages.success(request, f"{label.capitalize()} updated on {count} assets.")
+
+    return redirect('assets:admin_manage_assets')
+
+
+# --------------------------
+# ADMIN: Bulk import (CSV / XLSX)
+# --------------------------
+def _queue_import(request, asset_import):
+    active = Job.objects.filter(
+        kind='assets.import', payload__import_id=asset_import.pk, status__in=['queued', 'running'],
+    )
+    if active.exists():
+        messages.warning(request, "This import is already queued or running.")
+        return
+
+    # Large files take minutes; hand them to a `run_jobs` worker
+    job = enqueue('assets.import', {'import_id': asset_import.pk}, user=request.user, max_attempts=1)
+    messages.success(
+        request,
+        f"Import queued as job #{job.pk}. Progress is shown below; refresh to update."
+    )
+
 
 @login_required
-# def admin
+@roles_required('admin')
+def admin_import_assets(request):
+    if request.method == 'POST':
+        upload = request.FILES.get('file')
+        if not upload or not upload.name.lower().endswith(('.csv', '.xlsx')):
+            messages.error(request, "Please upload a .csv or .xlsx file.")
+            return redirect('assets:admin_import_assets')
+
+        asset_import = AssetImport.objects.create(file=upload, created_by=request.user)
+        _queue_import(request, asset_import)
+        return redirect('assets:admin_import_assets')
+
+    imports = AssetImport.objects.select_related('created_by')[:20]
+    return render(request, 'assets/admin_import_assets.html', {'imports': imports})
 
 
 @login_required
-def staff_manage_assets(request):
-    search_query = request.GET.get('search', '')
-    status_filter = request.GET.get('status', 'all')
-    condition_filter = request.GET.get('condition', 'all')
-
-    assets = Asset.objects.all().order_by('-created_at')
-
-    if search_query:
-        assets = assets.filter(
-            Q(asset_category__icontains=search_query) |
-            Q(model__icontains=search_query) |
-            Q(serial_number__icontains=search_query) |
-            Q(barcode__icontains=search_query)
-        )
+@roles_required('admin')
+def admin_resume_import(request, pk):
+    asset_import = get_object_or_404(AssetImport, pk=pk)
+    if request.method == 'POST':
+        if asset_import.status == 'completed':
+            messages.warning(request, "This import has already completed.")
+        else:
+            _queue_import(request, asset_import)
+    return redirect('assets:admin_import_assets')
 
-    if status_filter != 'all':
-        assets = assets.filter(status=status_filter)
 
-    if condition_filter != 'all':
-        assets = assets.filter(asset_condition=condition_filter)
+@login_required
+@roles_required('admin')
+def admin_import_errors(request, pk):
+    asset_import = get_object_or_404(AssetImport, pk=pk)
+    response = HttpResponse(content_type='text/csv')
+    response['Content-Disposition'] = f'attachment; filename=import_{asset_import.pk}_errors.csv'
+    write_error_report(asset_import, response)
+    return response
 
-    paginator = Paginator(assets, 10)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
 
-    context = {
-        'page_obj': page_obj,
-        'search_query': search_query,
-        'status_filter': status_filter,
-        'condition_filter': condition_filter,
-    }
+
+@login_required
+# def admin
+
+
+@login_required
+def staff_manage_assets(request):
+    context = ASSET_LIST.page(request)
+    context['usage_choices'] = USAGE_CHOICES
     return render(request, 'assets/staff_manage_assets.html', context)
 
 
 @login_required
 def asset_detail(request, pk):
-    asset = get_object_or_404(Asset, pk=pk)
+    asset = get_object_or_404(Asset.objects.select_related('reliability'), pk=pk)
     return render(request, 'assets/asset_detail.html', {'asset': asset})
 
 
@@ -170,132 +235,293 @@ def edit_asset(request, pk):
     return render(request, 'assets/asset_form.html', {'form': form, 'title': 'Edit Asset'}) 
 
 
+# --------------------------
+# STOCKTAKE: physical inventory audit (admin + staff)
+# --------------------------
+def _stocktake_list(request, role):
+    if request.method == 'POST':
+        form = StocktakeForm(request.POST)
+        if form.is_valid():
+            stocktake = form.save(commit=False)
+            stocktake.started_by = request.user
+            stocktake.save()
+            messages.success(request, "Stocktake started. Start scanning.")
+            return redirect(f'assets:{role}_stocktake_detail', stocktake.pk)
+    else:
+        form = StocktakeForm()
+
+    stocktakes = Stocktake.objects.select_related('started_by')
+    page_obj = Paginator(stocktakes, 10).get_page(request.GET.get('page'))
+
+    return render(request, f'assets/{role}_stocktakes.html', {
+        'form': form,
+        'page_obj': page_obj,
+        'detail_url': f'assets:{role}_stocktake_detail',
+    })
+
+
+def _stocktake_detail(request, pk, role):
+    stocktake = get_object_or_404(Stocktake, pk=pk)
+    scan_form = StocktakeScanForm()
+
+    if request.method == 'POST':
+        action = request.POST.get('action')
+
+        if action == 'scan':
+            scan_form = StocktakeScanForm(request.POST, request.FILES)
+            if scan_form.is_valid():
+                text = scan_form.cleaned_data['codes'] or ''
+                upload = scan_form.cleaned_data['file']
+                if upload:
+                    text += '\n' + upload.read().decode('utf-8-sig', errors='ignore')
+                added = add_scans(stocktake, scan_form.cleaned_data['location'], parse_codes(text))
+                messages.success(request, f"{added} scans recorded.")
+                return redirect(f'assets:{role}_stocktake_detail', stocktake.pk)
+
+        elif action == 'reconcile':
+            counts = reconcile(stocktake)
+            messages.success(
+                request,
+                f"Reconciled: {counts['missing']} missing, {counts['unexpected']} unexpected, "
+                f"{counts['unknown']} unknown."
+            )
+            return redirect(f'assets:{role}_stocktake_detail', stocktake.pk)
+
+    kind_filter = request.GET.get('kind', 'all')
+    discrepancies = stocktake.discrepancies.select_related('asset').order_by('kind', 'id')
+    if kind_filter != 'all':
+        discrepancies = discrepancies.filter(kind=kind_filter)
+    page_obj = Paginator(discrepancies, 25).get_page(request.GET.get('page'))
+
+    return render(request, f'assets/{role}_stocktake_detail.html', {
+        'stocktake': stocktake,
+        'scan_form': scan_form,
+        'page_obj': page_obj,
+        'kind_filter': kind_filter,
+        'kind_choices': StocktakeDiscrepancy.KIND_CHOICES,
+        'list_url': f'assets:{role}_stocktakes',
+    })
+
+
+@login_required
+@roles_required('admin')
+def admin_stocktakes(request):
+    return _stocktake_list(request, 'admin')
+
+
+@login_required
+@roles_required('admin')
+def admin_stocktake_detail(request, pk):
+    return _stocktake_detail(request, pk, 'admin')
+
+
+@login_required
+@roles_required('staff')
+def staff_stocktakes(request):
+    return _stocktake_list(request, 'staff')
+
+
+@login_required
+@roles_required('staff')
+def staff_stocktake_detail(request, pk):
+    return _stocktake_detail(request, pk, 'staff')
+
+
+# --------------------------
+# SCAN: barcode / serial lookup for handheld scanners
+# --------------------------
+@login_required
+@roles_required('admin', 'staff')
+def scan_asset(request):
+    code = request.GET.get('code', '').strip()
+    if not code:
+        return JsonResponse({'error': 'Missing code.'}, status=400)
+
+    result = lookup_code(code)
+    if result is None:
+        return JsonResponse({'error': f'No asset with barcode or serial "{code}".'}, status=404)
+
+    return JsonResponse(result)
+
+
+# --------------------------
+# HOLDER LOOKUP: who has this asset / what does this user have
+# --------------------------
+def _holder_lookup(request, template):
+    code = request.GET.get('code', '').strip()
+    username = request.GET.get('user', '').strip()
+
+    context = {'code': code, 'username': username}
+    if code:
+        context['asset'] = lookup_code(code)
+    elif username:
+        holder = User.objects.filter(username=username).first()
+        context['holder'] = holder
+        context['held_assets'] = assets_held_by(holder) if holder else []
+    return render(request, template, context)
+
+
+@login_required
+@roles_required('admin')
+def admin_holder_lookup(request):
+    return _holder_lookup(request, 'assets/admin_holders.html')
+
+
+@login_required
+@roles_required('staff')
+def staff_holder_lookup(request):
+    return _holder_lookup(request, 'assets/staff_holders.html')
+
+
 @login_required
 def export_report_excel(request, report_type):
-    start_date = request.GET.get('start_date')
-    end_date = request.GET.get('end_date')
-    username = request.GET.get('username')  # Only used for request_summary
-
-    # -----------------------------
-    # Safe date parsing
-    # -----------------------------
-    def parse_date(date_str):
-        if not date_str:
-            return None
-        try:
-            return datetime.datetime.strptime(date_str, "%Y-%m-%d").date()
-        except ValueError:
-            return None
-
-    start_date = parse_date(start_date)
-    end_date = parse_date(end_date)
-
-    # -----------------------------
-    # Workbook setup
-    # -----------------------------
-    wb = openpyxl.Workbook()
-    ws = wb.active
-    header_fill = PatternFill(start_color="FFCCEEFF", end_color="FFCCEEFF", fill_type="solid")
-    header_font = Font(bold=True)
-
-    # ============================================================
-    # 🔹 REPORT TYPE: ASSET USAGE
-    # ============================================================
-    if report_type == 'asset_usage':
-        ws.title = "Asset Usage Report"
-
-        headers = ["Asset Category", "Model", "Serial Number",
-                   "Total Requests", "Approved Requests"]
-        ws.append(headers)
-
-        for col, _ in enumerate(headers, 1):
-            ws.cell(row=1, column=col).font = header_font
-            ws.cell(row=1, column=col).fill = header_fill
-
-        for asset in Asset.objects.all():
-
-            requests_qs = asset.assigned_requests.all()   # ✔ FIXED REVERSE FK
-
-            if start_date:
-                requests_qs = requests_qs.filter(request_date__gte=start_date)
-            if end_date:
-                requests_qs = requests_qs.filter(request_date__lte=end_date)
-
-            ws.append([
-                asset.asset_category,
-                asset.model or "-",
-                asset.serial_number or "-",
-                requests_qs.count(),
-                requests_qs.filter(status='approved').count()
-            ])
-
-    # ============================================================
-    # 🔹 REPORT TYPE: REQUEST SUMMARY
-    # ============================================================
-    elif report_type == 'request_summary':
-
-        ws.title = "Request Summary"
-
-        headers = ["User", "Asset", "Model", "Request Date",
-                   "Return Date", "Status", "Remarks"]
-        ws.append(headers)
-
-        for col, _ in enumerate(headers, 1):
-            ws.cell(row=1, column=col).font = header_font
-            ws.cell(row=1, column=col).fill = header_fill
-
-        requests = AssetRequest.objects.select_related('assigned_asset', 'user')
-
-        if start_date:
-            requests = requests.filter(request_date__gte=start_date)
-        if end_date:
-            requests = requests.filter(request_date__lte=end_date)
-        if username:
-            requests = requests.filter(user__username__icontains=username)
-
-        for req in requests:
-            asset = req.assigned_asset
-
-            ws.append([
-                req.user.username,
-                asset.asset_category if asset else "-",
-                asset.model if asset else "-",
-                req.request_date.strftime("%Y-%m-%d"),
-                req.return_date.strftime("%Y-%m-%d") if req.return_date else "-",
-                req.status.capitalize(),
-                req.remarks or "-"
-            ])
+    if report_type not in REPORT_TYPES:
+        return HttpResponse("Invalid report type.", status=400)
+
+    fmt = report_format(request.GET)
+    if fmt is None:
+        return HttpResponse("Invalid export format.", status=400)
 
+    filters = report_filters(request.GET)
+    filename = report_filename(report_type, filters, extension=fmt)
+
+    if fmt == 'xlsx':
+        response = HttpResponse(content_type=XLSX_CONTENT_TYPE)
+        build_workbook(report_type, filters).save(response)
     else:
-        return HttpResponse("Invalid report type.", status=400)
+        # CSV / gzipped NDJSON: rows are generated and compressed as the
+        # client reads them, so memory stays flat for any extract size
+        response = StreamingHttpResponse(
+            stream_report(report_type, filters, fmt), content_type=EXPORT_FORMATS[fmt],
+        )
 
-    # -----------------------------
-    # Auto-adjust column width
-    # -----------------------------
-    for column_cells in ws.columns:
-        length = max(len(str(cell.value)) if cell.value else 0 for cell in column_cells)
-        ws.column_dimensions[column_cells[0].column_letter].width = length + 2
-
-    # -----------------------------
-    # Filename Generator
-    # -----------------------------
-    filename = f"{report_type}_{timezone.localdate()}"
-    if report_type == "request_summary" and username:
-        filename += f"_{username}"
-    filename += ".xlsx"
-
-    # -----------------------------
-    # Return Excel Response
-    # -----------------------------
-    response = HttpResponse(
-        content_type='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
-    )
     response['Content-Disposition'] = f'attachment; filename={filename}'
-    wb.save(response)
-
     return response
 
 
+# --------------------------
+# ASYNC REPORTS: queue, poll, download cached artifacts
+# --------------------------
+def _report_status_json(artifact, status_url, download_url):
+    job = artifact.job
+    return JsonResponse({
+        'artifact_id': artifact.pk,
+        'job_id': job.pk if job else None,
+        'status': artifact.status,
+        'progress': 100 if artifact.file else (job.progress if job else 0),
+        'message': job.progress_message if job else None,
+        'status_url': reverse(status_url, args=[artifact.pk]),
+        'download_url': reverse(download_url, args=[artifact.pk]) if artifact.file else None,
+    })
+
+
+def _generate_report(request, report_type, status_url, download_url):
+    if request.method != 'POST':
+        return JsonResponse({'error': 'POST required.'}, status=405)
+    if report_type not in REPORT_TYPES:
+        return JsonResponse({'error': 'Invalid report type.'}, status=400)
+
+    fmt = report_format(request.POST)
+    if fmt is None:
+        return JsonResponse({'error': 'Invalid export format.'}, status=400)
+
+    artifact = request_report(report_type, report_filters(request.POST), fmt, user=request.user)
+    return _report_status_json(artifact, status_url, download_url)
+
+
+def _report_status(request, pk, status_url, download_url):
+    artifact = get_object_or_404(ReportArtifact.objects.select_related('job'), pk=pk)
+    return _report_status_json(artifact, status_url, download_url)
+
+
+def _report_download(request, pk):
+    artifact = get_object_or_404(ReportArtifact, pk=pk)
+    if not artifact.file:
+        raise Http404("This report is not ready yet.")
+    return FileResponse(artifact.file.open('rb'), as_attachment=True,
+                        filename=report_filename(artifact.report_type, artifact.filters,
+                                                 extension=artifact.file_format))
+
+
+@login_required
+@roles_required('admin')
+def admin_generate_report(request, report_type):
+    return _generate_report(request, report_type, 'assets:admin_report_status', 'assets:admin_report_download')
+
+
+@login_required
+@roles_required('admin')
+def admin_report_status(request, pk):
+    return _report_status(request, pk, 'assets:admin_report_status', 'assets:admin_report_download')
+
+
+@login_required
+@roles_required('admin')
+def admin_report_download(request, pk):
+    return _report_download(request, pk)
+
+
+@login_required
+@roles_required('staff')
+def staff_generate_report(request, report_type):
+    return _generate_report(request, report_type, 'assets:staff_report_status', 'assets:staff_report_download')
+
+
+@login_required
+@roles_required('staff')
+def staff_report_status(request, pk):
+    return _report_status(request, pk, 'assets:staff_report_status', 'assets:staff_report_download')
+
+
+@login_required
+@roles_required('staff')
+def staff_report_download(request, pk):
+    return _report_download(request, pk)
+
+
+# --------------------------
+# UTILIZATION ANALYTICS
+# --------------------------
+UTILIZATION_WINDOWS = [30, 90, 180, 365]
+
+
+def _utilization(request, template):
+    try:
+        days = int(request.GET.get('days', DEFAULT_WINDOW_DAYS))
+    except ValueError:
+        days = DEFAULT_WINDOW_DAYS
+    if days not in UTILIZATION_WINDOWS:
+        days = DEFAULT_WINDOW_DAYS
+
+    result = utilization(days)
+
+    if request.GET.get('export') == 'csv':
+        response = StreamingHttpResponse(utilization_csv(result), content_type='text/csv')
+        filename = f"utilization_{days}d_{timezone.localdate()}.csv"
+        response['Content-Disposition'] = f'attachment; filename={filename}'
+        return response
+
+    context = {
+        'result': result,
+        'days': days,
+        'windows': UTILIZATION_WINDOWS,
+        'top_assets': list(islice(utilization_rows(result), 20)),
+    }
+    return render(request, template, context)
+
+
+@login_required
+@roles_required('admin')
+def admin_utilization(request):
+    return _utilization(request, 'assets/admin_utilization.html')
+
+
+@login_required
+@roles_required('staff')
+def staff_utilization(request):
+    return _utilization(request, 'assets/staff_utilization.html')
+
+
 
 
 
@@ -1,8 +1,14 @@
 from django.contrib import admin
+from assets.paginator import EstimatedCountPaginator
 from .models import AuditLog
 
 @admin.register(AuditLog)
 class AuditLogAdmin(admin.ModelAdmin):
     list_display = ('id', 'user', 'action', 'table_name', 'record_id', 'timestamp')
     list_filter = ('table_name',)
-    search_fields = ('action', 'user__username', 'table_name')
+    list_select_related = ('user',)
+    search_fields = ('^user__username', '^action', '^table_name')
+    autocomplete_fields = ('user',)
+    date_hierarchy = 'timestamp'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from audit.changefeed import iter_changes, ndjson_lines
+
+
+class Command(BaseCommand):
+    help = "Write the asset/request/return change feed after a cursor as NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', type=int, default=0,
+                            help="Last sequence number already processed (default: 0, full feed).")
+        parser.add_argument('--limit', type=int, default=None,
+                            help="Maximum number of change events to read.")
+        parser.add_argument('--output', default=None,
+                            help="File to write to (default: stdout).")
+
+    def handle(self, *args, **options):
+        lines = ndjson_lines(iter_changes(options['since'], options['limit']))
+
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as out:
+                out.writelines(lines)
+        else:
+            for line in lines:
+                self.stdout.write(line, ending='')
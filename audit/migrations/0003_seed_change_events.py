@@ -0,0 +1,33 @@
+from django.db import migrations
+
+
+def seed_change_events(apps, schema_editor):
+    """Log every existing row once so `since=0` is a full initial snapshot."""
+    ChangeEvent = apps.get_model('audit', 'ChangeEvent')
+    sources = [
+        ('asset', apps.get_model('assets', 'Asset')),
+        ('request', apps.get_model('requests', 'AssetRequest')),
+        ('return', apps.get_model('requests', 'AssetReturn')),
+    ]
+
+    for record_type, model in sources:
+        batch = []
+        for pk in model.objects.order_by('pk').values_list('pk', flat=True).iterator(chunk_size=5000):
+            batch.append(ChangeEvent(record_type=record_type, record_id=pk))
+            if len(batch) >= 5000:
+                ChangeEvent.objects.bulk_create(batch)
+                batch = []
+        ChangeEvent.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0002_changeevent'),
+        ('assets', '0010_asset_updated_at'),
+        ('requests', '0009_alter_assetrequest_updated_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(seed_change_events, migrations.RunPython.noop),
+    ]
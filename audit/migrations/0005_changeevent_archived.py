@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0004_auditlog_timestamp_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='changeevent',
+            name='archived',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:41
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0005_changeevent_archived'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='auditlog',
+            name='action',
+            field=models.CharField(db_index=True, max_length=255),
+        ),
+        migrations.AlterField(
+            model_name='auditlog',
+            name='table_name',
+            field=models.CharField(db_index=True, max_length=100),
+        ),
+    ]
@@ -1,9 +1,61 @@
-from django.db import models
+from django.db import models, transaction
 from accounts.models import User
 
 class AuditLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
-    action = models.CharField(max_length=255)
-    table_name = models.CharField(max_length=100)
+    # Indexed for the admin's prefix (^) search and table filter
+    action = models.CharField(max_length=255, db_index=True)
+    table_name = models.CharField(max_length=100, db_index=True)
     record_id = models.IntegerField()
-    timestamp = models.DateTimeField(auto_now_add=True)
+    timestamp = models.DateTimeField(auto_now_add=True, db_index=True)
+
+
+# ============================================================
+# CHANGE FEED
+# ============================================================
+class ChangeEvent(models.Model):
+    """
+    One row per write to an asset, request or return.
+
+    The auto-increment `id` is the feed's monotonic cursor: consumers keep
+    the last id they saw and ask for `since=<id>` to receive only the delta.
+    Events are inserted once the writing transaction has committed, so ids
+    follow commit order and a long import or archive batch cannot surface
+    ids below a cursor consumers have already passed.
+    Deletes are kept as tombstones (`deleted=True`); rows moved to the
+    archive tables are tombstones with `archived=True` as well, so
+    consumers can tell "moved to cold storage" from "deleted".
+    """
+    ASSET = 'asset'
+    REQUEST = 'request'
+    RETURN = 'return'
+
+    RECORD_TYPE_CHOICES = [
+        (ASSET, 'Asset'),
+        (REQUEST, 'Asset Request'),
+        (RETURN, 'Asset Return'),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    record_type = models.CharField(max_length=20, choices=RECORD_TYPE_CHOICES)
+    record_id = models.BigIntegerField()
+    deleted = models.BooleanField(default=False)
+    archived = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    @classmethod
+    def record(cls, record_type, ids, deleted=False, archived=False):
+        """
+        Log a change for many rows at once (for bulk/queryset writes that skip
+        signals). `ids` is read now; the events are written on commit.
+        """
+        events = [
+            cls(record_type=record_type, record_id=pk, deleted=deleted or archived, archived=archived)
+            for pk in ids
+        ]
+        if events:
+            transaction.on_commit(lambda: cls.objects.bulk_create(events, batch_size=1000))
+
+    def __str__(self):
+        action = 'archived' if self.archived else 'deleted' if self.deleted else 'changed'
+        return f"#{self.id} {self.record_type} {self.record_id} {action}"
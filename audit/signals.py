@@ -0,0 +1,38 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+
+from assets.models import Asset
+from requests.models import AssetRequest, AssetReturn
+from .models import ChangeEvent
+
+
+FEED_MODELS = {
+    Asset: ChangeEvent.ASSET,
+    AssetRequest: ChangeEvent.REQUEST,
+    AssetReturn: ChangeEvent.RETURN,
+}
+
+
+def log_save(sender, instance, **kwargs):
+    ChangeEvent.record(FEED_MODELS[sender], [instance.pk])
+
+
+def log_delete(sender, instance, **kwargs):
+    ChangeEvent.record(FEED_MODELS[sender], [instance.pk], deleted=True)
+
+
+def log_detached_requests(sender, instance, **kwargs):
+    # SET_NULL on AssetRequest.assigned_asset is a plain UPDATE with no
+    # signals, so the affected requests are logged here instead.
+    ChangeEvent.record(
+        ChangeEvent.REQUEST,
+        instance.assigned_requests.values_list('id', flat=True),
+    )
+
+
+# Connected per model (not globally) so unrelated deletes keep Django's
+# fast-delete path.
+for model in FEED_MODELS:
+    post_save.connect(log_save, sender=model)
+    post_delete.connect(log_delete, sender=model)
+
+pre_delete.connect(log_detached_requests, sender=Asset)
@@ -1,3 +1,134 @@
-from django.test import TestCase
+import json
 
-# Create your tests here.
+from django.db import transaction
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from accounts.models import User
+from assets.models import Asset
+from .changefeed import iter_changes
+from .models import ChangeEvent
+
+
+def last_seq():
+    return ChangeEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+@override_settings(CHANGE_FEED_SETTLE_SECONDS=0)
+class ChangeFeedTests(TestCase):
+    def setUp(self):
+        self.asset = Asset.objects.create(model='X1', serial_number='S-1')
+
+    def test_since_returns_only_later_changes(self):
+        since = last_seq()
+        with self.captureOnCommitCallbacks(execute=True):
+            other = Asset.objects.create(model='X2', serial_number='S-2')
+
+        entries = list(iter_changes(since))
+
+        self.assertEqual([(e['type'], e['id'], e['op']) for e in entries], [('asset', other.pk, 'upsert')])
+        self.assertEqual(entries[0]['data']['serial_number'], 'S-2')
+        self.assertGreater(entries[0]['seq'], since)
+
+    def test_changes_to_one_record_collapse_to_the_latest(self):
+        since = last_seq()
+        for name in ('A', 'B', 'C'):
+            self.asset.model = name
+            with self.captureOnCommitCallbacks(execute=True):
+                self.asset.save()
+
+        entries = list(iter_changes(since))
+
+        self.assertEqual(len(entries), 1)
+        self.assertEqual(entries[0]['seq'], last_seq())
+        self.assertEqual(entries[0]['data']['model'], 'C')
+
+    def test_delete_is_a_tombstone(self):
+        since = last_seq()
+        pk = self.asset.pk
+        with self.captureOnCommitCallbacks(execute=True):
+            self.asset.delete()
+
+        entries = list(iter_changes(since))
+
+        self.assertEqual(entries, [{'seq': last_seq(), 'type': 'asset', 'id': pk, 'op': 'delete'}])
+
+    def test_limit_and_cursor_resume(self):
+        since = last_seq()
+        with self.captureOnCommitCallbacks(execute=True):
+            for i in range(3):
+                Asset.objects.create(serial_number=f'S-L{i}')
+
+        first = list(iter_changes(since, limit=2))
+        rest = list(iter_changes(first[-1]['seq']))
+
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(rest), 1)
+        self.assertLess(first[-1]['seq'], rest[0]['seq'])
+
+    @override_settings(CHANGE_FEED_SETTLE_SECONDS=60)
+    def test_unsettled_events_are_held_back(self):
+        since = last_seq()
+        with self.captureOnCommitCallbacks(execute=True):
+            Asset.objects.create(serial_number='S-NEW')
+
+        self.assertEqual(list(iter_changes(since)), [])
+
+    def test_events_are_written_when_their_transaction_commits(self):
+        since = last_seq()
+        # A long transaction writes first but commits last
+        with self.captureOnCommitCallbacks() as slow_commit:
+            self.asset.model = 'X9'
+            self.asset.save()
+        with self.captureOnCommitCallbacks(execute=True):
+            quick = Asset.objects.create(serial_number='S-QUICK')
+
+        [entry] = iter_changes(since)
+        self.assertEqual(entry['id'], quick.pk)
+        cursor = entry['seq']
+
+        for callback in slow_commit:
+            callback()
+
+        # The slow write lands above the cursor the consumer already holds
+        self.assertEqual([(e['id'], e['data']['model']) for e in iter_changes(cursor)], [(self.asset.pk, 'X9')])
+
+    def test_rolled_back_writes_leave_no_events(self):
+        since = last_seq()
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    Asset.objects.create(serial_number='S-GONE')
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+
+        self.assertEqual(last_seq(), since)
+
+
+@override_settings(CHANGE_FEED_SETTLE_SECONDS=0)
+class ChangeFeedViewTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user('staff', password='x', role='staff')
+
+    def test_streams_ndjson_for_staff(self):
+        since = last_seq()
+        with self.captureOnCommitCallbacks(execute=True):
+            asset = Asset.objects.create(serial_number='S-API')
+        self.client.force_login(self.staff)
+
+        response = self.client.get(reverse('api:changes'), {'since': since})
+
+        self.assertEqual(response.status_code, 200)
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual([json.loads(line)['id'] for line in lines], [asset.pk])
+
+    def test_rejects_bad_cursor(self):
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('api:changes'), {'since': 'abc'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_normal_users_are_refused(self):
+        self.client.force_login(User.objects.create_user('user', password='x'))
+        response = self.client.get(reverse('api:changes'))
+        self.assertEqual(response.status_code, 403)
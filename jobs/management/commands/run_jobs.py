@@ -0,0 +1,119 @@
+import multiprocessing
+import time
+import traceback
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError
+
+from jobs.queue import abandon, claim, requeue_stale, worker_name
+from jobs.worker import execute, init_process
+
+
+# How often a running worker requeues jobs abandoned by dead workers
+STALE_SWEEP_SECONDS = 60
+
+
+class Command(BaseCommand):
+    help = "Run background jobs from the database queue in a pool of worker processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2,
+                            help="Jobs to run in parallel (default: 2).")
+        parser.add_argument('--kind', action='append', dest='kinds',
+                            help="Only run jobs of this kind (repeatable).")
+        parser.add_argument('--poll-interval', type=float, default=2.0,
+                            help="Seconds to sleep when the queue is empty (default: 2).")
+        parser.add_argument('--stale-after', type=int, default=30,
+                            help="Requeue running jobs with no progress for this many minutes (default: 30).")
+        parser.add_argument('--once', action='store_true',
+                            help="Exit when the queue is empty instead of polling.")
+
+    def _pool(self, processes):
+        # spawn, not fork: forked children would share the parent's open
+        # database socket and corrupt each other's protocol state
+        return ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=init_process,
+        )
+
+    def _abandon(self, job_id, exc):
+        """A job whose process died or raised outside run_job(): retry it or mark it failed."""
+        error = ''.join(traceback.format_exception(exc))
+        self.stderr.write(f"Job #{job_id} crashed: {exc!r}")
+        try:
+            status = abandon(job_id, error)
+        except DatabaseError as db_exc:
+            # Left running; the periodic stale sweep requeues it
+            self.stderr.write(f"Could not release job #{job_id}: {db_exc!r}")
+            return
+        if status:
+            self.stdout.write(f"Job #{job_id} {'requeued' if status == 'queued' else 'failed'}.")
+
+    def _requeue_stale(self, stale_after, keep=()):
+        try:
+            requeued = requeue_stale(stale_after, keep=keep)
+        except DatabaseError as exc:
+            self.stderr.write(f"Stale job sweep failed: {exc!r}")
+            return
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale jobs.")
+
+    def handle(self, *args, **options):
+        processes = max(1, options['processes'])
+        stale_after = timedelta(minutes=options['stale_after'])
+        worker = worker_name()
+
+        self._requeue_stale(stale_after)
+        last_sweep = time.monotonic()
+
+        in_flight = {}
+        pool = self._pool(processes)
+        try:
+            while True:
+                # Jobs of workers that died since start-up go back on the queue
+                if time.monotonic() - last_sweep >= STALE_SWEEP_SECONDS:
+                    self._requeue_stale(stale_after, keep=list(in_flight.values()))
+                    last_sweep = time.monotonic()
+
+                broken = False
+                free = processes - len(in_flight)
+                if free:
+                    for job_id in claim(worker, limit=free, kinds=options['kinds']):
+                        try:
+                            in_flight[pool.submit(execute, job_id)] = job_id
+                        except BrokenProcessPool as exc:
+                            self._abandon(job_id, exc)
+                            broken = True
+
+                if not in_flight and not broken:
+                    if options['once']:
+                        break
+                    time.sleep(options['poll_interval'])
+                    continue
+
+                done, _ = wait(in_flight, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+                for future in done:
+                    job_id = in_flight.pop(future)
+                    try:
+                        ok = future.result()
+                    except Exception as exc:
+                        # A killed worker (e.g. OOM) breaks the whole pool
+                        broken = broken or isinstance(exc, BrokenProcessPool)
+                        self._abandon(job_id, exc)
+                        continue
+                    self.stdout.write(f"Job #{job_id} {'succeeded' if ok else 'failed'}.")
+
+                if broken:
+                    # The jobs still in the dead pool will not finish either
+                    for job_id in in_flight.values():
+                        self._abandon(job_id, BrokenProcessPool("Worker pool broken"))
+                    in_flight.clear()
+                    pool.shutdown(wait=False, cancel_futures=True)
+                    self.stderr.write("Worker pool broken; starting a new one.")
+                    pool = self._pool(processes)
+        finally:
+            pool.shutdown(wait=True)
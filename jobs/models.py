@@ -0,0 +1,59 @@
+from django.db import models
+from django.utils import timezone
+
+from accounts.models import User
+
+
+# ============================================================
+# BACKGROUND JOBS
+# ============================================================
+class Job(models.Model):
+    """
+    A unit of background work, run by `manage.py run_jobs`.
+
+    `kind` names a handler registered with `jobs.queue.handler`; `payload`
+    holds its JSON arguments. Handlers report progress on the row and may
+    attach a result file (`artifact`, stored under MEDIA_ROOT/jobs/).
+    """
+    STATUS_CHOICES = [
+        ('queued', 'Queued'),
+        ('running', 'Running'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    kind = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='queued')
+    run_after = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+
+    locked_by = models.CharField(max_length=100, blank=True, null=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+
+    progress = models.PositiveSmallIntegerField(default=0)  # percent
+    progress_message = models.CharField(max_length=255, blank=True, null=True)
+    result = models.JSONField(null=True, blank=True)
+    artifact = models.FileField(upload_to='jobs/%Y/%m/', blank=True, null=True)
+    last_error = models.TextField(blank=True, null=True)
+
+    created_by = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-id']
+        indexes = [
+            # The workers' claim query
+            models.Index(fields=['status', 'run_after'], name='job_claim_idx'),
+        ]
+
+    @property
+    def is_finished(self):
+        return self.status in ('succeeded', 'failed')
+
+    def __str__(self):
+        return f"#{self.pk} {self.kind} ({self.status})"
@@ -0,0 +1,174 @@
+"""
+Database-backed job queue.
+
+Producers call `enqueue()`; `manage.py run_jobs` workers `claim()` due jobs
+and `run_job()` them. Claiming uses `SELECT ... FOR UPDATE SKIP LOCKED`
+where the database supports it (MySQL 8, PostgreSQL), so concurrent
+workers never block on or double-claim the same rows. Elsewhere (SQLite)
+each candidate is taken with a conditional UPDATE that only one worker
+can win.
+"""
+import os
+import socket
+import tempfile
+import traceback
+from contextlib import contextmanager
+from datetime import timedelta
+
+from django.core.files.base import ContentFile, File
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import Job
+
+
+RETRY_BASE_SECONDS = 60
+
+HANDLERS = {}
+
+
+def handler(kind):
+    """Register `func(job, ctx)` as the handler for a job kind."""
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(kind, payload=None, user=None, max_attempts=3, run_after=None):
+    if kind not in HANDLERS:
+        raise ValueError(f"No job handler registered for '{kind}'.")
+    return Job.objects.create(
+        kind=kind,
+        payload=payload or {},
+        created_by=user,
+        max_attempts=max_attempts,
+        run_after=run_after or timezone.now(),
+    )
+
+
+def worker_name():
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def claim(worker, limit=1, kinds=None):
+    """Mark up to `limit` due jobs as running for `worker`. Returns their ids."""
+    now = timezone.now()
+    due = Job.objects.filter(status='queued', run_after__lte=now).order_by('run_after', 'id')
+    if kinds:
+        due = due.filter(kind__in=kinds)
+
+    running = dict(
+        status='running', locked_by=worker, locked_at=now, started_at=now,
+        attempts=F('attempts') + 1,
+    )
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            Job.objects.filter(pk__in=ids).update(**running)
+        return ids
+
+    # No SKIP LOCKED: compare-and-swap on status, losers move on
+    ids = []
+    for pk in due.values_list('id', flat=True)[:limit * 4]:
+        if Job.objects.filter(pk=pk, status='queued').update(**running):
+            ids.append(pk)
+            if len(ids) == limit:
+                break
+    return ids
+
+
+def requeue_stale(older_than, keep=()):
+    """
+    Put back running jobs whose worker stopped heartbeating (e.g. it was
+    killed). `keep` are job ids the caller knows are still running.
+    """
+    cutoff = timezone.now() - older_than
+    return Job.objects.filter(status='running', locked_at__lt=cutoff).exclude(pk__in=keep).update(
+        status='queued', locked_by=None, locked_at=None,
+    )
+
+
+class JobContext:
+    """Handed to handlers for progress reporting and result files."""
+
+    def __init__(self, job):
+        self.job = job
+
+    def progress(self, percent=None, message=None):
+        """Record progress. Also refreshes the lock so the job is not seen as stale."""
+        changes = {'locked_at': timezone.now()}
+        if percent is not None:
+            changes['progress'] = max(0, min(100, int(percent)))
+        if message is not None:
+            changes['progress_message'] = message[:255]
+        Job.objects.filter(pk=self.job.pk).update(**changes)
+
+    def save_artifact(self, filename, content):
+        """Store bytes or a file object as the job's downloadable result."""
+        if isinstance(content, bytes):
+            content = ContentFile(content)
+        elif not isinstance(content, File):
+            content = File(content)
+        self.job.artifact.save(filename, content, save=False)
+        Job.objects.filter(pk=self.job.pk).update(artifact=self.job.artifact.name)
+
+    @contextmanager
+    def open_artifact(self, filename):
+        """Yield a temporary binary file that is stored as the artifact on exit."""
+        with tempfile.TemporaryFile() as tmp:
+            yield tmp
+            tmp.seek(0)
+            self.save_artifact(filename, File(tmp))
+
+
+def record_failure(job, error):
+    """
+    Schedule a retry with exponential backoff, or mark the job failed once
+    its attempts are used up (or no handler exists). Returns the new status.
+    """
+    now = timezone.now()
+    if job.attempts < job.max_attempts and job.kind in HANDLERS:
+        Job.objects.filter(pk=job.pk).update(
+            status='queued', locked_by=None, locked_at=None, last_error=error,
+            run_after=now + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (job.attempts - 1)),
+        )
+        return 'queued'
+    Job.objects.filter(pk=job.pk).update(
+        status='failed', locked_by=None, last_error=error, finished_at=now,
+    )
+    return 'failed'
+
+
+def abandon(job_id, error):
+    """
+    Release a claimed job whose run ended outside `run_job()`'s own error
+    handling (worker process killed, database error). Returns the new
+    status, or None if the job had already finished.
+    """
+    job = Job.objects.filter(pk=job_id, status='running').first()
+    if job is None:
+        return None
+    return record_failure(job, error)
+
+
+def run_job(job_id):
+    """Run one claimed job to completion, scheduling a retry if it raises."""
+    job = Job.objects.get(pk=job_id)
+    func = HANDLERS.get(job.kind)
+
+    try:
+        if func is None:
+            raise LookupError(f"No job handler registered for '{job.kind}'.")
+        result = func(job, JobContext(job))
+    except Exception:
+        record_failure(job, traceback.format_exc())
+        return False
+
+    Job.objects.filter(pk=job.pk).update(
+        status='succeeded', progress=100, result=result, locked_by=None,
+        finished_at=timezone.now(),
+    )
+    return True
@@ -0,0 +1,117 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from .models import Job
+from .queue import (
+    RETRY_BASE_SECONDS, JobContext, abandon, claim, enqueue, handler, requeue_stale, run_job,
+)
+
+
+@handler('tests.echo')
+def echo(job, ctx):
+    ctx.progress(50, "Halfway")
+    return {'echo': job.payload.get('value')}
+
+
+@handler('tests.boom')
+def boom(job, ctx):
+    raise RuntimeError("boom")
+
+
+class ClaimTests(TestCase):
+    def test_enqueue_requires_a_registered_handler(self):
+        with self.assertRaises(ValueError):
+            enqueue('tests.missing')
+
+    def test_claim_takes_due_jobs_once(self):
+        first = enqueue('tests.echo')
+        second = enqueue('tests.echo')
+        enqueue('tests.echo', run_after=timezone.now() + timedelta(hours=1))
+
+        self.assertEqual(claim('w1', limit=1), [first.pk])
+        self.assertEqual(claim('w2', limit=5), [second.pk])
+        self.assertEqual(claim('w3', limit=5), [])
+
+        first.refresh_from_db()
+        self.assertEqual((first.status, first.locked_by, first.attempts), ('running', 'w1', 1))
+
+    def test_claim_filters_by_kind(self):
+        enqueue('tests.echo')
+        boom_job = enqueue('tests.boom')
+        self.assertEqual(claim('w1', limit=5, kinds=['tests.boom']), [boom_job.pk])
+
+
+class RunJobTests(TestCase):
+    def run_claimed(self, job):
+        self.assertEqual(claim('w1', kinds=[job.kind]), [job.pk])
+        ok = run_job(job.pk)
+        job.refresh_from_db()
+        return ok
+
+    def test_success_stores_result(self):
+        job = enqueue('tests.echo', {'value': 7})
+
+        self.assertTrue(self.run_claimed(job))
+        self.assertEqual((job.status, job.progress, job.result), ('succeeded', 100, {'echo': 7}))
+        self.assertIsNone(job.locked_by)
+
+    def test_failure_retries_with_backoff_then_fails(self):
+        job = enqueue('tests.boom', max_attempts=2)
+
+        before = timezone.now()
+        self.assertFalse(self.run_claimed(job))
+        self.assertEqual((job.status, job.attempts), ('queued', 1))
+        self.assertIn("boom", job.last_error)
+        self.assertGreaterEqual(job.run_after, before + timedelta(seconds=RETRY_BASE_SECONDS))
+
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+        self.assertFalse(self.run_claimed(job))
+        self.assertEqual((job.status, job.attempts), ('failed', 2))
+        self.assertIsNotNone(job.finished_at)
+
+    def test_progress_refreshes_the_lock(self):
+        job = enqueue('tests.echo')
+        claim('w1')
+        stale = timezone.now() - timedelta(hours=1)
+        Job.objects.filter(pk=job.pk).update(locked_at=stale)
+
+        JobContext(job).progress(40, "Working")
+
+        job.refresh_from_db()
+        self.assertEqual((job.progress, job.progress_message), (40, "Working"))
+        self.assertGreater(job.locked_at, stale)
+
+
+class RecoveryTests(TestCase):
+    def setUp(self):
+        self.job = enqueue('tests.echo', max_attempts=2)
+        claim('w1')
+
+    def test_requeue_stale_puts_back_silent_jobs(self):
+        Job.objects.filter(pk=self.job.pk).update(locked_at=timezone.now() - timedelta(hours=1))
+
+        self.assertEqual(requeue_stale(timedelta(minutes=30), keep=[self.job.pk]), 0)
+        self.assertEqual(requeue_stale(timedelta(minutes=30)), 1)
+
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.status, self.job.locked_by), ('queued', None))
+
+    def test_requeue_stale_leaves_live_jobs(self):
+        self.assertEqual(requeue_stale(timedelta(minutes=30)), 0)
+
+    def test_abandon_retries_then_fails_a_crashed_job(self):
+        self.assertEqual(abandon(self.job.pk, "worker killed"), 'queued')
+        Job.objects.filter(pk=self.job.pk).update(run_after=timezone.now())
+        claim('w1')
+        self.assertEqual(abandon(self.job.pk, "worker killed"), 'failed')
+
+        self.job.refresh_from_db()
+        self.assertEqual((self.job.status, self.job.last_error), ('failed', "worker killed"))
+
+    def test_abandon_ignores_finished_jobs(self):
+        run_job(self.job.pk)
+        self.assertIsNone(abandon(self.job.pk, "late crash report"))
+        self.job.refresh_from_db()
+        self.assertEqual(self.job.status, 'succeeded')
@@ -0,0 +1,41 @@
+import os
+
+from django.contrib.auth.decorators import login_required
+from django.http import FileResponse, Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+
+from .models import Job
+
+
+def _get_job(request, pk):
+    job = get_object_or_404(Job, pk=pk)
+    # Admins see every job; everyone else only their own
+    if request.user.role != 'admin' and job.created_by_id != request.user.pk:
+        raise Http404
+    return job
+
+
+@login_required
+def job_status(request, pk):
+    """Progress poll: JSON snapshot of a job."""
+    job = _get_job(request, pk)
+    return JsonResponse({
+        'id': job.pk,
+        'kind': job.kind,
+        'status': job.status,
+        'progress': job.progress,
+        'message': job.progress_message,
+        'finished': job.is_finished,
+        'error': job.last_error.strip().splitlines()[-1] if job.status == 'failed' and job.last_error else None,
+        'download_url': reverse('jobs:job_artifact', args=[job.pk]) if job.artifact else None,
+    })
+
+
+@login_required
+def job_artifact(request, pk):
+    job = _get_job(request, pk)
+    if job.status != 'succeeded' or not job.artifact:
+        raise Http404("This job has no result file.")
+    return FileResponse(job.artifact.open('rb'), as_attachment=True,
+                        filename=os.path.basename(job.artifact.name))
@@ -0,0 +1,17 @@
+"""
+Entry points for `run_jobs` pool processes.
+
+Pool processes are spawned from a clean interpreter, so this module must
+not import models at import time: `init_process` loads settings and the
+app registry (which registers the job handlers) first.
+"""
+
+
+def init_process():
+    import django
+    django.setup()
+
+
+def execute(job_id):
+    from .queue import run_job
+    return run_job(job_id)
@@ -41,12 +41,16 @@ INSTALLED_APPS = [
     'django.contrib.staticfiles',
     
     'widget_tweaks',  
+    'rest_framework',
 
     # Local apps
     'assets',
     'accounts',
     'audit',
     'requests',
+    'api',
+    'notifications',
+    'jobs',
 ]
 
 MIDDLEWARE = [
@@ -163,6 +167,25 @@ MEDIA_ROOT = BASE_DIR / 'media'
 # Email config (for notifications)
 EMAIL_BACKEND = 'django.core.mail.backends.console.EmailBackend'  # Dev mode
 # later: configure SMTP for production
+# Notifications are queued in the outbox and sent by `manage.py send_notifications`
+
+# Background jobs (imports, exports) run in `manage.py run_jobs`
+# workers; keep at least one running in production.
+
+# REST API (read-only integration endpoints under /api/v1/)
+REST_FRAMEWORK = {
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'rest_framework.authentication.SessionAuthentication',
+        'rest_framework.authentication.BasicAuthentication',
+    ],
+    'DEFAULT_PERMISSION_CLASSES': [
+        'rest_framework.permissions.IsAuthenticated',
+    ],
+}
+
+# Change feed: hold back events younger than this so in-flight transactions
+# cannot commit a lower sequence number behind a consumer's cursor
+CHANGE_FEED_SETTLE_SECONDS = 5
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -23,6 +23,8 @@ urlpatterns = [
     # Correct inclusion for the assets app
     path('assets/', include('assets.urls', namespace='assets')),
     path('requests/', include('requests.urls', namespace='requests')),
+    path('api/', include('api.urls', namespace='api')),
+    path('jobs/', include('jobs.urls', namespace='jobs')),
 ]
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
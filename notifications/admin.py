@@ -0,0 +1,10 @@
+from django.contrib import admin
+from .models import Notification
+
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('id', 'email', 'kind', 'status', 'attempts', 'created_at', 'sent_at')
+    list_filter = ('status', 'kind')
+    search_fields = ('email', 'subject')
+    raw_id_fields = ('recipient', 'borrow_request')
@@ -0,0 +1,149 @@
+"""
+Drain the notification outbox.
+
+Due rows are claimed in id-ordered batches and sent over one reused
+backend connection (a single SMTP login for the whole run). A failed
+message is retried with exponential backoff and marked `failed` after
+`max_attempts`. In digest mode all due rows for a recipient go out as one
+email.
+
+Claiming works like `jobs.queue.claim`: `SELECT ... FOR UPDATE SKIP
+LOCKED` where supported, a conditional UPDATE per row elsewhere. A claimed
+row is `sending` with a lease in `next_attempt_at`, so overlapping
+dispatchers never send it twice, and a dispatcher that dies mid-run only
+delays its rows until the lease runs out.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import connection, transaction
+from django.db.models import F
+from django.template.loader import render_to_string
+from django.utils import timezone
+
+from .models import Notification
+
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+RETRY_BASE_SECONDS = 60
+CLAIM_SECONDS = 15 * 60  # a claimed row is reclaimable after this
+
+
+def due_notifications(now=None):
+    """Pending rows that are due, and claims whose lease has run out."""
+    now = now or timezone.now()
+    return Notification.objects.filter(status__in=['pending', 'sending'], next_attempt_at__lte=now)
+
+
+def claim(limit=None, emails=None):
+    """
+    Mark up to `limit` due rows (of the given `emails`, if any) as
+    `sending`, in id order. Returns them; rows another dispatcher holds
+    are skipped.
+    """
+    now = timezone.now()
+    due = due_notifications(now).order_by('id')
+    if emails is not None:
+        due = due.filter(email__in=emails)
+    sending = dict(status='sending', next_attempt_at=now + timedelta(seconds=CLAIM_SECONDS))
+
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            ids = list(due.select_for_update(skip_locked=True).values_list('id', flat=True)[:limit])
+            Notification.objects.filter(pk__in=ids).update(**sending)
+    else:
+        # No SKIP LOCKED: compare-and-swap on the due condition, losers move on
+        ids = []
+        for pk in due.values_list('id', flat=True)[:limit]:
+            if due.filter(pk=pk).update(**sending):
+                ids.append(pk)
+
+    return list(Notification.objects.filter(pk__in=ids).select_related('recipient', 'borrow_request'))
+
+
+def _message(rows, connection):
+    if len(rows) == 1:
+        subject, body = rows[0].subject, rows[0].body
+    else:
+        subject = f"{len(rows)} updates on your asset requests"
+        body = render_to_string("notifications/email/digest.txt", {
+            'user': rows[0].recipient,
+            'notifications': rows,
+        })
+    return EmailMessage(
+        subject=subject,
+        body=body,
+        from_email=settings.DEFAULT_FROM_EMAIL,
+        to=[rows[0].email],
+        connection=connection,
+    )
+
+
+def _mark_sent(rows):
+    Notification.objects.filter(pk__in=[n.pk for n in rows]).update(
+        status='sent',
+        sent_at=timezone.now(),
+        attempts=F('attempts') + 1,
+        last_error=None,
+    )
+
+
+def _mark_failed(rows, error, max_attempts):
+    now = timezone.now()
+    for n in rows:
+        n.attempts += 1
+        n.last_error = str(error)[:2000]
+        if n.attempts >= max_attempts:
+            n.status = 'failed'
+        else:
+            n.status = 'pending'
+            n.next_attempt_at = now + timedelta(seconds=RETRY_BASE_SECONDS * 2 ** (n.attempts - 1))
+    Notification.objects.bulk_update(rows, ['attempts', 'last_error', 'status', 'next_attempt_at'])
+
+
+def _batches(digest, batch_size):
+    """Claim and yield lists of rows that go out as one email each."""
+    if not digest:
+        while True:
+            batch = claim(batch_size)
+            if not batch:
+                return
+            for n in batch:
+                yield [n]
+
+    # Digest: page through recipients, then claim all their due rows at once
+    emails = list(due_notifications().order_by('email').values_list('email', flat=True).distinct())
+    for start in range(0, len(emails), batch_size):
+        grouped = {}
+        for n in claim(emails=emails[start:start + batch_size]):
+            grouped.setdefault(n.email, []).append(n)
+        yield from grouped.values()
+
+
+def send_pending(digest=False, batch_size=BATCH_SIZE, max_attempts=MAX_ATTEMPTS, connection=None):
+    """
+    Send every due notification. Overlapping runs split the rows between
+    them (see `claim()`).
+
+    Returns `(sent, failed)` counts of outbox rows.
+    """
+    connection = connection or get_connection()
+    sent = failed = 0
+
+    connection.open()
+    try:
+        for rows in _batches(digest, batch_size):
+            try:
+                _message(rows, connection).send()
+            except Exception as exc:
+                _mark_failed(rows, exc, max_attempts)
+                failed += len(rows)
+            else:
+                _mark_sent(rows)
+                sent += len(rows)
+    finally:
+        connection.close()
+
+    return sent, failed
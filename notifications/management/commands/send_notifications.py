@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+
+from notifications.dispatch import BATCH_SIZE, MAX_ATTEMPTS, send_pending
+
+
+class Command(BaseCommand):
+    help = (
+        "Send queued notification emails over one mail connection. "
+        "Schedule it (e.g. cron every minute, or hourly with --digest)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--digest', action='store_true',
+                            help="Group all due notifications per recipient into one email.")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help=f"Rows (or recipients with --digest) read per query (default: {BATCH_SIZE}).")
+        parser.add_argument('--max-attempts', type=int, default=MAX_ATTEMPTS,
+                            help=f"Give up on a message after this many failures (default: {MAX_ATTEMPTS}).")
+
+    def handle(self, *args, **options):
+        sent, failed = send_pending(
+            digest=options['digest'],
+            batch_size=options['batch_size'],
+            max_attempts=options['max_attempts'],
+        )
+        self.stdout.write(self.style.SUCCESS(f"{sent} notifications sent, {failed} failed."))
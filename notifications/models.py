@@ -0,0 +1,65 @@
+from django.db import models
+from django.utils import timezone
+
+from accounts.models import User
+
+
+# ============================================================
+# EMAIL OUTBOX
+# ============================================================
+class Notification(models.Model):
+    """
+    One queued email.
+
+    Rows are written in the same transaction as the change they announce,
+    so a rolled-back approval never sends mail and a committed one always
+    does. `manage.py send_notifications` drains the queue.
+    """
+    KIND_CHOICES = [
+        ('approved', 'Request Approved'),
+        ('rejected', 'Request Rejected'),
+        ('returned', 'Asset Returned'),
+        ('overdue', 'Loan Overdue'),
+    ]
+
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    recipient = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='notifications'
+    )
+    email = models.EmailField()
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    borrow_request = models.ForeignKey(
+        'requests.AssetRequest',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='notifications'
+    )
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True, null=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            # The dispatcher's "due now" scan
+            models.Index(fields=['status', 'next_attempt_at'], name='notif_due_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} -> {self.email} ({self.status})"
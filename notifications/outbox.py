@@ -0,0 +1,46 @@
+"""
+Queue notification emails.
+
+Views call `enqueue()` inside the same transaction as the status change,
+which only costs an INSERT; delivery happens later in
+`manage.py send_notifications` (see dispatch.py).
+"""
+from django.template.loader import render_to_string
+
+from .models import Notification
+
+
+SUBJECTS = {
+    'approved': "Your asset request has been approved",
+    'rejected': "Your asset request has been rejected",
+    'returned': "Asset return received",
+    'overdue': "Asset loan overdue",
+}
+
+
+def build(kind, borrow_request):
+    """Return an unsaved Notification for a request's borrower, or None if they have no email."""
+    user = borrow_request.user
+    if not user.email:
+        return None
+
+    body = render_to_string(f"notifications/email/{kind}.txt", {
+        'user': user,
+        'req': borrow_request,
+        'asset': borrow_request.assigned_asset,
+    })
+    return Notification(
+        recipient=user,
+        email=user.email,
+        kind=kind,
+        borrow_request=borrow_request,
+        subject=SUBJECTS[kind],
+        body=body,
+    )
+
+
+def enqueue(kind, borrow_requests):
+    """Queue one email per request. Returns the number queued."""
+    rows = [n for n in (build(kind, req) for req in borrow_requests) if n]
+    Notification.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
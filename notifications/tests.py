@@ -0,0 +1,89 @@
+from datetime import timedelta
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from accounts.models import User
+from .dispatch import RETRY_BASE_SECONDS, claim, send_pending
+from .models import Notification
+
+
+@override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+class DispatchTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user('alice', email='alice@example.com', password='x')
+        self.bob = User.objects.create_user('bob', email='bob@example.com', password='x')
+
+    def queue(self, user, kind='approved'):
+        return Notification.objects.create(
+            recipient=user, email=user.email, kind=kind, subject=f"{kind} for {user.username}", body="Hello",
+        )
+
+    def statuses(self):
+        return list(Notification.objects.order_by('id').values_list('status', 'attempts'))
+
+    def test_immediate_mode_sends_one_email_per_row(self):
+        self.queue(self.alice)
+        self.queue(self.alice, 'returned')
+        self.queue(self.bob)
+
+        self.assertEqual(send_pending(batch_size=2), (3, 0))
+
+        self.assertEqual([m.subject for m in mail.outbox],
+                         ["approved for alice", "returned for alice", "approved for bob"])
+        self.assertEqual(self.statuses(), [('sent', 1)] * 3)
+        self.assertEqual(send_pending(), (0, 0))
+
+    def test_digest_groups_due_rows_per_recipient(self):
+        self.queue(self.alice)
+        self.queue(self.bob)
+        self.queue(self.alice, 'returned')
+        Notification.objects.create(
+            recipient=self.bob, email=self.bob.email, kind='overdue', subject="later", body="",
+            next_attempt_at=timezone.now() + timedelta(hours=1),
+        )
+
+        self.assertEqual(send_pending(digest=True, batch_size=1), (3, 0))
+
+        self.assertEqual(
+            sorted((m.to[0], m.subject) for m in mail.outbox),
+            [('alice@example.com', "2 updates on your asset requests"), ('bob@example.com', "approved for bob")],
+        )
+        self.assertIn("Asset Returned", mail.outbox[0].body)
+        self.assertEqual(Notification.objects.filter(status='pending').count(), 1)
+
+    def test_failures_back_off_then_fail(self):
+        row = self.queue(self.alice)
+
+        with mock.patch('django.core.mail.EmailMessage.send', side_effect=OSError("SMTP down")):
+            before = timezone.now()
+            self.assertEqual(send_pending(max_attempts=2), (0, 1))
+            row.refresh_from_db()
+            self.assertEqual((row.status, row.attempts, row.last_error), ('pending', 1, "SMTP down"))
+            self.assertGreaterEqual(row.next_attempt_at, before + timedelta(seconds=RETRY_BASE_SECONDS))
+
+            # Not due yet: nothing is retried
+            self.assertEqual(send_pending(max_attempts=2), (0, 0))
+
+            Notification.objects.filter(pk=row.pk).update(next_attempt_at=timezone.now())
+            self.assertEqual(send_pending(max_attempts=2), (0, 1))
+        row.refresh_from_db()
+        self.assertEqual((row.status, row.attempts), ('failed', 2))
+        self.assertEqual(mail.outbox, [])
+
+    def test_claimed_rows_are_not_sent_by_another_dispatcher(self):
+        held = self.queue(self.alice)
+        free = self.queue(self.bob)
+        self.assertEqual(claim(limit=1), [held])
+
+        self.assertEqual(send_pending(), (1, 0))
+        self.assertEqual(mail.outbox[0].to, [free.email])
+        held.refresh_from_db()
+        self.assertEqual(held.status, 'sending')
+
+        # The holder died: once the lease runs out the row is picked up again
+        Notification.objects.filter(pk=held.pk).update(next_attempt_at=timezone.now())
+        self.assertEqual(send_pending(digest=True), (1, 0))
+        self.assertEqual(self.statuses(), [('sent', 1), ('sent', 1)])
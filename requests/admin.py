@@ -1,4 +1,5 @@
 from django.contrib import admin
+from assets.paginator import EstimatedCountPaginator
 from .models import AssetRequest, AssetReturn
 
 
@@ -6,10 +7,30 @@ from .models import AssetRequest, AssetReturn
 class AssetRequestAdmin(admin.ModelAdmin):
     list_display = ('user', 'asset_category', 'status', 'request_date', 'return_date')
     list_filter = ('status', 'asset_category')
-    search_fields = ('user__username', 'asset_category')
+    list_select_related = ('user',)
+    # Prefix search on the unique username index; the category is a filter
+    search_fields = ('=id', '^user__username')
+    autocomplete_fields = ('user', 'assigned_asset', 'approved_by')
+    date_hierarchy = 'created_at'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # __str__ shows the username (also in autocomplete results)
+        return super().get_queryset(request).select_related('user')
 
 
 @admin.register(AssetReturn)
 class AssetReturnAdmin(admin.ModelAdmin):
     list_display = ('borrow_request', 'returned_date', 'condition_on_return')
     list_filter = ('condition_on_return',)
+    list_select_related = ('borrow_request__user',)
+    search_fields = ('=borrow_request__id', '^borrow_request__user__username')
+    autocomplete_fields = ('borrow_request', 'received_by')
+    date_hierarchy = 'returned_date'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        # __str__ and the borrow_request column both read the request and its user
+        return super().get_queryset(request).select_related('borrow_request__user')
@@ -0,0 +1,104 @@
+"""
+Archival of closed requests.
+
+Rejected, cancelled and fully returned requests that nobody has touched
+for RETENTION_DAYS are moved, with their returns, into
+ArchivedAssetRequest / ArchivedAssetReturn (`manage.py archive_requests`,
+scheduled nightly). Each batch is one transaction: copy the rows, detach
+whatever still points at them, delete them from the hot tables. Queue
+queries, overdue scans and the Manage lists then only ever see recent
+rows; the lists include archived rows when `?history=1` is asked for.
+
+The retention window is longer than the demand forecast's history, so
+the analytics jobs that read the hot tables still see every week they use.
+Archived rows leave the change feed as `archive` tombstones, which feed
+consumers can tell apart from deletes.
+"""
+import datetime
+
+from django.db import models, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from assets.bulk import delete_rows
+from assets.models import Asset
+from audit.models import ChangeEvent
+from .models import ArchivedAssetRequest, ArchivedAssetReturn, AssetRequest, AssetReturn
+
+
+RETENTION_DAYS = 3 * 365
+BATCH_SIZE = 500
+
+CLOSED = Q(status__in=['rejected', 'cancelled']) | Q(status='approved', is_fully_returned=True)
+
+
+def _columns(model):
+    return [field.attname for field in model._meta.concrete_fields]
+
+
+REQUEST_COLUMNS = _columns(AssetRequest)
+RETURN_COLUMNS = _columns(AssetReturn)
+
+
+def archivable(cutoff):
+    """Closed requests last changed before `cutoff`."""
+    return AssetRequest.objects.filter(CLOSED, updated_at__lt=cutoff)
+
+
+def _detach(request_ids):
+    """Null out every other reference to these requests (all SET_NULL)."""
+    # A stale holder pointer goes with its loan
+    Asset.objects.filter(current_loan__in=request_ids).update(current_loan=None, current_holder=None)
+    for rel in AssetRequest._meta.related_objects:
+        if rel.related_model is AssetReturn:
+            continue
+        if rel.on_delete is models.SET_NULL:
+            rel.related_model._base_manager.filter(
+                **{f'{rel.field.name}__in': request_ids}
+            ).update(**{rel.field.name: None})
+
+
+def _archive_batch(ids, cutoff, archived_at):
+    """Move one batch. Returns (requests, returns) moved."""
+    with transaction.atomic():
+        # Re-check under a row lock: a request reopened meanwhile stays put
+        ids = list(archivable(cutoff).filter(pk__in=ids).select_for_update().values_list('pk', flat=True))
+        if not ids:
+            return 0, 0
+
+        requests = AssetRequest.objects.filter(pk__in=ids).values(*REQUEST_COLUMNS)
+        returns = list(AssetReturn.objects.filter(borrow_request_id__in=ids).values(*RETURN_COLUMNS))
+
+        ArchivedAssetRequest.objects.bulk_create(
+            [ArchivedAssetRequest(archived_at=archived_at, **row) for row in requests],
+        )
+        ArchivedAssetReturn.objects.bulk_create([ArchivedAssetReturn(**row) for row in returns])
+
+        _detach(ids)
+        return_ids = [row['id'] for row in returns]
+        ChangeEvent.record(ChangeEvent.RETURN, return_ids, archived=True)
+        ChangeEvent.record(ChangeEvent.REQUEST, ids, archived=True)
+        # Everything pointing at these rows is handled above; one DELETE
+        # per table instead of the per-object collector and signals
+        delete_rows(AssetReturn, return_ids)
+        delete_rows(AssetRequest, ids)
+    return len(ids), len(return_ids)
+
+
+def archive_closed_requests(days=RETENTION_DAYS, batch_size=BATCH_SIZE):
+    """Archive closed requests older than `days`. Returns (requests, returns) moved."""
+    archived_at = timezone.now()
+    cutoff = archived_at - datetime.timedelta(days=days)
+    moved_requests = moved_returns = 0
+    last_pk = 0
+    while True:
+        ids = list(
+            archivable(cutoff).filter(pk__gt=last_pk).order_by('pk').values_list('pk', flat=True)[:batch_size]
+        )
+        if not ids:
+            break
+        last_pk = ids[-1]
+        n_requests, n_returns = _archive_batch(ids, cutoff, archived_at)
+        moved_requests += n_requests
+        moved_returns += n_returns
+    return moved_requests, moved_returns
@@ -0,0 +1,157 @@
+"""
+Batch return check-in.
+
+A stream of scanned codes (barcode or serial, optionally followed by a
+condition) is resolved to open loans with a handful of `IN` queries and
+all returns are recorded in one transaction: the loans' return rows are
+upserted in one statement (`requests.returns`), and assets/requests are updated
+with one set-based UPDATE per condition (clearing the assets' current
+holder pointers too).
+"""
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from assets.models import Asset
+from assets.scan import scan_cache
+from audit.models import ChangeEvent
+from notifications.outbox import enqueue
+from .models import AssetRequest, AssetReturn
+from .returns import save_returns
+from .usage import count_returns
+
+
+CONDITIONS = [key for key, _ in AssetReturn.CONDITION_CHOICES]
+
+
+def parse_scans(text, default_condition='good'):
+    """
+    Parse one scan per line: `CODE` or `CODE,condition`.
+
+    Returns `(scans, errors)` where scans maps code -> condition (a code
+    scanned twice keeps its last condition) and errors lists
+    `(line, message)` pairs.
+    """
+    scans, errors = {}, []
+
+    for line in text.splitlines():
+        parts = [p.strip() for p in line.replace('\t', ',').split(',')]
+        code = parts[0] if parts else ''
+        if not code:
+            continue
+
+        condition = (parts[1] if len(parts) > 1 and parts[1] else default_condition).lower()
+        if condition not in CONDITIONS:
+            errors.append((line.strip(), f"Unknown condition '{condition}'."))
+            continue
+
+        scans[code] = condition
+
+    return scans, errors
+
+
+def check_in(scans, received_by, returned_at=None, remarks=None):
+    """
+    Record returns for `{code: condition}` scans.
+
+    Returns `(checked_in, errors)`: checked_in is a list of dicts describing
+    each recorded return, errors a list of `(code, message)` pairs.
+    """
+    returned_at = returned_at or timezone.now()
+    errors = []
+
+    # 1. Codes -> assets (one query on the unique indexes)
+    codes = list(scans)
+    assets = Asset.objects.filter(
+        Q(barcode__in=codes) | Q(serial_number__in=codes)
+    ).values('id', 'barcode', 'serial_number', 'model', 'asset_category')
+
+    asset_by_code = {}
+    for asset in assets:
+        for code in (asset['barcode'], asset['serial_number']):
+            if code in scans:
+                asset_by_code[code] = asset
+
+    # 2. Assets -> open approved loans (latest per asset)
+    asset_ids = [asset['id'] for asset in asset_by_code.values()]
+    open_requests = AssetRequest.objects.filter(
+        assigned_asset_id__in=asset_ids,
+        status='approved',
+        is_fully_returned=False,
+    ).select_related('user', 'assigned_asset').order_by('request_date', 'id')
+
+    request_by_asset = {}
+    for req in open_requests:
+        request_by_asset[req.assigned_asset_id] = req
+
+    # One entry per loan: if its barcode and serial were both scanned, the
+    # later scan's condition wins and the loan is still closed (and
+    # counted, and notified) once
+    by_loan = {}
+    for code, condition in scans.items():
+        asset = asset_by_code.get(code)
+        if asset is None:
+            errors.append((code, "Unknown barcode or serial."))
+            continue
+
+        req = request_by_asset.get(asset['id'])
+        if req is None:
+            errors.append((code, "No open loan for this asset."))
+            continue
+
+        by_loan[req.pk] = {
+            'code': code,
+            'asset': asset,
+            'request': req,
+            'condition': condition,
+        }
+
+    checked_in = list(by_loan.values())
+    if not checked_in:
+        return checked_in, errors
+
+    request_ids = list(by_loan)
+    returns = [
+        AssetReturn(
+            borrow_request=item['request'],
+            returned_date=returned_at,
+            condition_on_return=item['condition'],
+            received_by=received_by,
+            remarks=remarks,
+        )
+        for item in checked_in
+    ]
+    asset_ids_by_condition = defaultdict(list)
+    for item in checked_in:
+        asset_ids_by_condition[item['condition']].append(item['asset']['id'])
+
+    # 3. Everything in one transaction
+    with transaction.atomic():
+        save_returns(returns)   # also logs the return rows to the change feed
+
+        now = timezone.now()
+        for condition, ids in asset_ids_by_condition.items():
+            Asset.objects.filter(pk__in=ids).update(
+                status='returned',
+                asset_condition=condition,   # Sync condition, as the single-return views do
+                updated_at=now,
+            )
+        # Clear holder pointers that point at the loans just closed
+        Asset.objects.filter(current_loan__in=request_ids).update(current_loan=None, current_holder=None)
+        count_returns(
+            (item['asset']['id'], item['request'].approval_date, returned_at) for item in checked_in
+        )
+        AssetRequest.objects.filter(pk__in=request_ids).update(
+            is_fully_returned=True,
+            is_overdue=False,
+            updated_at=now,
+        )
+
+        ChangeEvent.record(ChangeEvent.ASSET, [item['asset']['id'] for item in checked_in])
+        ChangeEvent.record(ChangeEvent.REQUEST, request_ids)
+        enqueue('returned', [item['request'] for item in checked_in])
+
+    scan_cache.clear()
+    return checked_in, errors
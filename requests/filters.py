@@ -0,0 +1,58 @@
+from assets.listing import ListSpec
+from .models import ArchivedAssetRequest, ArchivedAssetReturn, AssetRequest, AssetReturn
+
+
+# Manage Requests: search across username, asset name, and status
+REQUEST_LIST = ListSpec(
+    AssetRequest,
+    columns=[
+        'user__username', 'user__first_name', 'user__last_name',
+        'asset_category', 'assigned_asset', 'request_date', 'return_date', 'status',
+    ],
+    search=[
+        'user__username', 'asset_category', 'status',
+        'assigned_asset__model', 'assigned_asset__serial_number',
+    ],
+    filters={'status': 'status'},
+    orderings={'newest': ("Newest first", ('-request_date', '-id'))},  # tie-breaker by ID
+    per_page=5,
+    archive=ArchivedAssetRequest,
+)
+
+# The normal user's own requests (dashboard), scoped with user=...
+MY_REQUEST_LIST = ListSpec(
+    AssetRequest,
+    columns=['asset_category', 'request_date', 'return_date', 'status', 'remarks'],
+    search=['asset_category', 'remarks'],
+    filters={'status': 'status', 'category': 'asset_category'},
+    orderings={'newest': ("Newest first", ('-request_date', '-id'))},
+    archive=ArchivedAssetRequest,
+)
+
+# Returned Assets
+RETURN_LIST = ListSpec(
+    AssetReturn,
+    columns=[
+        'borrow_request__user__username', 'borrow_request__asset_category',
+        'borrow_request__assigned_asset__model', 'borrow_request__assigned_asset__serial_number',
+        'returned_date', 'condition_on_return', 'received_by__username',
+    ],
+    search=[
+        'borrow_request__user__username',
+        'borrow_request__assigned_asset__model',
+        'borrow_request__assigned_asset__serial_number',
+    ],
+    filters={'condition': 'condition_on_return'},
+    orderings={'newest': ("Newest first", ('-returned_date', '-id'))},
+    archive=ArchivedAssetReturn,
+)
+
+
+def filter_requests(requests_qs, search_query='', status_filter='all'):
+    """Apply the Manage Requests search box and status filter to a queryset."""
+    return REQUEST_LIST.filter(requests_qs, {'search': search_query, 'status': status_filter})
+
+
+def filter_returns(returns, search_query='', condition_filter='all'):
+    """Apply the Returned Assets search box and condition filter to a queryset."""
+    return RETURN_LIST.filter(returns, {'search': search_query, 'condition': condition_filter})
@@ -0,0 +1,95 @@
+"""
+Current holder pointers.
+
+`Asset.current_loan` / `Asset.current_holder` name the open loan on an
+asset and its borrower. The approve paths set them and the return paths
+(single return views and batch check-in) clear them in the same
+transaction as the status change, so "who has this asset?" is one lookup
+on the asset's unique barcode/serial index and "what does this user have?"
+one lookup on the `current_holder` foreign key index.
+
+`inconsistent_asset_ids()` and `sync_current_loans()` re-derive the
+pointers from the loans themselves (`manage.py check_current_loans`).
+"""
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Q, Subquery
+from django.utils import timezone
+
+from assets.models import Asset
+from assets.scan import scan_cache
+from audit.models import ChangeEvent
+from .overdue import open_loans
+
+
+def start_loan(asset, borrow_request):
+    """Point the asset at its newly approved loan (caller saves the asset)."""
+    asset.current_loan = borrow_request
+    asset.current_holder_id = borrow_request.user_id
+
+
+def end_loan(asset):
+    """Clear the asset's loan pointer (caller saves the asset)."""
+    asset.current_loan = None
+    asset.current_holder = None
+
+
+def assets_held_by(user):
+    return Asset.objects.filter(current_holder=user).select_related('current_loan').order_by('asset_category', 'id')
+
+
+def _latest_open_loan():
+    return open_loans().filter(assigned_asset=OuterRef('pk')).order_by('-approval_date', '-id')
+
+
+def inconsistent_asset_ids():
+    """Ids of assets whose pointers disagree with their open loans."""
+    ids = set()
+
+    # Pointer to a loan that is closed, for another asset, or another holder
+    pointed = Asset.objects.filter(current_loan__isnull=False)
+    ids.update(pointed.filter(
+        ~Q(current_loan__status='approved')
+        | Q(current_loan__is_fully_returned=True)
+        | Q(current_loan__assigned_asset__isnull=True)
+        | ~Q(current_loan__assigned_asset=F('pk'))
+        | Q(current_holder__isnull=True)
+        | ~Q(current_holder=F('current_loan__user'))
+    ).values_list('id', flat=True))
+
+    # Holder without a loan
+    ids.update(Asset.objects.filter(
+        current_loan__isnull=True, current_holder__isnull=False,
+    ).values_list('id', flat=True))
+
+    # Asset with an open loan that does not point at its latest one
+    on_loan = Asset.objects.filter(
+        pk__in=open_loans().filter(assigned_asset__isnull=False).values('assigned_asset_id'),
+    ).annotate(expected_loan=Subquery(_latest_open_loan().values('id')[:1]))
+    ids.update(on_loan.filter(
+        Q(current_loan__isnull=True) | ~Q(current_loan=F('expected_loan'))
+    ).values_list('id', flat=True))
+
+    return ids
+
+
+def multiply_loaned_asset_ids():
+    """Assets with more than one open loan (the pointer follows the latest)."""
+    return set(
+        open_loans().filter(assigned_asset__isnull=False).values('assigned_asset_id').annotate(
+            n=Count('id'),
+        ).filter(n__gt=1).values_list('assigned_asset_id', flat=True)
+    )
+
+
+def sync_current_loans(asset_ids):
+    """Re-derive the pointers of these assets from their latest open loan."""
+    loan = _latest_open_loan()
+    with transaction.atomic():
+        updated = Asset.objects.filter(pk__in=asset_ids).update(
+            current_loan=Subquery(loan.values('id')[:1]),
+            current_holder=Subquery(loan.values('user_id')[:1]),
+            updated_at=timezone.now(),
+        )
+        ChangeEvent.record(ChangeEvent.ASSET, asset_ids)
+    scan_cache.clear()
+    return updated
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from requests.archive import BATCH_SIZE, RETENTION_DAYS, archive_closed_requests
+
+
+class Command(BaseCommand):
+    help = (
+        "Move closed requests (rejected, cancelled, fully returned) older than the retention "
+        "window, with their returns, into the archive tables. "
+        "Schedule it (e.g. cron nightly) to keep the request tables small."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=RETENTION_DAYS,
+                            help=f"Retention window in days (default {RETENTION_DAYS}).")
+        parser.add_argument('--batch-size', type=int, default=BATCH_SIZE,
+                            help=f"Requests moved per transaction (default {BATCH_SIZE}).")
+
+    def handle(self, *args, **options):
+        requests, returns = archive_closed_requests(options['days'], options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Archived {requests} requests and {returns} returns."))
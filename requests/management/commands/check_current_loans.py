@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from requests.holders import inconsistent_asset_ids, multiply_loaned_asset_ids, sync_current_loans
+
+
+def _preview(ids, limit=20):
+    ids = sorted(ids)
+    return ', '.join(str(pk) for pk in ids[:limit]) + (' ...' if len(ids) > limit else '')
+
+
+class Command(BaseCommand):
+    help = (
+        "Check that every asset's current loan / holder pointer matches its open loans. "
+        "Use --fix to re-derive the pointers of mismatched assets."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help="Repair the mismatched pointers.")
+
+    def handle(self, *args, **options):
+        multiple = multiply_loaned_asset_ids()
+        if multiple:
+            self.stdout.write(self.style.WARNING(
+                f"{len(multiple)} assets have more than one open loan (pointers follow the latest): "
+                + _preview(multiple)
+            ))
+
+        ids = sorted(inconsistent_asset_ids())
+        if not ids:
+            self.stdout.write(self.style.SUCCESS("All current loan pointers are consistent."))
+            return
+
+        self.stdout.write(self.style.WARNING(f"{len(ids)} assets with mismatched pointers: {_preview(ids)}"))
+
+        if options['fix']:
+            updated = sync_current_loans(ids)
+            self.stdout.write(self.style.SUCCESS(f"Re-derived pointers for {updated} assets."))
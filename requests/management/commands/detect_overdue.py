@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from requests.overdue import refresh_overdue_flags
+
+
+class Command(BaseCommand):
+    help = (
+        "Flag approved loans whose return date has passed without a return. "
+        "Schedule it (e.g. cron every 15 minutes) to keep the overdue queue current."
+    )
+
+    def handle(self, *args, **options):
+        newly_overdue, cleared = refresh_overdue_flags()
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(newly_overdue)} loans newly overdue, {len(cleared)} cleared."
+        ))
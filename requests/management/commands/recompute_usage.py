@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from requests.usage import recompute_usage
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild every asset's usage counters (times borrowed, last borrowed, days on loan) "
+        "from the loan history. Run once after deploying the counters, then as a periodic check."
+    )
+
+    def handle(self, *args, **options):
+        updated = recompute_usage()
+        self.stdout.write(self.style.SUCCESS(f"Usage counters rebuilt ({updated} assets updated)."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:31
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0008_assetrequest_created_at_assetrequest_updated_at_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='assetrequest',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:37
+
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_loan_state(apps, schema_editor):
+    AssetRequest = apps.get_model('requests', 'AssetRequest')
+    AssetRequest.objects.filter(
+        status='approved', returns__returned_date__isnull=False
+    ).update(is_fully_returned=True)
+    AssetRequest.objects.filter(
+        status='approved', is_fully_returned=False, return_date__lt=timezone.localdate()
+    ).update(is_overdue=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0012_stocktake_stocktakescan_stocktakediscrepancy'),
+        ('requests', '0009_alter_assetrequest_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='assetrequest',
+            name='is_fully_returned',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='assetrequest',
+            name='is_overdue',
+            field=models.BooleanField(db_index=True, default=False),
+        ),
+        migrations.AddIndex(
+            model_name='assetrequest',
+            index=models.Index(fields=['status', 'is_fully_returned', 'return_date'], name='req_open_loan_due_idx'),
+        ),
+        migrations.RunPython(backfill_loan_state, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-19 18:50
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0010_open_loan_state'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='assetrequest',
+            name='approval_date',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='assetrequest',
+            name='created_at',
+            field=models.DateTimeField(auto_now_add=True, db_index=True),
+        ),
+        migrations.AlterField(
+            model_name='assetreturn',
+            name='returned_date',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:07
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0020_asset_created_at_index'),
+        ('requests', '0011_rollup_date_indexes'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedAssetRequest',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('asset_category', models.CharField(choices=[('laptop', 'Laptop'), ('projector', 'Projector'), ('desktop', 'Desktop')], max_length=50)),
+                ('request_date', models.DateField()),
+                ('return_date', models.DateField()),
+                ('remarks', models.TextField(blank=True, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('approved', 'Approved'), ('rejected', 'Rejected'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('approval_date', models.DateTimeField(blank=True, null=True)),
+                ('is_fully_returned', models.BooleanField(default=False)),
+                ('is_overdue', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('approved_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('assigned_asset', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='archived_requests', to='assets.asset')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_asset_requests', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-request_date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedAssetReturn',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('returned_date', models.DateTimeField(blank=True, db_index=True, null=True)),
+                ('condition_on_return', models.CharField(choices=[('good', 'Good'), ('fair', 'Fair'), ('damaged', 'Damaged'), ('lost', 'Lost')], max_length=10)),
+                ('remarks', models.TextField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('borrow_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='returns', to='requests.archivedassetrequest')),
+                ('received_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-returned_date'],
+            },
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:11
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F
+
+
+def dedupe_returns(apps, schema_editor):
+    """Keep one return row per request: the latest recorded return, else the newest placeholder."""
+    for name in ('AssetReturn', 'ArchivedAssetReturn'):
+        model = apps.get_model('requests', name)
+        duplicated = model.objects.values('borrow_request').annotate(n=Count('id')).filter(n__gt=1).order_by()
+        for row in duplicated:
+            ids = list(model.objects.filter(borrow_request=row['borrow_request']).order_by(
+                F('returned_date').desc(nulls_last=True), '-id',
+            ).values_list('id', flat=True))
+            model.objects.filter(pk__in=ids[1:]).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0012_archive_tables'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(dedupe_returns, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='archivedassetreturn',
+            constraint=models.UniqueConstraint(fields=('borrow_request',), name='unique_archived_return_per_request'),
+        ),
+        migrations.AddConstraint(
+            model_name='assetreturn',
+            constraint=models.UniqueConstraint(fields=('borrow_request',), name='unique_return_per_request'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:20
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_cancelled_at(apps, schema_editor):
+    # Last change is the best record of when older requests were cancelled
+    for name in ('AssetRequest', 'ArchivedAssetRequest'):
+        model = apps.get_model('requests', name)
+        model.objects.filter(status='cancelled', cancelled_at__isnull=True).update(cancelled_at=F('updated_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('requests', '0013_one_return_per_request'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='archivedassetrequest',
+            name='cancelled_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='assetrequest',
+            name='cancelled_at',
+            field=models.DateTimeField(blank=True, db_index=True, null=True),
+        ),
+        migrations.RunPython(backfill_cancelled_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.8 on 2026-10-19 19:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('assets', '0021_asset_model_index'),
+        ('requests', '0014_assetrequest_cancelled_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='archivedassetrequest',
+            index=models.Index(fields=['request_date', 'id'], name='archived_req_newest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='assetrequest',
+            index=models.Index(fields=['request_date', 'id'], name='req_newest_idx'),
+        ),
+    ]
@@ -5,6 +5,8 @@ from accounts.models import User
 
 
 class AssetRequest(models.Model):
+    is_archived = False
+
     STATUS_CHOICES = [
         ('pending', 'Pending'),
         ('approved', 'Approved'),
@@ -62,10 +64,16 @@ class AssetRequest(models.Model):
         related_name='approved_asset_requests'
     )
 
-    approval_date = models.DateTimeField(null=True, blank=True)
+    approval_date = models.DateTimeField(null=True, blank=True, db_index=True)
+    # Set once when the request is cancelled (unlike updated_at, never moves)
+    cancelled_at = models.DateTimeField(null=True, blank=True, db_index=True)
 
-    created_at = models.DateTimeField(auto_now_add=True)
-    updated_at = models.DateTimeField(auto_now=True)
+    # Loan state: set by the return paths / overdue job
+    is_fully_returned = models.BooleanField(default=False)
+    is_overdue = models.BooleanField(default=False, db_index=True)
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
 
     # =========================
     # VALIDATIONS
@@ -104,19 +112,32 @@ class AssetRequest(models.Model):
             raise ValidationError("This request cannot be cancelled.")
 
         self.status = 'cancelled'
-        self.save(update_fields=['status'])
+        self.cancelled_at = timezone.now()
+        self.save(update_fields=['status', 'cancelled_at', 'updated_at'])
 
     def __str__(self):
         return f"{self.user.username} → {self.asset_category} ({self.status})"
 
     class Meta:
         ordering = ['-request_date']
+        indexes = [
+            # Open loans by due date: the overdue scan only touches loans
+            # that are still out, however much history accumulates.
+            models.Index(
+                fields=['status', 'is_fully_returned', 'return_date'],
+                name='req_open_loan_due_idx',
+            ),
+            # Newest-first keyset paging of the request summary export
+            models.Index(fields=['request_date', 'id'], name='req_newest_idx'),
+        ]
 
 
 # ============================================================
 # ASSET RETURN MODEL
 # ============================================================
 class AssetReturn(models.Model):
+    is_archived = False
+
     CONDITION_CHOICES = [
         ('good', 'Good'),
         ('fair', 'Fair'),
@@ -130,7 +151,7 @@ class AssetReturn(models.Model):
         related_name='returns'
     )
 
-    returned_date = models.DateTimeField(null=True, blank=True)
+    returned_date = models.DateTimeField(null=True, blank=True, db_index=True)
 
     condition_on_return = models.CharField(
         max_length=10,
@@ -155,3 +176,97 @@ class AssetReturn(models.Model):
 
     class Meta:
         ordering = ['-returned_date']
+        constraints = [
+            # One return row per loan, updated in place (see requests.returns)
+            models.UniqueConstraint(fields=['borrow_request'], name='unique_return_per_request'),
+        ]
+
+
+# ============================================================
+# ARCHIVE (cold tables)
+# ============================================================
+# Closed requests and their returns are moved here by
+# `manage.py archive_requests` once they are older than the retention
+# window. Rows keep their original ids and field names, so list pages
+# render them with the same templates when history is asked for.
+class ArchivedAssetRequest(models.Model):
+    is_archived = True
+
+    id = models.BigIntegerField(primary_key=True)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_asset_requests'
+    )
+    asset_category = models.CharField(max_length=50, choices=AssetRequest.CATEGORY_CHOICES)
+    request_date = models.DateField()
+    return_date = models.DateField()
+    remarks = models.TextField(blank=True, null=True)
+    status = models.CharField(max_length=20, choices=AssetRequest.STATUS_CHOICES)
+    assigned_asset = models.ForeignKey(
+        'assets.Asset',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='archived_requests'
+    )
+    approved_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    approval_date = models.DateTimeField(null=True, blank=True)
+    cancelled_at = models.DateTimeField(null=True, blank=True)
+    is_fully_returned = models.BooleanField(default=False)
+    is_overdue = models.BooleanField(default=False)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    archived_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.user.username} → {self.asset_category} ({self.status}, archived)"
+
+    class Meta:
+        ordering = ['-request_date']
+        indexes = [
+            models.Index(fields=['request_date', 'id'], name='archived_req_newest_idx'),
+        ]
+
+
+class ArchivedAssetReturn(models.Model):
+    is_archived = True
+
+    id = models.BigIntegerField(primary_key=True)
+    borrow_request = models.ForeignKey(
+        ArchivedAssetRequest,
+        on_delete=models.CASCADE,
+        related_name='returns'
+    )
+    returned_date = models.DateTimeField(null=True, blank=True, db_index=True)
+    condition_on_return = models.CharField(max_length=10, choices=AssetReturn.CONDITION_CHOICES)
+    received_by = models.ForeignKey(
+        User,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='+'
+    )
+    remarks = models.TextField(blank=True, null=True)
+    created_at = models.DateTimeField()
+
+    def __str__(self):
+        return f"Return → {self.borrow_request.asset_category} by {self.borrow_request.user.username} (archived)"
+
+    class Meta:
+        ordering = ['-returned_date']
+        constraints = [
+            models.UniqueConstraint(fields=['borrow_request'], name='unique_archived_return_per_request'),
+        ]
+
+
+# (request model, return model) pairs, hot first: read paths that report
+# over a loan's whole history (usage counters, summaries, exports,
+# reliability, rollups) read both so archiving never changes their totals.
+LOAN_TABLES = [(AssetRequest, AssetReturn), (ArchivedAssetRequest, ArchivedAssetReturn)]
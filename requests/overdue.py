@@ -0,0 +1,55 @@
+"""
+Overdue loan detection.
+
+An open loan is an approved request that is not fully returned. The
+`(status, is_fully_returned, return_date)` index turns "open loans due
+before today" into one range scan over loans that are still out, so the
+cost does not grow with years of closed requests. Results are stored in
+`AssetRequest.is_overdue`, which the queue pages and dashboards read, and
+borrowers of newly overdue loans get a queued notification.
+"""
+from django.db import transaction
+from django.utils import timezone
+
+from audit.models import ChangeEvent
+from notifications.outbox import enqueue
+from .models import AssetRequest
+
+
+def open_loans():
+    return AssetRequest.objects.filter(status='approved', is_fully_returned=False)
+
+
+def overdue_loans(today=None):
+    today = today or timezone.localdate()
+    return open_loans().filter(return_date__lt=today)
+
+
+def refresh_overdue_flags(today=None):
+    """
+    Flag loans that became overdue and unflag ones that no longer are.
+
+    Returns `(newly_overdue_ids, cleared_ids)`.
+    """
+    today = today or timezone.localdate()
+    now = timezone.now()
+
+    with transaction.atomic():
+        newly_overdue = list(
+            overdue_loans(today).filter(is_overdue=False).values_list('id', flat=True)
+        )
+        # Returned, extended or otherwise closed since they were flagged
+        cleared = list(
+            AssetRequest.objects.filter(is_overdue=True).exclude(
+                status='approved', is_fully_returned=False, return_date__lt=today,
+            ).values_list('id', flat=True)
+        )
+
+        AssetRequest.objects.filter(pk__in=newly_overdue).update(is_overdue=True, updated_at=now)
+        AssetRequest.objects.filter(pk__in=cleared).update(is_overdue=False, updated_at=now)
+        ChangeEvent.record(ChangeEvent.REQUEST, newly_overdue + cleared)
+        enqueue('overdue', AssetRequest.objects.filter(pk__in=newly_overdue).select_related(
+            'user', 'assigned_asset'
+        ))
+
+    return newly_overdue, cleared
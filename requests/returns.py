@@ -0,0 +1,56 @@
+"""
+Return records.
+
+Every approved loan has exactly one AssetReturn row (unique on
+`borrow_request`). The approve paths open it as a placeholder and the
+return paths (single return views and batch check-in) fill it in. Both
+write through `save_returns()`, a single `INSERT ... ON DUPLICATE KEY
+UPDATE` (`ON CONFLICT ... DO UPDATE` elsewhere) per batch, so the row is
+updated in place and a request never has zero or two return rows.
+
+The upsert skips model signals, so the change feed is written here; the
+callers invalidate the scan cache.
+"""
+from django.db import connections
+
+from audit.models import ChangeEvent
+from .models import AssetReturn
+
+
+UPDATE_FIELDS = ['returned_date', 'condition_on_return', 'received_by', 'remarks']
+BATCH_SIZE = 500
+
+
+def save_returns(returns):
+    """Insert or update the return row of each request in `returns` (AssetReturn instances)."""
+    returns = list(returns)
+    if not returns:
+        return
+    db = AssetReturn.objects.db
+    options = {'update_conflicts': True, 'update_fields': UPDATE_FIELDS}
+    if connections[db].features.supports_update_conflicts_with_target:
+        options['unique_fields'] = ['borrow_request']   # MySQL takes whichever unique key clashed
+    AssetReturn.objects.bulk_create(returns, batch_size=BATCH_SIZE, **options)
+
+    # MySQL does not return the ids of upserted rows
+    ChangeEvent.record(
+        ChangeEvent.RETURN,
+        AssetReturn.objects.filter(
+            borrow_request_id__in=[ret.borrow_request_id for ret in returns],
+        ).values_list('id', flat=True),
+    )
+
+
+def open_return(borrow_request):
+    """The placeholder return row of a newly approved loan."""
+    save_returns([AssetReturn(borrow_request=borrow_request)])
+
+
+def record_return(borrow_request, returned_date, condition, remarks, received_by):
+    save_returns([AssetReturn(
+        borrow_request=borrow_request,
+        returned_date=returned_date,
+        condition_on_return=condition,
+        remarks=remarks,
+        received_by=received_by,
+    )])
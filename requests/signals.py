@@ -0,0 +1,12 @@
+from django.db.models.signals import post_delete, post_save
+
+from .models import AssetRequest
+from .summary import forget_summary
+
+
+def forget_user_summary(sender, instance, **kwargs):
+    forget_summary(instance.user_id)
+
+
+for signal in (post_save, post_delete):
+    signal.connect(forget_user_summary, sender=AssetRequest)
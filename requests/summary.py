@@ -0,0 +1,48 @@
+"""
+Per-user request summary for the normal-user dashboard.
+
+All status counts come from one aggregate query (`COUNT(*) FILTER` per
+status, a `CASE` on MySQL) and are cached per user. Saving or deleting
+any of the user's requests drops the entry (`requests.signals`), so the
+dashboard reads the cache until the user or a reviewer changes something.
+Entries also expire after CACHE_SECONDS, which bounds staleness when the
+cache is per process. Archived requests are counted too, so archiving
+never changes a user's totals.
+"""
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+from .models import LOAN_TABLES, AssetRequest
+
+
+CACHE_SECONDS = 10 * 60
+STATUSES = [key for key, _ in AssetRequest.STATUS_CHOICES]
+
+
+def _key(user_id):
+    return f'requests:summary:{user_id}'
+
+
+def compute_summary(user_id):
+    """{status: count, ..., 'total': count} for one user's requests, archived ones included."""
+    counts = {}
+    for model, _ in LOAN_TABLES:
+        totals = model.objects.filter(user_id=user_id).aggregate(
+            total=Count('id'),
+            **{status: Count('id', filter=Q(status=status)) for status in STATUSES},
+        )
+        for key, value in totals.items():
+            counts[key] = counts.get(key, 0) + value
+    return counts
+
+
+def request_summary(user):
+    summary = cache.get(_key(user.pk))
+    if summary is None:
+        summary = compute_summary(user.pk)
+        cache.set(_key(user.pk), summary, CACHE_SECONDS)
+    return summary
+
+
+def forget_summary(user_id):
+    cache.delete(_key(user_id))
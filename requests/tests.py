@@ -1,3 +1,443 @@
-from django.test import TestCase
+import datetime
+import io
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import User
+from assets import reliability, reports, rollups
+from assets.bulk import bulk_delete_assets
+from assets.models import Asset, DailyCategoryStats
+from audit.changefeed import iter_changes
+from audit.models import ChangeEvent
+from notifications.models import Notification
+from .archive import archive_closed_requests
+from .checkin import check_in
+from .holders import assets_held_by, inconsistent_asset_ids, sync_current_loans
+from .filters import REQUEST_LIST
+from .models import ArchivedAssetRequest, ArchivedAssetReturn, AssetRequest, AssetReturn
+from .returns import open_return, record_return, save_returns
+from .summary import compute_summary
+from .usage import recompute_usage
+
+
+def last_seq():
+    return ChangeEvent.objects.order_by('-id').values_list('id', flat=True).first() or 0
+
+
+def make_request(user, **fields):
+    today = timezone.localdate()
+    return AssetRequest.objects.create(
+        user=user, asset_category='laptop', request_date=today, return_date=today, **fields,
+    )
+
+
+# ============================================================
+# ARCHIVE
+# ============================================================
+@override_settings(CHANGE_FEED_SETTLE_SECONDS=0)
+class ArchiveTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user('u', password='x')
+        self.asset = Asset.objects.create(serial_number='S-1', model='X1')
+        self.old = timezone.now() - datetime.timedelta(days=800)
+
+        self.loan = make_request(
+            self.user, status='approved', assigned_asset=self.asset, approved_by=self.user,
+            approval_date=self.old, is_fully_returned=True,
+        )
+        self.ret = AssetReturn.objects.create(
+            borrow_request=self.loan, returned_date=self.old + datetime.timedelta(days=3),
+            condition_on_return='damaged', received_by=self.user,
+        )
+        self.rejected = make_request(self.user, status='rejected', approval_date=self.old)
+        self.pending = make_request(self.user)
+        self.recent = make_request(self.user, status='cancelled', cancelled_at=timezone.now())
+
+        AssetRequest.objects.filter(pk__in=[self.loan.pk, self.rejected.pk, self.pending.pk]).update(
+            created_at=self.old, updated_at=self.old,
+        )
+        # A stale holder pointer left on the asset
+        Asset.objects.filter(pk=self.asset.pk).update(current_loan=self.loan, current_holder=self.user)
+        recompute_usage()
+
+    def archive(self):
+        return archive_closed_requests(days=365)
+
+    def snapshot(self):
+        days = [timezone.localdate(self.old) + datetime.timedelta(days=i) for i in range(5)]
+        return {
+            'summary': compute_summary(self.user.pk),
+            'usage': list(Asset.objects.values_list('times_borrowed', 'total_days_on_loan')),
+            'asset_usage': list(reports.asset_usage_rows({})),
+            'request_summary': sorted(map(repr, reports.request_summary_rows({}))),
+            'returns': list(reports.returns_rows({})),
+            'reliability': reliability.return_history(),
+            'rollups': dict(rollups._counts(days)),
+        }
+
+    def test_closed_old_requests_move_with_their_returns(self):
+        self.assertEqual(self.archive(), (2, 1))
+
+        self.assertEqual(
+            set(ArchivedAssetRequest.objects.values_list('id', flat=True)), {self.loan.pk, self.rejected.pk},
+        )
+        self.assertEqual(
+            set(AssetRequest.objects.values_list('id', flat=True)), {self.pending.pk, self.recent.pk},
+        )
+        archived = ArchivedAssetRequest.objects.get(pk=self.loan.pk)
+        self.assertEqual((archived.status, archived.approval_date, archived.assigned_asset_id),
+                         ('approved', self.old, self.asset.pk))
+        archived_return = ArchivedAssetReturn.objects.get(pk=self.ret.pk)
+        self.assertEqual((archived_return.borrow_request_id, archived_return.condition_on_return),
+                         (self.loan.pk, 'damaged'))
+        self.assertFalse(AssetReturn.objects.exists())
+
+        self.asset.refresh_from_db()
+        self.assertIsNone(self.asset.current_loan_id)
+        self.assertIsNone(self.asset.current_holder_id)
+
+        # Nothing left to move
+        self.assertEqual(self.archive(), (0, 0))
+
+    def test_totals_are_the_same_after_archiving(self):
+        before = self.snapshot()
+        self.archive()
+        recompute_usage()
+        self.assertEqual(self.snapshot(), before)
+
+    def test_change_feed_reports_an_archive_not_a_delete(self):
+        since = last_seq()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.archive()
+
+        ops = {(entry['type'], entry['id']): entry['op'] for entry in iter_changes(since)}
+
+        self.assertEqual(ops, {
+            ('request', self.loan.pk): 'archive',
+            ('request', self.rejected.pk): 'archive',
+            ('return', self.ret.pk): 'archive',
+        })
+
+    def test_history_lists_hot_and_archived_rows(self):
+        self.archive()
+
+        hot = list(REQUEST_LIST.rows(REQUEST_LIST.params({})))
+        both = REQUEST_LIST.rows(REQUEST_LIST.params({'history': '1'}))
+
+        self.assertEqual({req.pk for req in hot}, {self.pending.pk, self.recent.pk})
+        self.assertEqual(len(both), 4)
+        self.assertEqual(
+            {req.pk for req in both[0:4] if req.is_archived}, {self.loan.pk, self.rejected.pk},
+        )
+
+    def test_backfill_rebuilds_archived_days(self):
+        def stored():
+            return sorted(DailyCategoryStats.objects.values_list(
+                'day', 'asset_category', 'requests_created', 'requests_approved', 'requests_rejected',
+                'requests_cancelled', 'returns',
+            ))
+
+        rollups.backfill()
+        before = stored()
+        self.assertIn(timezone.localdate(self.old), [day for day, *_ in before])
+
+        # Archive, then build the rollups from an empty table
+        self.archive()
+        DailyCategoryStats.objects.all().delete()
+        rollups.backfill()
+
+        self.assertEqual(stored(), before)
+
+    def test_deleting_an_asset_leaves_archived_rows_unchanged(self):
+        self.archive()
+        updated_at = ArchivedAssetRequest.objects.get(pk=self.loan.pk).updated_at
+
+        self.assertEqual(bulk_delete_assets([self.asset.pk]), 1)
+
+        archived = ArchivedAssetRequest.objects.get(pk=self.loan.pk)
+        self.assertIsNone(archived.assigned_asset_id)
+        self.assertEqual(archived.updated_at, updated_at)
+
+
+# ============================================================
+# RETURN RECORDS
+# ============================================================
+class ReturnRecordTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', password='x', role='admin')
+        self.staff = User.objects.create_user('staff', password='x', role='staff')
+        self.user = User.objects.create_user('u', password='x')
+        self.asset = Asset.objects.create(serial_number='S-1', barcode='B-1')
+
+    def pending(self):
+        return make_request(self.user, assigned_asset=self.asset)
+
+    def returns_of(self, req):
+        return list(AssetReturn.objects.filter(borrow_request=req).values_list(
+            'id', 'returned_date', 'condition_on_return', 'received_by',
+        ))
+
+    def test_one_return_row_per_request(self):
+        req = self.pending()
+        AssetReturn.objects.create(borrow_request=req)
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            AssetReturn.objects.create(borrow_request=req)
+
+    def test_upsert_updates_the_row_in_place(self):
+        req = self.pending()
+        open_return(req)
+        [(row_id, returned_date, _, _)] = self.returns_of(req)
+        self.assertIsNone(returned_date)
+
+        since = last_seq()
+        now = timezone.now()
+        with self.captureOnCommitCallbacks(execute=True):
+            record_return(req, now, 'fair', "scratched", self.staff)
+
+        self.assertEqual(self.returns_of(req), [(row_id, now, 'fair', self.staff.pk)])
+        self.assertEqual(
+            list(ChangeEvent.objects.filter(id__gt=since).values_list('record_type', 'record_id')),
+            [(ChangeEvent.RETURN, row_id)],
+        )
+
+    def test_save_returns_handles_a_batch_of_new_and_existing_rows(self):
+        first, second = self.pending(), make_request(self.user)
+        open_return(first)
+
+        save_returns([
+            AssetReturn(borrow_request=first, condition_on_return='damaged'),
+            AssetReturn(borrow_request=second, condition_on_return='good'),
+        ])
+
+        self.assertEqual(AssetReturn.objects.count(), 2)
+        self.assertEqual(self.returns_of(first)[0][2], 'damaged')
+
+    def test_approve_and_return_views_keep_a_single_row(self):
+        for approver, approve_url, return_url in (
+            (self.admin, 'requests:admin_update_request_status', 'requests:admin_mark_returned'),
+            (self.staff, 'requests:update_request_status', 'requests:staff_mark_returned'),
+        ):
+            with self.subTest(approver=approver.role):
+                req = self.pending()
+                self.client.force_login(approver)
+
+                self.client.post(reverse(approve_url, args=[req.pk, 'approve']))
+                [(row_id, returned_date, _, _)] = self.returns_of(req)
+                self.assertIsNone(returned_date)
+
+                for condition in ('fair', 'damaged'):   # a corrected return updates the same row
+                    self.client.post(reverse(return_url, args=[req.pk]), {
+                        'returned_date': '2026-01-05T10:00', 'condition_on_return': condition, 'remarks': '',
+                    })
+                [(same_id, returned_date, condition, received_by)] = self.returns_of(req)
+                self.assertEqual((same_id, condition, received_by), (row_id, 'damaged', approver.pk))
+                self.assertIsNotNone(returned_date)
+
+                req.refresh_from_db()
+                self.assertTrue(req.is_fully_returned)
+
+    def test_check_in_writes_one_row_per_loan(self):
+        req = make_request(self.user, status='approved', assigned_asset=self.asset, approval_date=timezone.now())
+        open_return(req)
+        [(row_id, _, _, _)] = self.returns_of(req)
+
+        # Barcode and serial of the same asset both scanned
+        checked_in, errors = check_in({'B-1': 'good', 'S-1': 'fair'}, received_by=self.staff)
+
+        self.assertEqual(errors, [])
+        [(same_id, returned_date, condition, received_by)] = self.returns_of(req)
+        self.assertEqual((same_id, condition, received_by), (row_id, 'fair', self.staff.pk))
+        self.assertIsNotNone(returned_date)
+
+
+# ============================================================
+# BATCH CHECK-IN
+# ============================================================
+class CheckInTests(TestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user('staff', password='x', role='staff')
+        self.user = User.objects.create_user('u', email='u@example.com', password='x')
+        self.now = timezone.now()
+        self.loans = {}
+        for name in ('A', 'B'):
+            asset = Asset.objects.create(serial_number=f'S-{name}', barcode=f'B-{name}', status='borrowed',
+                                         times_borrowed=1)
+            loan = make_request(self.user, status='approved', assigned_asset=asset,
+                                approval_date=self.now - datetime.timedelta(days=3))
+            Asset.objects.filter(pk=asset.pk).update(current_loan=loan, current_holder=self.user)
+            self.loans[name] = loan
+        Asset.objects.create(serial_number='S-C', barcode='B-C')
+
+    def asset(self, name):
+        return Asset.objects.get(serial_number=f'S-{name}')
+
+    def test_known_unknown_and_idle_codes(self):
+        checked_in, errors = check_in(
+            {'B-A': 'good', 'S-C': 'good', 'NOPE': 'good', 'S-B': 'damaged'},
+            received_by=self.staff, returned_at=self.now,
+        )
+
+        self.assertEqual([(item['code'], item['request']) for item in checked_in],
+                         [('B-A', self.loans['A']), ('S-B', self.loans['B'])])
+        self.assertEqual(errors, [('S-C', "No open loan for this asset."), ('NOPE', "Unknown barcode or serial.")])
+
+        for name, condition in (('A', 'good'), ('B', 'damaged')):
+            asset = self.asset(name)
+            self.assertEqual((asset.status, asset.asset_condition), ('returned', condition))
+            loan = AssetRequest.objects.get(pk=self.loans[name].pk)
+            self.assertTrue(loan.is_fully_returned)
+            self.assertEqual(AssetReturn.objects.get(borrow_request=loan).received_by, self.staff)
+        self.assertEqual(self.asset('C').status, 'available')
+
+    def test_duplicate_scans_close_a_loan_once(self):
+        checked_in, errors = check_in({'B-A': 'good', 'S-A': 'fair'}, received_by=self.staff, returned_at=self.now)
+
+        self.assertEqual(errors, [])
+        self.assertEqual([item['code'] for item in checked_in], ['S-A'])
+        self.assertEqual(
+            list(AssetReturn.objects.values_list('borrow_request', 'condition_on_return')),
+            [(self.loans['A'].pk, 'fair')],
+        )
+        self.assertEqual(Notification.objects.filter(kind='returned').count(), 1)
+
+        asset = self.asset('A')
+        self.assertEqual((asset.asset_condition, asset.times_borrowed, asset.total_days_on_loan), ('fair', 1, 3))
+
+    def test_pointers_and_counters_change_once_per_loan(self):
+        check_in({'B-A': 'good', 'S-A': 'good'}, received_by=self.staff, returned_at=self.now)
+        # Scanned again later: the loan is closed, nothing changes
+        checked_in, errors = check_in({'B-A': 'good'}, received_by=self.staff)
+
+        self.assertEqual((checked_in, errors), ([], [('B-A', "No open loan for this asset.")]))
+        asset = self.asset('A')
+        self.assertEqual((asset.current_loan_id, asset.current_holder_id), (None, None))
+        self.assertEqual(asset.total_days_on_loan, 3)
+        self.assertEqual(AssetReturn.objects.count(), 1)
+
+        # The other loan is untouched
+        other = self.asset('B')
+        self.assertEqual((other.current_loan_id, other.total_days_on_loan), (self.loans['B'].pk, 0))
+
+
+# ============================================================
+# CURRENT HOLDERS
+# ============================================================
+class LoanFlowTestCase(TestCase):
+    """Loans approved and returned through the views."""
+
+    def setUp(self):
+        self.admin = User.objects.create_user('admin', password='x', role='admin')
+        self.staff = User.objects.create_user('staff', password='x', role='staff')
+        self.user = User.objects.create_user('u', password='x')
+        self.other = User.objects.create_user('other', password='x')
+        self.assets = [Asset.objects.create(serial_number=f'S-{i}', barcode=f'B-{i}') for i in range(3)]
+
+    def approve(self, asset, user=None):
+        req = make_request(user or self.user, assigned_asset=asset)
+        self.client.force_login(self.admin)
+        self.client.post(reverse('requests:admin_update_request_status', args=[req.pk, 'approve']))
+        return req
+
+    def mark_returned(self, req, days=1):
+        """Return `req` `days` (and an hour) after it was approved."""
+        req.refresh_from_db()
+        returned = timezone.localtime(req.approval_date) + datetime.timedelta(days=days, hours=1)
+        self.client.force_login(self.staff)
+        self.client.post(reverse('requests:staff_mark_returned', args=[req.pk]), {
+            'returned_date': returned.strftime('%Y-%m-%dT%H:%M'), 'condition_on_return': 'good', 'remarks': '',
+        })
+
+
+class CurrentLoanTests(LoanFlowTestCase):
+    def pointers(self, asset):
+        asset.refresh_from_db()
+        return asset.current_loan_id, asset.current_holder_id
+
+    def test_approve_return_and_check_in_keep_pointers_in_step(self):
+        first, second, third = self.assets
+        loans = [self.approve(first), self.approve(second), self.approve(third, self.other)]
+
+        self.assertEqual([self.pointers(asset) for asset in self.assets],
+                         [(loans[0].pk, self.user.pk), (loans[1].pk, self.user.pk), (loans[2].pk, self.other.pk)])
+        self.assertEqual(list(assets_held_by(self.user)), [first, second])
+        self.assertEqual(inconsistent_asset_ids(), set())
+
+        self.mark_returned(loans[0])
+        check_in({'B-1': 'good'}, received_by=self.staff)
+
+        self.assertEqual([self.pointers(asset) for asset in self.assets],
+                         [(None, None), (None, None), (loans[2].pk, self.other.pk)])
+        self.assertEqual(list(assets_held_by(self.user)), [])
+        self.assertEqual(inconsistent_asset_ids(), set())
+
+    def test_checker_flags_and_repairs_corrupted_pointers(self):
+        first, second, third = self.assets
+        loan = self.approve(first)
+        closed = self.approve(second)
+        self.mark_returned(closed)
+
+        Asset.objects.filter(pk=first.pk).update(current_holder=self.other)     # wrong holder
+        Asset.objects.filter(pk=second.pk).update(current_loan=closed, current_holder=self.user)  # closed loan
+        Asset.objects.filter(pk=third.pk).update(current_holder=self.user)      # holder without a loan
+
+        self.assertEqual(inconsistent_asset_ids(), {first.pk, second.pk, third.pk})
+
+        self.assertEqual(sync_current_loans(inconsistent_asset_ids()), 3)
+        self.assertEqual(inconsistent_asset_ids(), set())
+        self.assertEqual([self.pointers(asset) for asset in self.assets],
+                         [(loan.pk, self.user.pk), (None, None), (None, None)])
+
+    def test_check_current_loans_command(self):
+        self.approve(self.assets[0])
+        Asset.objects.filter(pk=self.assets[0].pk).update(current_loan=None, current_holder=None)
+
+        out = io.StringIO()
+        call_command('check_current_loans', stdout=out)
+        self.assertIn("1 assets with mismatched pointers", out.getvalue())
+        self.assertEqual(inconsistent_asset_ids(), {self.assets[0].pk})
+
+        call_command('check_current_loans', '--fix', stdout=out)
+        self.assertEqual(inconsistent_asset_ids(), set())
+
+
+# ============================================================
+# USAGE COUNTERS
+# ============================================================
+class UsageCounterTests(LoanFlowTestCase):
+    def counters(self):
+        return list(Asset.objects.order_by('pk').values_list(
+            'times_borrowed', 'last_borrowed_at', 'total_days_on_loan',
+        ))
+
+    def test_incremental_counters_match_a_rebuild(self):
+        first, second, third = self.assets
+        old = self.approve(first)
+        self.mark_returned(old, 4)
+        old.refresh_from_db()
+        # Push the first loan back in time so it gets archived
+        shift = datetime.timedelta(days=800)
+        AssetRequest.objects.filter(pk=old.pk).update(
+            approval_date=old.approval_date - shift, created_at=old.created_at - shift,
+            updated_at=old.updated_at - shift,
+        )
+        AssetReturn.objects.filter(borrow_request=old).update(returned_date=F('returned_date') - shift)
+        self.assertEqual(archive_closed_requests(days=365), (1, 1))
+
+        for asset, days in ((first, 2), (second, 7)):
+            req = self.approve(asset)
+            self.mark_returned(req, days)
+            self.mark_returned(req, days)    # re-recorded: no extra days
+        self.approve(second)                  # still out
+        check_in({'B-1': 'good'}, received_by=self.staff)   # closed by check-in (0 days)
+
+        incremental = self.counters()
+        self.assertEqual([(n, days) for n, _, days in incremental], [(2, 6), (2, 7), (0, 0)])
+
+        Asset.objects.update(times_borrowed=99, total_days_on_loan=99)
+        recompute_usage()
+        self.assertEqual(self.counters(), incremental)
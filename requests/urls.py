@@ -21,6 +21,8 @@ urlpatterns = [
     path('manage-returns/', views.staff_manage_returns, name='staff_manage_returns'),
     path('mark-returned/<int:req_id>/', views.staff_mark_returned, name='staff_mark_returned'),
     path('return-detail/<int:return_id>/', views.staff_return_detail, name='staff_return_detail'),
+    path('check-in/', views.staff_checkin, name='staff_checkin'),
+    path('overdue/', views.staff_overdue_requests, name='staff_overdue_requests'),
     
     # Admin routes
     path('admin/manage-requests/', views.admin_manage_requests, name='admin_manage_requests'),
@@ -31,5 +33,7 @@ urlpatterns = [
     path('admin/manage-returns/', views.admin_manage_returns, name='admin_manage_returns'),
     path('admin/mark-returned/<int:req_id>/', views.admin_mark_returned, name='admin_mark_returned'),
     path('admin/return-detail/<int:return_id>/', views.admin_return_detail, name='admin_return_detail'),
+    path('admin/check-in/', views.admin_checkin, name='admin_checkin'),
+    path('admin/overdue/', views.admin_overdue_requests, name='admin_overdue_requests'),
 
 ]
@@ -0,0 +1,140 @@
+"""
+Asset usage counters.
+
+`Asset.times_borrowed`, `last_borrowed_at` and `total_days_on_loan` answer
+"how popular is this asset?" without scanning the request history. The
+approve paths call `count_borrow()` and the return paths `count_returns()`
+inside their transactions; both are relative `F()` updates, so concurrent
+writers never lose an increment. A loan's days are whole days from
+approval to return, added when the return is recorded.
+
+`recompute_usage()` rebuilds every counter from the loans, archived ones
+included: one grouped `UPDATE ... JOIN` on MySQL, a grouped read plus
+batched updates elsewhere.
+"""
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Case, Count, F, Max, Value, When
+
+from assets.models import Asset
+from assets.reports import iter_keyset
+from .models import LOAN_TABLES
+
+
+BATCH_SIZE = 500
+
+
+def loan_days(approved_at, returned_at):
+    """Whole days on loan (same rounding as MySQL `TIMESTAMPDIFF(DAY, ...)`)."""
+    if not approved_at or not returned_at or returned_at < approved_at:
+        return 0
+    return (returned_at - approved_at).days
+
+
+def count_borrow(asset_id, approved_at):
+    Asset.objects.filter(pk=asset_id).update(
+        times_borrowed=F('times_borrowed') + 1,
+        last_borrowed_at=approved_at,
+    )
+
+
+def count_returns(loans):
+    """Add the days of `(asset_id, approved_at, returned_at)` loans just returned."""
+    days = defaultdict(int)
+    for asset_id, approved_at, returned_at in loans:
+        if asset_id:
+            days[asset_id] += loan_days(approved_at, returned_at)
+
+    pending = [(asset_id, d) for asset_id, d in days.items() if d]
+    for start in range(0, len(pending), BATCH_SIZE):
+        batch = pending[start:start + BATCH_SIZE]
+        Asset.objects.filter(pk__in=[asset_id for asset_id, _ in batch]).update(
+            total_days_on_loan=F('total_days_on_loan') + Case(
+                *[When(pk=asset_id, then=Value(d)) for asset_id, d in batch],
+                default=Value(0),
+            ),
+        )
+
+
+# ============================================================
+# FULL REBUILD
+# ============================================================
+
+
+def _recompute_mysql():
+    loans = " UNION ALL ".join(f"""
+        SELECT r.assigned_asset_id AS asset_id, r.approval_date, ret.returned_at
+        FROM {request._meta.db_table} r
+        LEFT JOIN (
+            SELECT borrow_request_id, MAX(returned_date) AS returned_at
+            FROM {ret._meta.db_table}
+            WHERE returned_date IS NOT NULL
+            GROUP BY borrow_request_id
+        ) ret ON ret.borrow_request_id = r.id
+        WHERE r.status = 'approved'
+          AND r.assigned_asset_id IS NOT NULL
+          AND r.approval_date IS NOT NULL
+    """ for request, ret in LOAN_TABLES)
+    sql = f"""
+        UPDATE {Asset._meta.db_table} a
+        LEFT JOIN (
+            SELECT loans.asset_id,
+                   COUNT(*) AS times_borrowed,
+                   MAX(loans.approval_date) AS last_borrowed_at,
+                   COALESCE(SUM(GREATEST(TIMESTAMPDIFF(DAY, loans.approval_date, loans.returned_at), 0)), 0) AS days
+            FROM ({loans}) loans
+            GROUP BY loans.asset_id
+        ) usage_totals ON usage_totals.asset_id = a.id
+        SET a.times_borrowed = COALESCE(usage_totals.times_borrowed, 0),
+            a.last_borrowed_at = usage_totals.last_borrowed_at,
+            a.total_days_on_loan = COALESCE(usage_totals.days, 0)
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql)
+        return cursor.rowcount
+
+
+def _recompute_generic():
+    totals = {}
+    borrowed = []
+    for request, _ in LOAN_TABLES:
+        loans = request.objects.filter(
+            status='approved', assigned_asset__isnull=False, approval_date__isnull=False,
+        )
+        grouped = loans.values('assigned_asset').annotate(n=Count('id'), last=Max('approval_date')).order_by()
+        for row in grouped:
+            entry = totals.setdefault(row['assigned_asset'], [0, None, 0])
+            entry[0] += row['n']
+            entry[1] = max(entry[1], row['last']) if entry[1] else row['last']
+        returned = loans.annotate(returned_at=Max('returns__returned_date')).filter(returned_at__isnull=False)
+        for asset_id, approved_at, returned_at in iter_keyset(
+            returned, ('assigned_asset_id', 'approval_date', 'returned_at'),
+        ):
+            totals[asset_id][2] += loan_days(approved_at, returned_at)
+        borrowed.append(loans.values('assigned_asset_id'))
+
+    with transaction.atomic():
+        # Assets without loans go back to zero in one statement
+        never = Asset.objects.filter(times_borrowed__gt=0)
+        for loaned in borrowed:
+            never = never.exclude(pk__in=loaned)
+        updated = never.update(times_borrowed=0, last_borrowed_at=None, total_days_on_loan=0)
+
+        items = list(totals.items())
+        for start in range(0, len(items), BATCH_SIZE):
+            batch = [
+                Asset(pk=asset_id, times_borrowed=n, last_borrowed_at=last, total_days_on_loan=days)
+                for asset_id, (n, last, days) in items[start:start + BATCH_SIZE]
+            ]
+            Asset.objects.bulk_update(batch, ['times_borrowed', 'last_borrowed_at', 'total_days_on_loan'])
+            updated += len(batch)
+    return updated
+
+
+def recompute_usage():
+    """Rebuild every asset's usage counters. Returns the number of rows updated."""
+    if connection.vendor == 'mysql':
+        with transaction.atomic():
+            return _recompute_mysql()
+    return _recompute_generic()
@@ -3,10 +3,16 @@ from django.utils import timezone
 from django.contrib import messages
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
-from django.db.models import Q
+from django.db.models import F, Q
 from assets.models import Asset
 from requests.forms import AssetRequestForm
 from .models import AssetRequest, AssetReturn
+from .filters import REQUEST_LIST, RETURN_LIST
+from .checkin import check_in, parse_scans
+from .holders import end_loan, start_loan
+from .returns import open_return, record_return
+from .usage import count_borrow, count_returns
+from accounts.views import roles_required
 from django.urls import reverse
 from django.db.models import OuterRef, Subquery
 from django.http import JsonResponse
@@ -14,6 +20,8 @@ from django.utils.dateparse import parse_date
 from django.core.paginator import Paginator
 from django.db.models import Case, When, Value, IntegerField
 from django.core.exceptions import ValidationError
+from django.db import transaction
+from notifications.outbox import enqueue
 
 
 # --------------------------
@@ -22,41 +30,8 @@ from django.core.exceptions import ValidationError
 @login_required
 def admin_manage_requests(request):
     """Admin view all requests with search and filter, paginated."""
-    search_query = request.GET.get('search', '').strip()
-    status_filter = request.GET.get('status', 'all')
-
-    # Base queryset
-    requests_qs = AssetRequest.objects.select_related('user', 'assigned_asset')
-
-    # Apply search across username, asset name, and status
-    if search_query:
-        requests_qs = requests_qs.filter(
-            Q(user__username__icontains=search_query) |
-            Q(asset_category__icontains=search_query) |
-            Q(status__icontains=search_query) |
-            Q(assigned_asset__model__icontains=search_query) |
-            Q(assigned_asset__serial_number__icontains=search_query)
-        )
-
-    # Apply status filter (skip "all")
-    if status_filter != 'all':
-        requests_qs = requests_qs.filter(status=status_filter)
-
-    # Order by request_date descending
-    requests_qs = requests_qs.order_by('-request_date', '-id')  # tie-breaker by ID
-
-    # Pagination
-    paginator = Paginator(requests_qs, 5)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-
-    context = {
-        'page_obj': page_obj,
-        'all_requests': page_obj.object_list,
-        'search_query': search_query,
-        'status_filter': status_filter,
-    }
-
+    context = REQUEST_LIST.page(request)
+    context['all_requests'] = context['page_obj'].object_list
     return render(request, 'requests/admin_manage_requests.html', context)
 
 @login_required
@@ -65,12 +40,15 @@ def admin_request_details(request, pk):
     req = get_object_or_404(AssetRequest, pk=pk)
 
     # ---------------------------------------
-    # Filter ONLY available assets of same category
+    # Filter ONLY available assets of same category,
+    # most reliable first (unscored assets last)
     # ---------------------------------------
     available_assets = Asset.objects.filter(
         asset_category=req.asset_category,
         status="available"
-    ).order_by("model")
+    ).select_related("reliability").order_by(
+        F("reliability__score").desc(nulls_last=True), "model"
+    )
 
     # ---------------------------------------
     # Optional pre-assignment from dropdown
@@ -171,21 +149,20 @@ def admin_update_request_status(request, pk, action):
         req.approved_by = request.user
         req.approval_date = timezone.now()
 
-        # Update asset status
-        asset = req.assigned_asset
-        asset.status = "borrowed"
-        asset.save()
+        with transaction.atomic():
+            # Update asset status
+            asset = req.assigned_asset
+            asset.status = "borrowed"
+            start_loan(asset, req)
+            asset.save(update_fields=["status", "current_loan", "current_holder", "updated_at"])
+            count_borrow(asset.pk, req.approval_date)
 
-        req.save()
+            req.save()
 
-        # ➤ CREATE AssetReturn placeholder
-        AssetReturn.objects.create(
-            borrow_request=req,
-            received_by=None,         # admin will fill later
-            remarks=None,             # empty
-            condition_on_return="good"  # default
-            # returned_date auto created
-        )
+            # ➤ Open the loan's return row (filled in on return)
+            open_return(req)
+
+            enqueue('approved', [req])
 
         messages.success(request, "Request approved successfully and return record created.")
         return redirect("requests:admin_get_request_details", pk)
@@ -197,7 +174,9 @@ def admin_update_request_status(request, pk, action):
         req.approval_date = timezone.now()
         req.assigned_asset = None
 
-        req.save()
+        with transaction.atomic():
+            req.save()
+            enqueue('rejected', [req])
 
         messages.error(request, "Request rejected.")
         return redirect("requests:admin_get_request_details", pk)
@@ -209,36 +188,7 @@ def admin_update_request_status(request, pk, action):
 
 @login_required
 def admin_manage_returns(request):
-    search_query = request.GET.get("search", "").strip()
-    condition_filter = request.GET.get("condition", "all")
-
-    returns = AssetReturn.objects.select_related(
-        "borrow_request__assigned_asset",
-        "borrow_request__user",
-        "received_by",
-    )
-
-    # Search filter
-    if search_query:
-        returns = returns.filter(
-            Q(borrow_request__user__username__icontains=search_query) |
-            Q(borrow_request__assigned_asset__model__icontains=search_query) |
-            Q(borrow_request__assigned_asset__serial_number__icontains=search_query)
-        )
-
-    # Condition filter
-    if condition_filter != "all":
-        returns = returns.filter(condition_on_return=condition_filter)
-
-    paginator = Paginator(returns, 10)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
-
-    return render(request, "requests/admin_manage_returns.html", {
-        "page_obj": page_obj,
-        "search_query": search_query,
-        "condition_filter": condition_filter,
-    })
+    return render(request, "requests/admin_manage_returns.html", RETURN_LIST.page(request))
 
 
 
@@ -263,35 +213,103 @@ def admin_mark_returned(request, req_id):
             timezone.datetime.fromisoformat(returned_date)
         )
 
-        # Prevent multiple return records for same request
-        AssetReturn.objects.filter(borrow_request=borrow_request).delete()
+        with transaction.atomic():
+            # Fill in the loan's single return record
+            record_return(borrow_request, returned_dt, condition, remarks, request.user)
+
+            # ============================
+            # UPDATE ASSET STATUS HERE
+            # ============================
+            assigned_asset = borrow_request.assigned_asset
+            if assigned_asset:
+                assigned_asset.status = "returned"         # <--- IMPORTANT
+                assigned_asset.asset_condition = condition  # Sync condition
+                if assigned_asset.current_loan_id in (None, borrow_request.pk):
+                    end_loan(assigned_asset)
+                assigned_asset.save(update_fields=[
+                    "status", "asset_condition", "current_loan", "current_holder", "updated_at",
+                ])
+                if not borrow_request.is_fully_returned:   # a re-recorded return adds no days
+                    count_returns([(assigned_asset.pk, borrow_request.approval_date, returned_dt)])
+
+            # Mark borrow request as fully returned
+            borrow_request.is_fully_returned = True
+            borrow_request.is_overdue = False
+            borrow_request.save()
+
+            enqueue('returned', [borrow_request])
+
+        messages.success(request, "Asset marked as returned successfully.")
+        return redirect("requests:admin_manage_returns")
+
+    return redirect("requests:admin_manage_returns")
+
+
+# --------------------------
+# OVERDUE QUEUE (flags maintained by `manage.py detect_overdue`)
+# --------------------------
+def _overdue_queue(request, template):
+    overdue = AssetRequest.objects.filter(is_overdue=True).select_related(
+        'user', 'assigned_asset'
+    ).order_by('return_date', 'id')
+
+    page_obj = Paginator(overdue, 10).get_page(request.GET.get('page'))
+    return render(request, template, {
+        'page_obj': page_obj,
+        'today': timezone.localdate(),
+    })
+
+
+@login_required
+@roles_required('admin')
+def admin_overdue_requests(request):
+    return _overdue_queue(request, "requests/admin_overdue_requests.html")
+
+
+@login_required
+@roles_required('staff')
+def staff_overdue_requests(request):
+    return _overdue_queue(request, "requests/staff_overdue_requests.html")
+
+
+# --------------------------
+# CHECK-IN STATION: batch returns from scanned codes
+# --------------------------
+def _checkin(request, template):
+    context = {'conditions': AssetReturn.CONDITION_CHOICES}
 
-        # Create/Save return record
-        AssetReturn.objects.create(
-            borrow_request=borrow_request,
-            returned_date=returned_dt,
-            condition_on_return=condition,
-            remarks=remarks,
-            received_by=request.user
+    if request.method == "POST":
+        scans, parse_errors = parse_scans(
+            request.POST.get("scans", ""),
+            default_condition=request.POST.get("default_condition", "good"),
+        )
+        checked_in, errors = check_in(
+            scans,
+            received_by=request.user,
+            remarks=request.POST.get("remarks") or None,
         )
+        errors = parse_errors + errors
 
-        # ============================
-        # UPDATE ASSET STATUS HERE
-        # ============================
-        assigned_asset = borrow_request.assigned_asset
-        if assigned_asset:
-            assigned_asset.status = "returned"         # <--- IMPORTANT
-            assigned_asset.asset_condition = condition  # Sync condition
-            assigned_asset.save()
+        if checked_in:
+            messages.success(request, f"{len(checked_in)} assets checked in.")
+        if errors:
+            messages.warning(request, f"{len(errors)} scans could not be checked in.")
 
-        # Mark borrow request as fully returned
-        borrow_request.is_fully_returned = True
-        borrow_request.save()
+        context.update({'checked_in': checked_in, 'errors': errors})
 
-        messages.success(request, "Asset marked as returned successfully.")
-        return redirect("requests:admin_manage_returns")
+    return render(request, template, context)
 
-    return redirect("requests:admin_manage_returns")
+
+@login_required
+@roles_required('admin')
+def admin_checkin(request):
+    return _checkin(request, "requests/admin_checkin.html")
+
+
+@login_required
+@roles_required('staff')
+def staff_checkin(request):
+    return _checkin(request, "requests/staff_checkin.html")
 
 
 @login_required
@@ -381,41 +399,8 @@ def available_assets(request):
 @login_required
 def staff_manage_requests(request):
     """Staff view all requests with search and filter, paginated."""
-    search_query = request.GET.get('search', '').strip()
-    status_filter = request.GET.get('status', 'all')
-
-    # Base queryset
-    requests_qs = AssetRequest.objects.select_related('user', 'assigned_asset')
-
-    # Apply search across username, asset name, and status
-    if search_query:
-        requests_qs = requests_qs.filter(
-            Q(user__username__icontains=search_query) |
-            Q(asset_category__icontains=search_query) |
-            Q(status__icontains=search_query) |
-            Q(assigned_asset__model__icontains=search_query) |
-            Q(assigned_asset__serial_number__icontains=search_query)
-        )
-
-    # Apply status filter (skip "all")
-    if status_filter != 'all':
-        requests_qs = requests_qs.filter(status=status_filter)
-
-    # Order by request_date descending
-    requests_qs = requests_qs.order_by('-request_date', '-id')  # tie-breaker by ID
-
-    # Pagination
-    paginator = Paginator(requests_qs, 5)
-    page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-
-    context = {
-        'page_obj': page_obj,
-        'all_requests': page_obj.object_list,
-        'search_query': search_query,
-        'status_filter': status_filter,
-    }
-
+    context = REQUEST_LIST.page(request)
+    context['all_requests'] = context['page_obj'].object_list
     return render(request, 'requests/staff_manage_requests.html', context)
 
 
@@ -425,12 +410,15 @@ def staff_request_details(request, pk):
     req = get_object_or_404(AssetRequest, pk=pk)
 
     # ---------------------------------------
-    # Filter ONLY available assets of same category
+    # Filter ONLY available assets of same category,
+    # most reliable first (unscored assets last)
     # ---------------------------------------
     available_assets = Asset.objects.filter(
         asset_category=req.asset_category,
         status="available"
-    ).order_by("model")
+    ).select_related("reliability").order_by(
+        F("reliability__score").desc(nulls_last=True), "model"
+    )
 
     # ---------------------------------------
     # Optional pre-assignment from dropdown
@@ -534,12 +522,19 @@ def update_request_status(request, pk, action):
         req.approved_by = request.user
         req.approval_date = timezone.now()
 
-        # Update asset
-        asset = req.assigned_asset
-        asset.status = "borrowed"
-        asset.save()
+        with transaction.atomic():
+            # Update asset
+            asset = req.assigned_asset
+            asset.status = "borrowed"
+            start_loan(asset, req)
+            asset.save(update_fields=["status", "current_loan", "current_holder", "updated_at"])
+            count_borrow(asset.pk, req.approval_date)
+
+            req.save()
+
+            open_return(req)
 
-        req.save()
+            enqueue('approved', [req])
 
         messages.success(request, "Request approved successfully.")
         return redirect("requests:staff_get_request_details", pk)
@@ -551,7 +546,9 @@ def update_request_status(request, pk, action):
         req.approval_date = timezone.now()
         req.assigned_asset = None
 
-        req.save()
+        with transaction.atomic():
+            req.save()
+            enqueue('rejected', [req])
 
         messages.error(request, "Request rejected.")
         return redirect("requests:staff_get_request_details", pk)
@@ -563,36 +560,7 @@ def update_request_status(request, pk, action):
 
 @login_required
 def staff_manage_returns(request):
-    search_query = request.GET.get("search", "").strip()
-    condition_filter = request.GET.get("condition", "all")
-
-    returns = AssetReturn.objects.select_related(
-        "borrow_request__assigned_asset",
-        "borrow_request__user",
-        "received_by",
-    )
-
-    # Search filter
-    if search_query:
-        returns = returns.filter(
-            Q(borrow_request__user__username__icontains=search_query) |
-            Q(borrow_request__assigned_asset__model__icontains=search_query) |
-            Q(borrow_request__assigned_asset__serial_number__icontains=search_query)
-        )
-
-    # Condition filter
-    if condition_filter != "all":
-        returns = returns.filter(condition_on_return=condition_filter)
-
-    paginator = Paginator(returns, 10)
-    page_number = request.GET.get("page")
-    page_obj = paginator.get_page(page_number)
-
-    return render(request, "requests/staff_manage_returns.html", {
-        "page_obj": page_obj,
-        "search_query": search_query,
-        "condition_filter": condition_filter,
-    })
+    return render(request, "requests/staff_manage_returns.html", RETURN_LIST.page(request))
 
 
 @login_required
@@ -617,30 +585,31 @@ def staff_mark_returned(request, req_id):
             timezone.datetime.fromisoformat(returned_date)
         )
 
-        # Prevent multiple return records for same request
-        AssetReturn.objects.filter(borrow_request=borrow_request).delete()
-
-        # Create/Save return record
-        AssetReturn.objects.create(
-            borrow_request=borrow_request,
-            returned_date=returned_dt,
-            condition_on_return=condition,
-            remarks=remarks,
-            received_by=request.user
-        )
-
-        # ============================
-        # UPDATE ASSET STATUS HERE
-        # ============================
-        assigned_asset = borrow_request.assigned_asset
-        if assigned_asset:
-            assigned_asset.status = "returned"         # <--- IMPORTANT
-            assigned_asset.asset_condition = condition  # Sync condition
-            assigned_asset.save()
-
-        # Mark borrow request as fully returned
-        borrow_request.is_fully_returned = True
-        borrow_request.save()
+        with transaction.atomic():
+            # Fill in the loan's single return record
+            record_return(borrow_request, returned_dt, condition, remarks, request.user)
+
+            # ============================
+            # UPDATE ASSET STATUS HERE
+            # ============================
+            assigned_asset = borrow_request.assigned_asset
+            if assigned_asset:
+                assigned_asset.status = "returned"         # <--- IMPORTANT
+                assigned_asset.asset_condition = condition  # Sync condition
+                if assigned_asset.current_loan_id in (None, borrow_request.pk):
+                    end_loan(assigned_asset)
+                assigned_asset.save(update_fields=[
+                    "status", "asset_condition", "current_loan", "current_holder", "updated_at",
+                ])
+                if not borrow_request.is_fully_returned:   # a re-recorded return adds no days
+                    count_returns([(assigned_asset.pk, borrow_request.approval_date, returned_dt)])
+
+            # Mark borrow request as fully returned
+            borrow_request.is_fully_returned = True
+            borrow_request.is_overdue = False
+            borrow_request.save()
+
+            enqueue('returned', [borrow_request])
 
         messages.success(request, "Asset marked as returned successfully.")
         return redirect("requests:staff_manage_returns")
@@ -780,6 +749,7 @@ def cancel_request(request, pk):
 
     # Update request status
     borrow_request.status = 'cancelled'
+    borrow_request.cancelled_at = timezone.now()
     borrow_request.save()
 
     messages.success(request, "Request has been cancelled successfully.")